@@ -1,8 +1,10 @@
-from flask_restplus import Api
 from flask import Blueprint
 
 from .main.controller.movie_controller import api as movie_ns
 from .main.controller.actor_controller import api as actor_ns
+from .main.controller.status_controller import api as status_ns
+from .main.util.api import Api
+from .main.util.encoder import output_json
 
 blueprint = Blueprint('api', __name__)
 
@@ -10,6 +12,8 @@ api = Api(blueprint,
           title='CASTING AGENCY API',
           version='1.0',
           )
+api.representations['application/json'] = output_json
 
 api.add_namespace(movie_ns, path='/movies')
 api.add_namespace(actor_ns, path='/actors')
+api.add_namespace(status_ns, path='/status')
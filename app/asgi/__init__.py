@@ -0,0 +1,107 @@
+"""
+Async serving mode: the /movies and /actors routes on an event loop,
+with the `databases` async driver (asyncpg on PostgreSQL, aiosqlite on
+SQLite) instead of Flask-SQLAlchemy.
+
+It shares the models' tables and validators, the DTO serializers and
+schemas, the pagination cursors and ETags, and the auth token cache
+with the Flask app. See asgi.py.
+"""
+from types import SimpleNamespace
+
+from databases import Database
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+
+from app.main.auth.auth import jwks_store
+from app.main.config import config_by_name
+from app.main.controller.movie_controller import (MOVIES_PER_PAGE,
+                                                  MAX_MOVIES_PER_PAGE)
+from app.main.controller.actor_controller import (ACTORS_PER_PAGE,
+                                                  MAX_ACTORS_PER_PAGE)
+from app.main.model.movie import Movie
+from app.main.model.actor import Actor
+from app.main.service.movie_service import MovieFilters
+from app.main.service.actor_service import ActorFilters
+from app.main.util.cache import cache
+from app.main.util.dto import MovieDto, ActorDto
+from .errors import ApiError
+from .routes import collection_routes, json_response
+from .service import Collection
+
+
+def database_options(config):
+    """
+    Returns:
+        returns the connection pool bounds of a config, sized like its
+        SQLAlchemy pool
+    """
+    options = config.SQLALCHEMY_ENGINE_OPTIONS
+    if 'pool_size' not in options:
+        return {}
+    return {
+        'min_size': options['pool_size'],
+        'max_size': options['pool_size'] + options['max_overflow'],
+    }
+
+
+async def handle_api_error(request, exc):
+    return json_response({'error': {
+        'status': exc.status,
+        'description': exc.description
+    }}, exc.status)
+
+
+def create_asgi_app(config_name):
+    config = config_by_name[config_name]()
+    # ServiceCache.init_app only reads the settings of a Flask app
+    cache.init_app(SimpleNamespace(config={
+        name: getattr(config, name) for name in dir(config)
+        if name.isupper()
+    }))
+    database = Database(config.SQLALCHEMY_DATABASE_URI,
+                        **database_options(config))
+
+    movies = Collection(
+        database, 'movie', Movie.__table__,
+        columns=('id', 'title', 'release_date', 'version', 'updated_at'),
+        sort=('title', 'id'),
+        validators={'title': Movie.validate_title,
+                    'release_date': Movie.validate_release_date},
+        serialize=MovieDto.serialize_movie,
+        validate_item=MovieDto.validate_movie)
+    actors = Collection(
+        database, 'actor', Actor.__table__,
+        columns=('id', 'name', 'age', 'gender', 'version', 'updated_at'),
+        sort=('name', 'id'),
+        validators={'name': Actor.validate_name,
+                    'age': Actor.validate_age,
+                    'gender': Actor.validate_gender},
+        serialize=ActorDto.serialize_actor,
+        validate_item=ActorDto.validate_actor)
+
+    # filters, batch reads and embedded casts are only served by Flask
+    routes = (
+        collection_routes(movies, '/movies', 'Movie', {
+            'get': 'get:movies', 'create': 'create:movie',
+            'update': 'update:movie', 'delete': 'delete:movie'
+        }, MOVIES_PER_PAGE, MAX_MOVIES_PER_PAGE,
+            MovieFilters._fields + ('ids', 'embed')) +
+        collection_routes(actors, '/actors', 'Actor', {
+            'get': 'get:actors', 'create': 'create:actor',
+            'update': 'update:actor', 'delete': 'delete:actor'
+        }, ACTORS_PER_PAGE, MAX_ACTORS_PER_PAGE,
+            ActorFilters._fields + ('ids', 'embed'))
+    )
+
+    async def warm_up():
+        await database.connect()
+        # fetch the signing keys before the first request needs them
+        await run_in_threadpool(jwks_store.refresh)
+
+    app = Starlette(debug=config.DEBUG, routes=routes,
+                    exception_handlers={ApiError: handle_api_error},
+                    on_startup=[warm_up],
+                    on_shutdown=[database.disconnect])
+    app.state.database = database
+    return app
@@ -0,0 +1,30 @@
+from starlette.concurrency import run_in_threadpool
+
+from app.main.auth.auth import (token_cache, token_from_header,
+                                verify_decode_jwt, has_permissions)
+from .errors import ApiError
+
+
+async def authenticate(request, *permissions, require_all=True):
+    """
+     Verifies the bearer token of an ASGI request. Cached tokens are
+     checked on the event loop; a new token is verified, fetching the
+     JWKS if needed, in the thread pool so the loop never blocks on it.
+    Returns:
+        returns the token payload
+    """
+    try:
+        token = token_from_header(request.headers.get('Authorization'))
+        payload = token_cache.get(token)
+        if payload is None:
+            payload = await run_in_threadpool(verify_decode_jwt, token)
+            token_cache.set(token, payload)
+    except Exception:
+        raise ApiError(401, 'Unauthorized')
+
+    if 'permissions' not in payload:
+        raise ApiError(400, 'Bad Request')
+    granted = frozenset(payload['permissions'])
+    if not has_permissions(granted, frozenset(permissions), require_all):
+        raise ApiError(403, 'Forbidden')
+    return payload
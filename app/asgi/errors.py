@@ -0,0 +1,9 @@
+class ApiError(Exception):
+    """
+     Error answered with the {"error": {"status", "description"}} body
+     the Flask error handlers produce
+    """
+
+    def __init__(self, status, description):
+        self.status = status
+        self.description = description
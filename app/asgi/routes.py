@@ -0,0 +1,152 @@
+from json import JSONDecodeError
+
+from starlette.responses import Response
+from starlette.routing import Route
+from werkzeug.http import parse_etags
+
+from app.main.exceptions import ValidationError
+from app.main.util.conditional import make_etag, validators
+from app.main.util.encoder import dumps
+from .auth import authenticate
+from .errors import ApiError
+
+
+def json_response(data, status_code=200, headers=None):
+    return Response(dumps(data) + b'\n', status_code, headers,
+                    media_type='application/json')
+
+
+def not_modified(request, etag):
+    return parse_etags(request.headers.get('if-none-match')).contains_weak(
+        etag)
+
+
+def int_arg(args, name, default):
+    # like flask's request.args.get(name, default, type=int)
+    try:
+        return int(args[name])
+    except (KeyError, ValueError):
+        return default
+
+
+async def read_json(request):
+    try:
+        return await request.json()
+    except (JSONDecodeError, UnicodeDecodeError):
+        raise ApiError(400, 'body should be JSON')
+
+
+def collection_routes(collection, path, title, permissions, per_page,
+                      max_per_page, flask_only=()):
+    """
+    collection_routes: the list and item routes of one collection,
+    answering like the Flask resources of the same path
+    Args:
+        collection (data type: Collection)
+        path (data type: str) e.g. '/movies'
+        title (data type: str) capitalized singular name, e.g. 'Movie'
+        permissions (data type: dict) permission of each of 'get',
+            'create', 'update' and 'delete'
+        per_page (data type: int) default page size
+        max_per_page (data type: int) largest limit in cursor mode
+        flask_only (data type: tuple) list query parameters only the
+            Flask app serves, refused here rather than ignored
+    Returns:
+        returns a list of starlette routes
+    """
+    plural = path.strip('/')
+    serialize = collection.serialize
+
+    async def list_items(request):
+        await authenticate(request, permissions['get'])
+        args = request.query_params
+        for name in flask_only:
+            if name in args:
+                raise ApiError(400, name + ' is not supported in async mode')
+        include_total = args.get('include_total', '').lower() == 'true'
+        try:
+            if 'cursor' in args:
+                limit = int_arg(args, 'limit', per_page)
+                if not 0 < limit <= max_per_page:
+                    raise ApiError(400, 'limit should be between 1 and ' +
+                                   str(max_per_page))
+                page = await collection.get_page_after(
+                    args['cursor'], limit, include_total)
+                location = 'after the given cursor'
+            else:
+                number = int_arg(args, 'page', 1)
+                page = await collection.get_page(number, per_page,
+                                                 include_total)
+                location = 'on page ' + str(number)
+        except ValidationError as exc:
+            raise ApiError(400, exc.error)
+
+        if not page.items:
+            raise ApiError(404, 'No ' + plural + ' were found ' + location)
+
+        last_modified = max(item.updated_at for item in page.items)
+        # embed is refused above, so its part of the Flask ETag is None
+        etag = make_etag(plural, None, page.has_next, page.next_cursor,
+                         page.total,
+                         *[(item.id, item.version) for item in page.items])
+        headers = validators(etag, last_modified)
+        if not_modified(request, etag):
+            return Response(status_code=304, headers=headers)
+
+        return json_response({
+            plural: [serialize(item) for item in page.items],
+            'has_next': page.has_next,
+            'next_cursor': page.next_cursor,
+            'total': page.total
+        }, headers=headers)
+
+    async def create_item(request):
+        await authenticate(request, permissions['create'])
+        try:
+            item = await collection.create(await read_json(request))
+        except ValidationError as exc:
+            raise ApiError(400, exc.error)
+        return json_response(serialize(item), 201)
+
+    async def get_item(request):
+        await authenticate(request, permissions['get'])
+        item_id = request.path_params['item_id']
+        item = await collection.get(item_id)
+        if item is None:
+            raise ApiError(404, title + ' with id ' + str(item_id) +
+                           ' was not found')
+
+        etag = make_etag(plural[:-1], item.id, item.version)
+        headers = validators(etag, item.updated_at)
+        if not_modified(request, etag):
+            return Response(status_code=304, headers=headers)
+        return json_response(serialize(item), headers=headers)
+
+    async def update_item(request):
+        await authenticate(request, permissions['update'])
+        item_id = request.path_params['item_id']
+        try:
+            item = await collection.update(item_id, await read_json(request))
+        except ValidationError as exc:
+            raise ApiError(400, exc.error)
+        if item is None:
+            raise ApiError(404, title + ' with id ' + str(item_id) +
+                           ' was not found')
+        return json_response(serialize(item))
+
+    async def delete_item(request):
+        await authenticate(request, permissions['delete'])
+        item_id = request.path_params['item_id']
+        if await collection.delete(item_id) is None:
+            raise ApiError(404, title + ' with id ' + str(item_id) +
+                           ' was not found')
+        return Response(status_code=204)
+
+    item_path = path + '/{item_id:int}'
+    return [
+        Route(path + '/', list_items, methods=['GET']),
+        Route(path + '/', create_item, methods=['POST']),
+        Route(item_path, get_item, methods=['GET']),
+        Route(item_path, update_item, methods=['PATCH']),
+        Route(item_path, delete_item, methods=['DELETE']),
+    ]
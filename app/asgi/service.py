@@ -0,0 +1,168 @@
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from sqlalchemy import func, select, text, tuple_
+from starlette.concurrency import run_in_threadpool
+
+from app.main.exceptions import ValidationError
+from app.main.util.cache import cache
+from app.main.util.pagination import (Page, encode_cursor, decode_cursor,
+                                      COUNT_CACHE_TTL, ESTIMATE_THRESHOLD)
+
+
+class Collection():
+    """
+     Async queries of one table, built from the same Core table, model
+     validators and DTO serializer the Flask services use.
+
+     Rows are returned as namedtuples, so the compiled serializers and
+     the cursor helpers read them like the Flask services' rows. Reads
+     skip the service cache, but writes invalidate it so Flask workers
+     sharing a redis cache see them.
+    """
+
+    def __init__(self, database, name, table, columns, sort, validators,
+                 serialize, validate_item):
+        self.database = database
+        self.name = name
+        self.table = table
+        self.columns = [table.c[column] for column in columns]
+        self.sort = [table.c[column] for column in sort]
+        self.validators = validators
+        self.serialize = serialize
+        self.validate_item = validate_item
+        self.row = namedtuple(name + '_row', columns)
+        self.namespace = name + 's'
+        self._count = None
+
+    @property
+    def returning(self):
+        return self.database.url.dialect == 'postgresql'
+
+    def _rows(self, records):
+        return [self.row._make(record[column.name]
+                               for column in self.columns)
+                for record in records]
+
+    async def _invalidate(self, item_id):
+        if cache.backend is not None:
+            await run_in_threadpool(cache.invalidate, self.namespace,
+                                    item_id)
+
+    def _order(self, query):
+        return query.order_by(*[column.desc() for column in self.sort])
+
+    async def get_page(self, page, per_page, include_total=False):
+        page = max(page, 1)
+        query = (self._order(select(self.columns)).
+                 limit(per_page + 1).offset((page - 1) * per_page))
+        items = self._rows(await self.database.fetch_all(query))
+        total = await self.count() if include_total else None
+        return Page(items[:per_page], len(items) > per_page, None, total)
+
+    async def get_page_after(self, cursor, limit, include_total=False):
+        query = self._order(select(self.columns))
+        if cursor:
+            values = decode_cursor(cursor, self.sort)
+            query = query.where(tuple_(*self.sort) < tuple_(*values))
+        items = self._rows(
+            await self.database.fetch_all(query.limit(limit + 1)))
+
+        next_cursor = None
+        has_next = len(items) > limit
+        if has_next:
+            items = items[:limit]
+            next_cursor = encode_cursor([getattr(items[-1], column.name)
+                                         for column in self.sort])
+        total = await self.count() if include_total else None
+        return Page(items, has_next, next_cursor, total)
+
+    async def count(self):
+        now = time.monotonic()
+        if self._count is not None and self._count[1] > now:
+            return self._count[0]
+
+        total = None
+        if self.returning:
+            estimate = await self.database.fetch_val(
+                text('SELECT reltuples::bigint FROM pg_class '
+                     'WHERE oid = to_regclass(:table)').
+                bindparams(table=self.table.name))
+            if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+                total = estimate
+        if total is None:
+            total = await self.database.fetch_val(
+                select([func.count()]).select_from(self.table))
+        self._count = (total, now + COUNT_CACHE_TTL)
+        return total
+
+    async def get(self, item_id):
+        record = await self.database.fetch_one(
+            select(self.columns).where(self.table.c.id == item_id))
+        return self._rows([record])[0] if record else None
+
+    def validate(self, item, partial=False):
+        """
+        validate: checks an item against the DTO schema, then each field
+        with the model validator its setter uses
+        Returns:
+            returns the column values, only those given when partial
+        """
+        if not isinstance(item, dict):
+            raise ValidationError('item should be a JSON object')
+        if not partial:
+            self.validate_item(item)
+        return {
+            key: validator(item.get(key))
+            for key, validator in self.validators.items()
+            if not partial or item.get(key)
+        }
+
+    async def create(self, item):
+        values = self.validate(item)
+        values.update(version=1, updated_at=datetime.utcnow())
+        query = self.table.insert().values(**values)
+        if self.returning:
+            query = query.returning(self.table.c.id)
+        async with self.database.transaction():
+            item_id = await self.database.execute(query)
+        await self._invalidate(item_id)
+        return self.row(id=item_id, **values)
+
+    async def update(self, item_id, item):
+        values = self.validate(item, partial=True)
+        if not values:
+            return await self.get(item_id)
+
+        values.update(version=self.table.c.version + 1,
+                      updated_at=datetime.utcnow())
+        query = (self.table.update().
+                 where(self.table.c.id == item_id).values(**values))
+        async with self.database.transaction():
+            if self.returning:
+                record = await self.database.fetch_one(
+                    query.returning(*self.columns))
+                item = self._rows([record])[0] if record else None
+            else:
+                await self.database.execute(query)
+                item = await self.get(item_id)
+        if item is not None:
+            await self._invalidate(item_id)
+        return item
+
+    async def delete(self, item_id):
+        query = self.table.delete().where(self.table.c.id == item_id)
+        async with self.database.transaction():
+            if self.returning:
+                found = await self.database.fetch_val(
+                    query.returning(self.table.c.id))
+            else:
+                found = await self.database.fetch_val(
+                    select([self.table.c.id]).
+                    where(self.table.c.id == item_id))
+                if found is not None:
+                    await self.database.execute(query)
+        if found is not None:
+            await self._invalidate(item_id)
+        return found
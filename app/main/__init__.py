@@ -1,16 +1,42 @@
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 
 from .config import config_by_name
+from .util.cache import cache
+from .util.metrics import metrics
+from .util.pool_metrics import pool_metrics
+from .util.query_metrics import query_metrics
+from .util.unit_of_work import unit_of_work
 
+# connections are reset by unit_of_work, which skips the rollback when
+# the transaction has already ended
 db = SQLAlchemy(session_options={
     'expire_on_commit': False
+}, engine_options={
+    'pool_reset_on_return': None
 })
 
 
+def enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # SQLite ignores ON DELETE CASCADE unless each connection enables it
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA foreign_keys=ON')
+    cursor.close()
+
+
 def create_app(config_name):
     app = Flask(__name__)
-    app.config.from_object(config_by_name[config_name])
+    app.config.from_object(config_by_name[config_name]())
     db.init_app(app)
+    engine = db.get_engine(app)
+    if engine.dialect.name == 'sqlite':
+        event.listen(engine, 'connect', enable_sqlite_foreign_keys)
+    cache.init_app(app)
+    pool_metrics.init_app(app)
+    # registered first so their after_request runs after the commit
+    query_metrics.init_app(app, db)
+    metrics.init_app(app)
+    unit_of_work.init_app(app, db)
 
     return app
@@ -1,15 +1,33 @@
-import json
-from flask import request, _request_ctx_stack, abort
+from flask import request, _request_ctx_stack, abort, g
 from functools import wraps
 from jose import jwt
 from jose.exceptions import JWTError
-from urllib.request import urlopen
+from .jwks import JWKSKeyStore, UrlJWKSSource, FileJWKSSource
+from .token_cache import TokenCache
+from app.main.util.metrics import metrics
 import os
+import time
 
 
 AUTH0_DOMAIN = os.getenv('AUTH0_DOMAIN')
 ALGORITHMS = os.getenv('ALGORITHMS')
 API_AUDIENCE = os.getenv('API_AUDIENCE')
+JWKS_FILE = os.getenv('JWKS_FILE')
+JWKS_CACHE_TTL = int(os.getenv('JWKS_CACHE_TTL', 600))
+JWKS_REFETCH_INTERVAL = int(os.getenv('JWKS_REFETCH_INTERVAL', 30))
+TOKEN_CACHE_SIZE = int(os.getenv('TOKEN_CACHE_SIZE', 1024))
+
+if JWKS_FILE:
+    jwks_source = FileJWKSSource(JWKS_FILE)
+else:
+    jwks_source = UrlJWKSSource(
+        f'https://{AUTH0_DOMAIN}/.well-known/jwks.json')
+
+jwks_store = JWKSKeyStore(jwks_source,
+                          ttl=JWKS_CACHE_TTL,
+                          min_refetch_interval=JWKS_REFETCH_INTERVAL)
+
+token_cache = TokenCache(maxsize=TOKEN_CACHE_SIZE)
 
 
 class AuthError(Exception):
@@ -22,7 +40,13 @@ def get_token_auth_header():
     """
      Obtains the Access Token from the Authorization Header
     """
-    auth = request.headers.get('Authorization', None)
+    return token_from_header(request.headers.get('Authorization', None))
+
+
+def token_from_header(auth):
+    """
+     Extracts the bearer token from an Authorization header value
+    """
     if not auth:
         raise AuthError({
             'code': 'authorization_header_missing',
@@ -52,34 +76,44 @@ def get_token_auth_header():
     return token
 
 
-def check_permissions(permission, payload):
+def check_permissions(permission, payload, require_all=True):
+    """
+     Checks one permission, or a collection of permissions that must all
+     (require_all=True) or any (require_all=False) be granted
+    """
     if 'permissions' not in payload:
         abort(400)
-    if permission not in payload['permissions']:
+    if g.get('jwt_payload') is payload:
+        granted = g.permissions
+    else:
+        granted = frozenset(payload['permissions'])
+
+    if not has_permissions(granted, permission, require_all):
         abort(403)
     return True
 
 
+def has_permissions(granted, permission, require_all=True):
+    """
+     Checks `permission` (one, or a collection) against the frozenset of
+     granted permissions
+    """
+    if isinstance(permission, str):
+        return permission in granted
+    if require_all:
+        return granted.issuperset(permission)
+    return not permission or not granted.isdisjoint(permission)
+
+
 def verify_decode_jwt(token):
-    jsonurl = urlopen(f'https://{AUTH0_DOMAIN}/.well-known/jwks.json')
-    jwks = json.loads(jsonurl.read())
     unverified_header = jwt.get_unverified_header(token)
-    rsa_key = {}
     if 'kid' not in unverified_header:
         raise AuthError({
             'code': 'invalid_header',
             'description': 'Authorization malformed.'
         }, 401)
 
-    for key in jwks['keys']:
-        if key['kid'] == unverified_header['kid']:
-            rsa_key = {
-                'kty': key['kty'],
-                'kid': key['kid'],
-                'use': key['use'],
-                'n': key['n'],
-                'e': key['e']
-            }
+    rsa_key = jwks_store.get_key(unverified_header['kid'])
     if rsa_key:
         try:
             payload = jwt.decode(
@@ -109,22 +143,47 @@ def verify_decode_jwt(token):
                 'code': 'invalid_header',
                 'description': 'Unable to parse authentication token.'
             }, 400)
-            raise AuthError({
-                'code': 'invalid_header',
-                'description': 'Unable to find the appropriate key.'
-            }, 400)
+    raise AuthError({
+        'code': 'invalid_header',
+        'description': 'Unable to find the appropriate key.'
+    }, 400)
+
+
+def get_auth_payload():
+    """
+     Verifies the bearer token once per request; the payload and its
+     permissions, as a frozenset, are kept on flask.g
+    """
+    current_request = request._get_current_object()
+    if g.get('auth_request') is current_request:
+        return g.jwt_payload
+
+    token = get_token_auth_header()
+    payload = token_cache.get(token)
+    if payload is None:
+        started = time.perf_counter()
+        payload = verify_decode_jwt(token)
+        metrics.observe_token_decode(time.perf_counter() - started)
+        token_cache.set(token, payload)
+
+    g.auth_request = current_request
+    g.jwt_payload = payload
+    g.permissions = frozenset(payload.get('permissions', ()))
+    return payload
+
 
+def requires_auth(*permissions, require_all=True):
+    required = frozenset(permission for permission in permissions
+                         if permission)
 
-def requires_auth(permission=''):
     def requires_auth_decorator(f):
         @wraps(f)
         def wrapper(*args, **kwargs):
             try:
-                token = get_token_auth_header()
-                payload = verify_decode_jwt(token)
+                payload = get_auth_payload()
             except (JWTError, AuthError):
                 abort(401)
-            check_permissions(permission, payload)
+            check_permissions(required, payload, require_all)
             return f(payload, *args, **kwargs)
 
         return wrapper
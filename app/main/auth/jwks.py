@@ -0,0 +1,138 @@
+import json
+import logging
+import threading
+import time
+from urllib.request import urlopen
+
+from app.main.util.metrics import metrics
+
+
+logger = logging.getLogger(__name__)
+
+KEY_FIELDS = ('kty', 'kid', 'use', 'n', 'e')
+
+
+class UrlJWKSSource():
+    """
+     Fetches a JSON Web Key Set over HTTP(S)
+    """
+
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def fetch(self):
+        with urlopen(self.url, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+
+class FileJWKSSource():
+    """
+     Reads a JSON Web Key Set from a local file
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def fetch(self):
+        with open(self.path) as jwks_file:
+            return json.load(jwks_file)
+
+
+class JWKSKeyStore():
+    """
+     Process-wide cache of signing keys indexed by kid.
+
+     Keys are fetched once and kept for `ttl` seconds. Within
+     `refresh_ahead` seconds of expiry a background refresh is started so
+     requests never wait on the key endpoint. An unknown kid triggers a
+     single refetch, at most once every `min_refetch_interval` seconds, and
+     the last good key set keeps being served while the source is failing.
+    """
+
+    def __init__(self, source, ttl=600, refresh_ahead=60,
+                 min_refetch_interval=30, clock=time.monotonic):
+        self.source = source
+        self.ttl = ttl
+        self.refresh_ahead = min(refresh_ahead, ttl)
+        self.min_refetch_interval = min_refetch_interval
+        self.clock = clock
+
+        self._keys = {}
+        self._expires_at = None
+        self._last_attempt = None
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+    def get_key(self, kid):
+        now = self.clock()
+        if self._expires_at is None or now >= self._expires_at:
+            self._refresh(now)
+        elif now >= self._expires_at - self.refresh_ahead:
+            self._refresh_in_background(now)
+
+        key = self._keys.get(kid)
+        if key is None:
+            self._refresh(now)
+            key = self._keys.get(kid)
+        return key
+
+    def refresh(self):
+        """
+         Fetches the key set unconditionally
+        Returns:
+            returns True if the keys were replaced
+        """
+        with self._lock:
+            return self._fetch(self.clock())
+
+    def clear(self):
+        with self._lock:
+            self._keys = {}
+            self._expires_at = None
+            self._last_attempt = None
+
+    def _recently_attempted(self, now):
+        return (self._last_attempt is not None and
+                now - self._last_attempt < self.min_refetch_interval)
+
+    def _refresh(self, now):
+        with self._lock:
+            if self._recently_attempted(now):
+                return False
+            return self._fetch(now)
+
+    def _refresh_in_background(self, now):
+        with self._lock:
+            if self._refreshing or self._recently_attempted(now):
+                return
+            self._refreshing = True
+        thread = threading.Thread(target=self._background_refresh,
+                                  name='jwks-refresh', daemon=True)
+        thread.start()
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        finally:
+            self._refreshing = False
+
+    def _fetch(self, now):
+        self._last_attempt = now
+        started = time.perf_counter()
+        try:
+            jwks = self.source.fetch()
+            keys = {
+                key['kid']: {field: key.get(field) for field in KEY_FIELDS}
+                for key in jwks['keys'] if 'kid' in key
+            }
+        except Exception:
+            metrics.observe_jwks_fetch(time.perf_counter() - started, False)
+            logger.warning('Unable to fetch JWKS, serving %d cached keys',
+                           len(self._keys), exc_info=True)
+            return False
+        metrics.observe_jwks_fetch(time.perf_counter() - started, True)
+
+        self._keys = keys
+        self._expires_at = now + self.ttl
+        return True
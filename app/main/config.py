@@ -1,36 +1,129 @@
 import os
 
-postgres_url = os.environ['DATABASE_URL']
-test_postgres_url = os.environ['TEST_DATABASE_URL']
-dev_postgres_url = os.environ['DEV_DATABASE_URL']
+from .util.pool_metrics import InstrumentedQueuePool
 
 basedir = os.path.abspath(os.path.dirname(__file__))
 
 
+def engine_options(database_url, pool_size, max_overflow,
+                   statement_timeout=None):
+    """
+    engine_options: connection pool settings, each overridable with a
+    DB_* environment variable
+    Args:
+        database_url (data type: str)
+        pool_size (data type: int) connections kept open
+        max_overflow (data type: int) extra connections opened under load
+        statement_timeout (data type: int) optional, in milliseconds,
+            PostgreSQL only
+    Returns:
+        returns the SQLALCHEMY_ENGINE_OPTIONS of a config
+    """
+    if not database_url or database_url.startswith('sqlite'):
+        # sqlite runs on SQLAlchemy's single-connection pools
+        return {}
+
+    options = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': int(os.getenv('DB_POOL_SIZE', pool_size)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', max_overflow)),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 10)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        # a ping costs one extra round trip per checkout
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'false') == 'true',
+    }
+    statement_timeout = os.getenv('DB_STATEMENT_TIMEOUT', statement_timeout)
+    if statement_timeout and database_url.startswith('postgres'):
+        options['connect_args'] = {
+            'options': '-c statement_timeout=%d' % int(statement_timeout)
+        }
+    return options
+
+
+# the database settings are properties, read when create_app loads a
+# config, so only the active environment's URL has to be set
 class DevelopmentConfig():
     DEBUG = True
     ENV = 'development'
-    SQLALCHEMY_DATABASE_URI = dev_postgres_url
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    DB_POOL_SLOW_CHECKOUT = float(os.getenv('DB_POOL_SLOW_CHECKOUT', 0.1))
+    DB_SLOW_QUERY = float(os.getenv('DB_SLOW_QUERY', 0.5))
+    DB_SERVER_TIMING = os.getenv('DB_SERVER_TIMING', 'true') == 'true'
+    CACHE_TYPE = os.getenv('CACHE_TYPE', 'lru')
+    CACHE_TTL = int(os.getenv('CACHE_TTL', 60))
+    CACHE_MAXSIZE = int(os.getenv('CACHE_MAXSIZE', 1024))
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL')
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'false') == 'true'
+
+    @property
+    def SQLALCHEMY_DATABASE_URI(self):
+        return os.environ['DEV_DATABASE_URL']
+
+    @property
+    def SQLALCHEMY_ENGINE_OPTIONS(self):
+        return engine_options(self.SQLALCHEMY_DATABASE_URI,
+                              pool_size=5, max_overflow=5)
 
 
 class TestingConfig():
     DEBUG = True
     TESTING = True
     ENV = 'testing'
-    SQLALCHEMY_DATABASE_URI = test_postgres_url
     PRESERVE_CONTEXT_ON_EXCEPTION = False
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    CACHE_TYPE = 'null'
+
+    @property
+    def SQLALCHEMY_DATABASE_URI(self):
+        return os.environ['TEST_DATABASE_URL']
+
+    @property
+    def SQLALCHEMY_ENGINE_OPTIONS(self):
+        return engine_options(self.SQLALCHEMY_DATABASE_URI,
+                              pool_size=2, max_overflow=2)
 
 
 class ProductionConfig():
     DEBUG = False
     ENV = 'production'
-    SQLALCHEMY_DATABASE_URI = postgres_url
+    DB_POOL_SLOW_CHECKOUT = float(os.getenv('DB_POOL_SLOW_CHECKOUT', 0.1))
+    DB_SLOW_QUERY = float(os.getenv('DB_SLOW_QUERY', 0.5))
+    DB_SERVER_TIMING = os.getenv('DB_SERVER_TIMING', 'false') == 'true'
+    # an in-process 'lru' cache is only invalidated in the worker that
+    # handled the write; use 'redis' when running several workers
+    CACHE_TYPE = os.getenv('CACHE_TYPE', 'null')
+    CACHE_TTL = int(os.getenv('CACHE_TTL', 60))
+    CACHE_MAXSIZE = int(os.getenv('CACHE_MAXSIZE', 1024))
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL')
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'false') == 'true'
+
+    @property
+    def SQLALCHEMY_DATABASE_URI(self):
+        return os.environ['DATABASE_URL']
+
+    @property
+    def SQLALCHEMY_ENGINE_OPTIONS(self):
+        # per gunicorn worker: keep workers * (size + overflow) below the
+        # server's max_connections
+        return engine_options(self.SQLALCHEMY_DATABASE_URI,
+                              pool_size=10, max_overflow=10,
+                              statement_timeout=30000)
+
+
+class BenchmarkConfig(ProductionConfig):
+    # production settings on a benchmark database; the in-process cache
+    # stands in for redis, as benchmarks run in a single process
+    ENV = 'benchmark'
+    CACHE_TYPE = os.getenv('CACHE_TYPE', 'lru')
+
+    @property
+    def SQLALCHEMY_DATABASE_URI(self):
+        return os.environ['BENCH_DATABASE_URL']
 
 
 config_by_name = dict(
     development=DevelopmentConfig,
     testing=TestingConfig,
-    production=ProductionConfig
+    production=ProductionConfig,
+    benchmark=BenchmarkConfig
 )
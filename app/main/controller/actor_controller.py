@@ -1,48 +1,187 @@
 import app.main.service
-from flask import request
+from flask import request, Response, stream_with_context
 from flask_restplus import abort
 from sqlalchemy.exc import SQLAlchemyError, DBAPIError
-from app.main.service import actor_service
+from app.main.service import actor_service, cast_service
 from app.main.exceptions import ValidationError
 from flask_restplus import Resource
+from ..util.conditional import (make_etag, validators, is_conditional,
+                                not_modified)
+from ..util.batch import parse_ids, batch_results
+from ..util.export import EXPORT_FORMATS, export_stream
+from ..util.ndjson import NDJSON_MIMETYPES, iter_ndjson
 from ..util.dto import ActorDto
 from werkzeug.exceptions import (BadRequest, NotFound, InternalServerError,
                                  Unauthorized, Forbidden, MethodNotAllowed)
-from app.main.auth.auth import requires_auth
+from app.main.auth.auth import requires_auth, check_permissions
 
 ACTORS_PER_PAGE = 10
+MAX_ACTORS_PER_PAGE = 100
+MAX_BULK_ACTORS = 10000
+MAX_BATCH_ACTORS = 1000
+STATS_BUCKET_SIZE = 10
+MAX_STATS_BUCKET_SIZE = 100
 api = ActorDto.api
 _actor = ActorDto.actor
+_actor_list = ActorDto.actor_list
+_serialize_actor = ActorDto.serialize_actor
+_validate_actor = ActorDto.validate_actor
+_bulk_result = ActorDto.bulk_result
+_batch_request = ActorDto.batch_request
+_batch_result = ActorDto.batch_result
+_stats = ActorDto.stats
+_casting_list = ActorDto.casting_list
+_serialize_casting = ActorDto.serialize_casting
 _error = ActorDto.error
 
 
+def _actors_by_ids(value):
+    """
+    _actors_by_ids: reads requested ids, loads their actors in one query
+    Returns:
+        returns the ids in request order and the row of each found id
+    """
+    try:
+        ids = parse_ids(value, MAX_BATCH_ACTORS)
+    except ValidationError as exc:
+        raise BadRequest({
+            "status": 400,
+            "description": exc.error
+        })
+    return ids, actor_service.get_actors_by_ids(ids)
+
+
+def _batch_body(ids, actors):
+    results = batch_results(ids, actors, _serialize_actor, 'Actor')
+    found = sum(1 for result in results if result['status'] == 200)
+    return {
+        'found': found,
+        'not_found': len(results) - found,
+        'results': results
+    }
+
+
 @api.route('/')
 class ActorList(Resource):
-    @api.doc('list_of_actors')
-    @api.marshal_list_with(_actor, envelope='actors')
+    @api.doc('list_of_actors', params={
+        'page': 'page number, ignored when a cursor is given',
+        'cursor': 'opaque cursor from next_cursor, empty for the first page',
+        'limit': 'actors per page in cursor mode, at most ' +
+                 str(MAX_ACTORS_PER_PAGE),
+        'include_total': 'true to include the (approximate) actor count',
+        'gender': 'MALE or FEMALE',
+        'min_age': 'actors at least this old',
+        'max_age': 'actors at most this old',
+        'embed': 'cast to include the movies of each actor with their role',
+        'ids': 'comma separated actor ids to read in one batch, at most ' +
+               str(MAX_BATCH_ACTORS)
+    })
+    @api.response(200, 'Success', _actor_list)
+    @api.response(304, 'Not Modified')
     @requires_auth('get:actors')
     def get(payload, self):
         """
         get_actors: fetches actors
         Args:
             page (data type: int)
+            cursor (data type: str) optional
+            limit (data type: int) optional
+            include_total (data type: bool) optional
+            gender (data type: str) optional
+            min_age, max_age (data type: int) optional
+            embed (data type: str) optional
+            ids (data type: str) optional
         Returns:
-            returns an array of actors
+            returns an array of actors and whether a next page exists, or
+            with ids, one result per id in request order
         """
 
-        page = request.args.get('page', 1, type=int)
-        actorsPagination = (actor_service.
-                            get_actors(page, ACTORS_PER_PAGE))
-        actors = actorsPagination.items
-        formatted_actors = [actor.format() for actor in actors]
+        if 'ids' in request.args:
+            # a batch read ignores paging, filters and embeds
+            ids, actors = _actors_by_ids(request.args['ids'])
+            etag = make_etag('actors;ids', *[
+                (actor_id, getattr(actors.get(actor_id), 'version', None))
+                for actor_id in ids])
+            last_modified = max((actor.updated_at for actor in actors.values()
+                                 if actor), default=None)
+            headers = validators(etag, last_modified)
+            if not_modified(etag, last_modified):
+                return Response(status=304, headers=headers)
+            return _batch_body(ids, actors), 200, headers
+
+        include_total = (request.args.get('include_total', '').lower() ==
+                         'true')
+        embed = request.args.get('embed')
+        if embed not in (None, 'cast'):
+            raise BadRequest({
+                "status": 400,
+                "description": "embed should be cast"
+            })
+        if embed:
+            check_permissions('get:movies', payload)
+        filters = actor_service.actor_filters(request.args)
+        try:
+            if 'cursor' in request.args:
+                limit = request.args.get('limit', ACTORS_PER_PAGE, type=int)
+                if not 0 < limit <= MAX_ACTORS_PER_PAGE:
+                    raise BadRequest({
+                        "status": 400,
+                        "description": "limit should be between 1 and " +
+                        str(MAX_ACTORS_PER_PAGE)
+                    })
+                actorsPage = actor_service.get_actors_after(
+                    request.args['cursor'], limit, include_total,
+                    filters=filters)
+                location = "after the given cursor"
+            else:
+                page = request.args.get('page', 1, type=int)
+                actorsPage = actor_service.get_actors(
+                    page, ACTORS_PER_PAGE, include_total, filters=filters)
+                location = "on page " + str(page)
+        except ValidationError as exc:
+            raise BadRequest({
+                "status": 400,
+                "description": exc.error
+            })
+        actors = actorsPage.items
 
         if not len(actors):
             raise NotFound({
                 "status": 404,
-                "description": "No actors were found on page " + str(page)
+                "description": "No actors were found " + location
             })
 
-        return formatted_actors
+        # the movies of the whole page are loaded in one query
+        castings, casting_rows = {}, []
+        if embed:
+            castings = cast_service.get_castings(
+                [actor.id for actor in actors])
+            casting_rows = [row for actor in actors
+                            for row in castings[actor.id]]
+
+        last_modified = max([actor.updated_at for actor in actors] +
+                            [row.updated_at for row in casting_rows])
+        etag = make_etag('actors', 'cast' if embed else None,
+                         actorsPage.has_next, actorsPage.next_cursor,
+                         actorsPage.total,
+                         *[(actor.id, actor.version) for actor in actors],
+                         *[('cast', row.actor_id, row.id, row.version,
+                            row.role) for row in casting_rows])
+        headers = validators(etag, last_modified)
+        if not_modified(etag, last_modified):
+            return Response(status=304, headers=headers)
+
+        formatted_actors = [_serialize_actor(actor) for actor in actors]
+        if embed:
+            for actor, formatted in zip(actors, formatted_actors):
+                formatted['cast'] = [_serialize_casting(row)
+                                     for row in castings[actor.id]]
+        return {
+            'actors': formatted_actors,
+            'has_next': actorsPage.has_next,
+            'next_cursor': actorsPage.next_cursor,
+            'total': actorsPage.total
+        }, 200, headers
 
     @api.doc('create a new actor')
     @api.expect(_actor, validate=True)
@@ -76,11 +215,154 @@ class ActorList(Resource):
         return actor.format(), 201
 
 
+@api.route('/bulk')
+class ActorBulk(Resource):
+    @api.doc('create actors in bulk')
+    @api.expect([_actor])
+    @api.response(200, 'Success', _bulk_result)
+    @requires_auth('create:actor')
+    def post(payload, self):
+        """
+        create_actors: creates actors from a JSON array of at most
+        10000 items, or from an NDJSON stream of any length
+        (Content-Type: application/x-ndjson)
+        Returns:
+            returns one result per item, in request order
+        """
+        if request.mimetype in NDJSON_MIMETYPES:
+            items = iter_ndjson(request.stream)
+        else:
+            items = request.get_json(silent=True)
+            if not isinstance(items, list):
+                raise BadRequest({
+                    "status": 400,
+                    "description": "body should be a JSON array or NDJSON"
+                })
+            if len(items) > MAX_BULK_ACTORS:
+                raise BadRequest({
+                    "status": 400,
+                    "description": "at most " + str(MAX_BULK_ACTORS) +
+                    " actors can be sent as a JSON array, use NDJSON"
+                })
+
+        results = actor_service.post_actors(items, _validate_actor)
+        created = sum(1 for result in results if result['status'] == 201)
+        return {
+            'created': created,
+            'failed': len(results) - created,
+            'results': results
+        }, 200
+
+
+@api.route('/batch')
+class ActorBatch(Resource):
+    @api.doc('get actors by ids')
+    @api.expect(_batch_request)
+    @api.response(200, 'Success', _batch_result)
+    @requires_auth('get:actors')
+    def post(payload, self):
+        """
+        get_actors_by_ids: fetches the actors of a list of ids too long
+        for the query string of GET /actors/?ids=
+        Args:
+            ids (data type: list)
+        Returns:
+            returns one result per id, in request order
+        """
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            raise BadRequest({
+                "status": 400,
+                "description": "body should be a JSON object"
+            })
+        ids, actors = _actors_by_ids(body.get('ids'))
+        return _batch_body(ids, actors), 200
+
+
+@api.route('/export')
+class ActorExport(Resource):
+    @api.doc('export all actors', params={
+        'format': 'ndjson (default) or csv'
+    })
+    @api.produces(list(EXPORT_FORMATS.values()))
+    @requires_auth('get:actors')
+    def get(payload, self):
+        """
+        export_actors: streams every actor, gzipped if the client accepts it
+        Args:
+            format (data type: str) optional
+        Returns:
+            returns the actors as NDJSON or CSV
+        """
+        export_format = request.args.get('format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            raise BadRequest({
+                "status": 400,
+                "description": "format should be one of " +
+                ", ".join(sorted(EXPORT_FORMATS))
+            })
+        compress = 'gzip' in request.accept_encodings
+
+        chunks = export_stream(actor_service.export_actors(),
+                               _serialize_actor, list(_actor.keys()),
+                               export_format, compress)
+        response = Response(stream_with_context(chunks),
+                            mimetype=EXPORT_FORMATS[export_format])
+        response.headers['Content-Disposition'] = (
+            'attachment; filename=actors.' + export_format)
+        response.vary.add('Accept-Encoding')
+        if compress:
+            response.headers['Content-Encoding'] = 'gzip'
+        return response
+
+
+@api.route('/stats')
+class ActorStats(Resource):
+    @api.doc('actor counts and ages by gender', params={
+        'bucket_size': 'years per age histogram bucket, at most ' +
+                       str(MAX_STATS_BUCKET_SIZE),
+        'gender': 'MALE or FEMALE',
+        'min_age': 'actors at least this old',
+        'max_age': 'actors at most this old'
+    })
+    @api.response(200, 'Success', _stats)
+    @requires_auth('get:actors')
+    def get(payload, self):
+        """
+        get_actor_stats: counts actors by gender with their age range,
+        average age and age histogram
+        Args:
+            bucket_size (data type: int) optional
+            gender (data type: str) optional
+            min_age, max_age (data type: int) optional
+        Returns:
+            returns the statistics of the matching actors
+        """
+        bucket_size = request.args.get('bucket_size', STATS_BUCKET_SIZE,
+                                       type=int)
+        if not 0 < bucket_size <= MAX_STATS_BUCKET_SIZE:
+            raise BadRequest({
+                "status": 400,
+                "description": "bucket_size should be between 1 and " +
+                str(MAX_STATS_BUCKET_SIZE)
+            })
+        try:
+            stats = actor_service.get_actor_stats(
+                bucket_size, filters=actor_service.actor_filters(request.args))
+        except ValidationError as exc:
+            raise BadRequest({
+                "status": 400,
+                "description": exc.error
+            })
+        return stats, 200
+
+
 @api.route('/<actor_id>')
 @api.param('actor_id', 'Actor identifier')
 class Actor(Resource):
     @api.doc('get a actor by id')
-    @api.marshal_with(_actor)
+    @api.response(200, 'Success', _actor)
+    @api.response(304, 'Not Modified')
     @requires_auth('get:actors')
     def get(payload, self, actor_id):
         """
@@ -90,6 +372,14 @@ class Actor(Resource):
         Returns:
             returns actor
         """
+        if is_conditional():
+            version = actor_service.get_actor_version(actor_id)
+            if version:
+                etag = make_etag('actor', version.id, version.version)
+                if not_modified(etag, version.updated_at):
+                    return Response(status=304, headers=validators(
+                        etag, version.updated_at))
+
         actor = actor_service.get_actor(actor_id)
 
         if not actor:
@@ -99,7 +389,9 @@ class Actor(Resource):
                 actor_id + " was not found"
             })
 
-        return actor.format()
+        etag = make_etag('actor', actor.id, actor.version)
+        return (_serialize_actor(actor), 200,
+                validators(etag, actor.updated_at))
 
     @api.doc('delete a actor by id')
     @requires_auth('delete:actor')
@@ -124,7 +416,7 @@ class Actor(Resource):
         return '', 204
 
     @api.doc('update a actor by id')
-    @api.marshal_with(_actor)
+    @api.response(200, 'Success', _actor)
     @requires_auth('update:actor')
     def patch(payload, self, actor_id):
         """
@@ -154,7 +446,44 @@ class Actor(Resource):
                 "status": 400,
                 "description": exc.error
             })
-        return updated_actor.format(), 200
+        return _serialize_actor(updated_actor), 200
+
+
+@api.route('/<actor_id>/movies')
+@api.param('actor_id', 'Actor identifier')
+class ActorMovies(Resource):
+    @api.doc('get the movies of an actor')
+    @api.response(200, 'Success', _casting_list)
+    @api.response(304, 'Not Modified')
+    @requires_auth('get:actors', 'get:movies')
+    def get(payload, self, actor_id):
+        """
+        get_actor_movies: fetches the movies an actor is cast in
+        Args:
+            actor_id (data type: int)
+        Returns:
+            returns the movies of the actor with their role
+        """
+        actor = actor_service.get_actor_version(actor_id)
+        if not actor:
+            raise NotFound({
+                "status": 404,
+                "description": "Actor with id " +
+                actor_id + " was not found"
+            })
+
+        movies = cast_service.get_castings([actor.id])[actor.id]
+        last_modified = max([actor.updated_at] +
+                            [row.updated_at for row in movies])
+        etag = make_etag('actor_movies', actor.id, actor.version,
+                         *[(row.id, row.version, row.role) for row in movies])
+        headers = validators(etag, last_modified)
+        if not_modified(etag, last_modified):
+            return Response(status=304, headers=headers)
+
+        return {
+            'movies': [_serialize_casting(row) for row in movies]
+        }, 200, headers
 
 
 @api.errorhandler(BadRequest)
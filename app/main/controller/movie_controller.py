@@ -1,48 +1,185 @@
 import app.main.service
-from flask import request
+from flask import request, Response, stream_with_context
 from flask_restplus import abort
 from sqlalchemy.exc import SQLAlchemyError
-from app.main.service import movie_service
+from app.main.service import movie_service, cast_service
 from app.main.exceptions import ValidationError
 from flask_restplus import Resource
+from ..util.conditional import (make_etag, validators, is_conditional,
+                                not_modified)
+from ..util.batch import parse_ids, batch_results
+from ..util.export import EXPORT_FORMATS, export_stream
+from ..util.ndjson import NDJSON_MIMETYPES, iter_ndjson
 from ..util.dto import MovieDto
 from werkzeug.exceptions import (BadRequest, NotFound, InternalServerError,
                                  Unauthorized, Forbidden, MethodNotAllowed)
-from app.main.auth.auth import requires_auth
+from app.main.auth.auth import requires_auth, check_permissions
 
 MOVIES_PER_PAGE = 10
+MAX_MOVIES_PER_PAGE = 100
+MAX_BULK_MOVIES = 10000
+MAX_BATCH_MOVIES = 1000
 api = MovieDto.api
 _movie = MovieDto.movie
+_movie_list = MovieDto.movie_list
+_serialize_movie = MovieDto.serialize_movie
+_validate_movie = MovieDto.validate_movie
+_bulk_result = MovieDto.bulk_result
+_batch_request = MovieDto.batch_request
+_batch_result = MovieDto.batch_result
+_cast = MovieDto.cast
+_cast_list = MovieDto.cast_list
+_serialize_cast_member = MovieDto.serialize_cast_member
 _error = MovieDto.error
 
 
+def _movies_by_ids(value):
+    """
+    _movies_by_ids: reads requested ids, loads their movies in one query
+    Returns:
+        returns the ids in request order and the row of each found id
+    """
+    try:
+        ids = parse_ids(value, MAX_BATCH_MOVIES)
+    except ValidationError as exc:
+        raise BadRequest({
+            "status": 400,
+            "description": exc.error
+        })
+    return ids, movie_service.get_movies_by_ids(ids)
+
+
+def _batch_body(ids, movies):
+    results = batch_results(ids, movies, _serialize_movie, 'Movie')
+    found = sum(1 for result in results if result['status'] == 200)
+    return {
+        'found': found,
+        'not_found': len(results) - found,
+        'results': results
+    }
+
+
 @api.route('/')
 class MovieList(Resource):
-    @api.doc('list_of_movies')
-    @api.marshal_list_with(_movie, envelope='movies')
+    @api.doc('list_of_movies', params={
+        'page': 'page number, ignored when a cursor is given',
+        'cursor': 'opaque cursor from next_cursor, empty for the first page',
+        'limit': 'movies per page in cursor mode, at most ' +
+                 str(MAX_MOVIES_PER_PAGE),
+        'include_total': 'true to include the (approximate) movie count',
+        'title': 'movies whose title starts with this, any case',
+        'title_contains': 'movies whose title contains this, any case',
+        'q': 'full-text search of titles, matching every word',
+        'release_date_from': 'movies released on or after, YYYY-MM-DD',
+        'release_date_to': 'movies released on or before, YYYY-MM-DD',
+        'embed': 'cast to include the actors of each movie with their role',
+        'ids': 'comma separated movie ids to read in one batch, at most ' +
+               str(MAX_BATCH_MOVIES)
+    })
+    @api.response(200, 'Success', _movie_list)
+    @api.response(304, 'Not Modified')
     @requires_auth('get:movies')
     def get(payload, self):
         """
         get_movies: fetches movies
         Args:
             page (data type: int)
+            cursor (data type: str) optional
+            limit (data type: int) optional
+            include_total (data type: bool) optional
+            title, title_contains, q (data type: str) optional
+            release_date_from, release_date_to (data type: str) optional
+            embed (data type: str) optional
+            ids (data type: str) optional
         Returns:
-            returns an array of movies
+            returns an array of movies and whether a next page exists, or
+            with ids, one result per id in request order
         """
 
-        page = request.args.get('page', 1, type=int)
-        moviesPagination = (movie_service.
-                            get_movies(page, MOVIES_PER_PAGE))
-        movies = moviesPagination.items
-        formatted_movies = [movie.format() for movie in movies]
+        if 'ids' in request.args:
+            # a batch read ignores paging, filters and embeds
+            ids, movies = _movies_by_ids(request.args['ids'])
+            etag = make_etag('movies;ids', *[
+                (movie_id, getattr(movies.get(movie_id), 'version', None))
+                for movie_id in ids])
+            last_modified = max((movie.updated_at for movie in movies.values()
+                                 if movie), default=None)
+            headers = validators(etag, last_modified)
+            if not_modified(etag, last_modified):
+                return Response(status=304, headers=headers)
+            return _batch_body(ids, movies), 200, headers
+
+        include_total = (request.args.get('include_total', '').lower() ==
+                         'true')
+        embed = request.args.get('embed')
+        if embed not in (None, 'cast'):
+            raise BadRequest({
+                "status": 400,
+                "description": "embed should be cast"
+            })
+        if embed:
+            check_permissions('get:actors', payload)
+        filters = movie_service.movie_filters(request.args)
+        try:
+            if 'cursor' in request.args:
+                limit = request.args.get('limit', MOVIES_PER_PAGE, type=int)
+                if not 0 < limit <= MAX_MOVIES_PER_PAGE:
+                    raise BadRequest({
+                        "status": 400,
+                        "description": "limit should be between 1 and " +
+                        str(MAX_MOVIES_PER_PAGE)
+                    })
+                moviesPage = movie_service.get_movies_after(
+                    request.args['cursor'], limit, include_total,
+                    filters=filters)
+                location = "after the given cursor"
+            else:
+                page = request.args.get('page', 1, type=int)
+                moviesPage = movie_service.get_movies(
+                    page, MOVIES_PER_PAGE, include_total, filters=filters)
+                location = "on page " + str(page)
+        except ValidationError as exc:
+            raise BadRequest({
+                "status": 400,
+                "description": exc.error
+            })
+        movies = moviesPage.items
 
         if not len(movies):
             raise NotFound({
                 "status": 404,
-                "description": "No movies were found on page " + str(page)
+                "description": "No movies were found " + location
             })
 
-        return formatted_movies
+        # the cast of the whole page is loaded in one query
+        casts, cast_rows = {}, []
+        if embed:
+            casts = cast_service.get_casts([movie.id for movie in movies])
+            cast_rows = [row for movie in movies for row in casts[movie.id]]
+
+        last_modified = max([movie.updated_at for movie in movies] +
+                            [row.updated_at for row in cast_rows])
+        etag = make_etag('movies', 'cast' if embed else None,
+                         moviesPage.has_next, moviesPage.next_cursor,
+                         moviesPage.total,
+                         *[(movie.id, movie.version) for movie in movies],
+                         *[('cast', row.movie_id, row.id, row.version,
+                            row.role) for row in cast_rows])
+        headers = validators(etag, last_modified)
+        if not_modified(etag, last_modified):
+            return Response(status=304, headers=headers)
+
+        formatted_movies = [_serialize_movie(movie) for movie in movies]
+        if embed:
+            for movie, formatted in zip(movies, formatted_movies):
+                formatted['cast'] = [_serialize_cast_member(row)
+                                     for row in casts[movie.id]]
+        return {
+            'movies': formatted_movies,
+            'has_next': moviesPage.has_next,
+            'next_cursor': moviesPage.next_cursor,
+            'total': moviesPage.total
+        }, 200, headers
 
     @api.doc('create a new movie')
     @api.expect(_movie, validate=True)
@@ -74,11 +211,113 @@ class MovieList(Resource):
         return movie.format(), 201
 
 
+@api.route('/bulk')
+class MovieBulk(Resource):
+    @api.doc('create movies in bulk')
+    @api.expect([_movie])
+    @api.response(200, 'Success', _bulk_result)
+    @requires_auth('create:movie')
+    def post(payload, self):
+        """
+        create_movies: creates movies from a JSON array of at most
+        10000 items, or from an NDJSON stream of any length
+        (Content-Type: application/x-ndjson)
+        Returns:
+            returns one result per item, in request order
+        """
+        if request.mimetype in NDJSON_MIMETYPES:
+            items = iter_ndjson(request.stream)
+        else:
+            items = request.get_json(silent=True)
+            if not isinstance(items, list):
+                raise BadRequest({
+                    "status": 400,
+                    "description": "body should be a JSON array or NDJSON"
+                })
+            if len(items) > MAX_BULK_MOVIES:
+                raise BadRequest({
+                    "status": 400,
+                    "description": "at most " + str(MAX_BULK_MOVIES) +
+                    " movies can be sent as a JSON array, use NDJSON"
+                })
+
+        results = movie_service.post_movies(items, _validate_movie)
+        created = sum(1 for result in results if result['status'] == 201)
+        return {
+            'created': created,
+            'failed': len(results) - created,
+            'results': results
+        }, 200
+
+
+@api.route('/batch')
+class MovieBatch(Resource):
+    @api.doc('get movies by ids')
+    @api.expect(_batch_request)
+    @api.response(200, 'Success', _batch_result)
+    @requires_auth('get:movies')
+    def post(payload, self):
+        """
+        get_movies_by_ids: fetches the movies of a list of ids too long
+        for the query string of GET /movies/?ids=
+        Args:
+            ids (data type: list)
+        Returns:
+            returns one result per id, in request order
+        """
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            raise BadRequest({
+                "status": 400,
+                "description": "body should be a JSON object"
+            })
+        ids, movies = _movies_by_ids(body.get('ids'))
+        return _batch_body(ids, movies), 200
+
+
+@api.route('/export')
+class MovieExport(Resource):
+    @api.doc('export all movies', params={
+        'format': 'ndjson (default) or csv'
+    })
+    @api.produces(list(EXPORT_FORMATS.values()))
+    @requires_auth('get:movies')
+    def get(payload, self):
+        """
+        export_movies: streams every movie, gzipped if the client accepts it
+        Args:
+            format (data type: str) optional
+        Returns:
+            returns the movies as NDJSON or CSV
+        """
+        export_format = request.args.get('format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            raise BadRequest({
+                "status": 400,
+                "description": "format should be one of " +
+                ", ".join(sorted(EXPORT_FORMATS))
+            })
+        compress = 'gzip' in request.accept_encodings
+
+        chunks = export_stream(movie_service.export_movies(),
+                               _serialize_movie, list(_movie.keys()),
+                               export_format, compress)
+        response = Response(stream_with_context(chunks),
+                            mimetype=EXPORT_FORMATS[export_format])
+        response.headers['Content-Disposition'] = (
+            'attachment; filename=movies.' + export_format)
+        response.vary.add('Accept-Encoding')
+        if compress:
+            response.headers['Content-Encoding'] = 'gzip'
+        return response
+
+
 @api.route('/<movie_id>')
 @api.param('movie_id', 'Movie identifier')
 class Movie(Resource):
     @api.doc('get a movie by id')
-    @api.marshal_with(_movie)
+    @api.response(200, 'Success', _movie)
+    @api.response(304, 'Not Modified')
     @requires_auth('get:movies')
     def get(payload, self, movie_id):
         """
@@ -88,6 +327,14 @@ class Movie(Resource):
         Returns:
             returns movie
         """
+        if is_conditional():
+            version = movie_service.get_movie_version(movie_id)
+            if version:
+                etag = make_etag('movie', version.id, version.version)
+                if not_modified(etag, version.updated_at):
+                    return Response(status=304, headers=validators(
+                        etag, version.updated_at))
+
         movie = movie_service.get_movie(movie_id)
 
         if not movie:
@@ -97,7 +344,9 @@ class Movie(Resource):
                 movie_id + " was not found"
             })
 
-        return movie.format()
+        etag = make_etag('movie', movie.id, movie.version)
+        return (_serialize_movie(movie), 200,
+                validators(etag, movie.updated_at))
   
     @api.doc('delete a movie by id')
     @requires_auth('delete:movie')
@@ -122,7 +371,7 @@ class Movie(Resource):
         return '', 204
 
     @api.doc('update a movie by id')
-    @api.marshal_with(_movie)
+    @api.response(200, 'Success', _movie)
     @requires_auth('update:movie')
     def patch(payload, self, movie_id):
         """
@@ -151,7 +400,100 @@ class Movie(Resource):
                 "status": 400,
                 "description": exc.error
             })
-        return updated_movie.format(), 200
+        return _serialize_movie(updated_movie), 200
+
+
+@api.route('/<movie_id>/actors')
+@api.param('movie_id', 'Movie identifier')
+class MovieCast(Resource):
+    @api.doc('get the cast of a movie')
+    @api.response(200, 'Success', _cast_list)
+    @api.response(304, 'Not Modified')
+    @requires_auth('get:movies', 'get:actors')
+    def get(payload, self, movie_id):
+        """
+        get_movie_cast: fetches the actors cast in a movie
+        Args:
+            movie_id (data type: int)
+        Returns:
+            returns the actors of the movie with their role
+        """
+        movie = movie_service.get_movie_version(movie_id)
+        if not movie:
+            raise NotFound({
+                "status": 404,
+                "description": "Movie with id " +
+                movie_id + " was not found"
+            })
+
+        cast = cast_service.get_casts([movie.id])[movie.id]
+        last_modified = max([movie.updated_at] +
+                            [row.updated_at for row in cast])
+        etag = make_etag('movie_cast', movie.id, movie.version,
+                         *[(row.id, row.version, row.role) for row in cast])
+        headers = validators(etag, last_modified)
+        if not_modified(etag, last_modified):
+            return Response(status=304, headers=headers)
+
+        return {
+            'actors': [_serialize_cast_member(row) for row in cast]
+        }, 200, headers
+
+
+@api.route('/<movie_id>/actors/<actor_id>')
+@api.param('movie_id', 'Movie identifier')
+@api.param('actor_id', 'Actor identifier')
+class MovieCastMember(Resource):
+    @api.doc('cast an actor in a movie')
+    @api.expect(_cast)
+    @api.response(200, 'Success', _cast)
+    @requires_auth('update:movie')
+    def put(payload, self, movie_id, actor_id):
+        """
+        cast_actor: casts an actor in a movie, or changes their role
+        Args:
+            role (data type: str)
+        Returns:
+            returns the cast
+        """
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            raise BadRequest({
+                "status": 400,
+                "description": "body should be a JSON object"
+            })
+
+        try:
+            cast = cast_service.cast_actor(movie_id, actor_id,
+                                           body.get('role'))
+        except ValidationError as exc:
+            raise BadRequest({
+                "status": 400,
+                "description": exc.error
+            })
+        if not cast:
+            raise NotFound({
+                "status": 404,
+                "description": "Movie with id " + movie_id +
+                " or actor with id " + actor_id + " was not found"
+            })
+        return api.marshal(cast, _cast), 200
+
+    @api.doc('remove an actor from the cast of a movie')
+    @requires_auth('update:movie')
+    def delete(payload, self, movie_id, actor_id):
+        """
+        uncast_actor: removes an actor from the cast of a movie
+        Returns:
+            returns success if the actor was cast in the movie
+        """
+        if not cast_service.uncast_actor(movie_id, actor_id):
+            raise NotFound({
+                "status": 404,
+                "description": "Actor with id " + actor_id +
+                " is not cast in movie with id " + movie_id
+            })
+        return '', 204
 
 
 @api.errorhandler(BadRequest)
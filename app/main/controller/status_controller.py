@@ -0,0 +1,22 @@
+from flask_restplus import Resource
+from app.main.auth.auth import requires_auth
+from ..util.dto import StatusDto
+from ..util.pool_metrics import pool_metrics
+
+api = StatusDto.api
+_pool = StatusDto.pool
+
+
+@api.route('/pool')
+class PoolStatus(Resource):
+    @api.doc('database connection pool metrics')
+    @api.marshal_with(_pool)
+    @requires_auth('get:status')
+    def get(payload, self):
+        """
+        get_pool_status: reports the connection pool of this worker
+        Returns:
+            returns pool gauges, overflow and timeout counts, and the
+            checkout wait histogram
+        """
+        return pool_metrics.stats(), 200
@@ -1,5 +1,6 @@
 from .. import db
-from sqlalchemy import Column, String, Integer, DateTime, Enum
+from sqlalchemy import (func, text, Column, String, Integer, DateTime, Enum,
+                        Index)
 from app.main.exceptions import ValidationError
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime
@@ -13,26 +14,55 @@ class Gender(enum.Enum):
 
 class Actor(db.Model):
     __tablename__ = 'actors'
+    __table_args__ = (
+        Index('ix_actors_name_id', 'name', 'id'),
+        Index('ix_actors_gender_age', 'gender', 'age'),
+        Index('ix_actors_gender_name_id', 'gender', 'name', 'id'),
+        Index('ix_actors_age', 'age'),
+    )
 
     _id = Column("id", Integer, primary_key=True)
     _name = Column("name", String(120), nullable=False)
     _age = Column("age", Integer, nullable=False)
     _gender = Column("gender", Enum(Gender), nullable=False)
+    _updated_at = Column("updated_at", DateTime(), nullable=False,
+                         default=datetime.utcnow, onupdate=datetime.utcnow,
+                         server_default=func.now())
+    _version = Column("version", Integer, nullable=False,
+                      server_default=text('1'))
+
+    __mapper_args__ = {'version_id_col': _version}
 
     def __init__(self, name, age, gender):
         self.name = name
         self.age = age
         self.gender = gender
 
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def version(self):
+        return self._version
+
+    @property
+    def updated_at(self):
+        return self._updated_at
+
     @property
     def name(self):
         return self._name
 
     @name.setter
     def name(self, name):
+        self._name = self.validate_name(name)
+
+    @staticmethod
+    def validate_name(name):
         if not name:
             raise ValidationError('name cannot be empty.')
-        self._name = name
+        return name
 
     @property
     def age(self):
@@ -40,9 +70,13 @@ class Actor(db.Model):
 
     @age.setter
     def age(self, age):
+        self._age = self.validate_age(age)
+
+    @staticmethod
+    def validate_age(age):
         if not age:
             raise ValidationError("age cannot be empty")
-        self._age = age
+        return age
 
     @property
     def gender(self):
@@ -50,40 +84,40 @@ class Actor(db.Model):
 
     @gender.setter
     def gender(self, gender):
+        self._gender = self.validate_gender(gender)
+
+    @staticmethod
+    def validate_gender(gender):
         if not gender:
             raise ValidationError("gender cannot be empty")
         if gender not in Gender.__members__:
             raise ValidationError("gender is either MALE or FEMALE")
-        self._gender = gender
+        return gender
 
+    # the statements are flushed in the request's unit of work, which
+    # commits once the response is ready
     def insert(self):
         try:
             db.session.add(self)
-            db.session.commit()
+            db.session.flush()
         except SQLAlchemyError:
             db.session.rollback()
             raise
-        finally:
-            db.session.close()
 
     def update(self):
         try:
-            db.session.commit()
+            db.session.flush()
         except SQLAlchemyError:
             db.session.rollback()
             raise
-        finally:
-            db.session.close()
 
     def delete(self):
         try:
             db.session.delete(self)
-            db.session.commit()
+            db.session.flush()
         except SQLAlchemyError:
             db.session.rollback()
             raise
-        finally:
-            db.session.close()
 
     def format(self):
         return {
@@ -0,0 +1,26 @@
+from .. import db
+from sqlalchemy import Column, String, Integer, ForeignKey, Index
+from app.main.exceptions import ValidationError
+
+
+class Cast(db.Model):
+    """an actor cast in a movie, in a role"""
+    __tablename__ = 'casts'
+    __table_args__ = (
+        # the primary key serves lookups by movie
+        Index('ix_casts_actor_id', 'actor_id'),
+    )
+
+    movie_id = Column(Integer, ForeignKey('movies.id', ondelete='CASCADE'),
+                      primary_key=True)
+    actor_id = Column(Integer, ForeignKey('actors.id', ondelete='CASCADE'),
+                      primary_key=True)
+    role = Column(String(120), nullable=False)
+
+    @staticmethod
+    def validate_role(role):
+        if not role:
+            raise ValidationError('role cannot be empty.')
+        if not isinstance(role, str):
+            raise ValidationError('role should be a string.')
+        return role
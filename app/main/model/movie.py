@@ -1,30 +1,68 @@
 from .. import db
-from sqlalchemy import Column, String, Integer, DateTime
+from sqlalchemy import (event, func, text, Column, String, Integer, DateTime,
+                        Index, DDL)
 from app.main.exceptions import ValidationError
 from sqlalchemy.exc import SQLAlchemyError
 from datetime import datetime
 
+# indexes of title searches, PostgreSQL only; keep in step with the
+# 9b1e4d6c2a7f migration
+SEARCH_INDEXES = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX ix_movies_title_trgm ON movies '
+    'USING gin (title gin_trgm_ops)',
+    "CREATE INDEX ix_movies_title_tsv ON movies "
+    "USING gin (to_tsvector('english', title))",
+]
+
 
 class Movie(db.Model):
     __tablename__ = 'movies'
+    __table_args__ = (
+        Index('ix_movies_title_id', 'title', 'id'),
+        Index('ix_movies_release_date', 'release_date'),
+    )
 
     _id = Column("id", Integer, primary_key=True)
     _title = Column("title", String(120), nullable=False)
     _release_date = Column("release_date", DateTime(), nullable=False)
+    _updated_at = Column("updated_at", DateTime(), nullable=False,
+                         default=datetime.utcnow, onupdate=datetime.utcnow,
+                         server_default=func.now())
+    _version = Column("version", Integer, nullable=False,
+                      server_default=text('1'))
+
+    __mapper_args__ = {'version_id_col': _version}
 
     def __init__(self, title, release_date):
         self.title = title
         self.release_date = release_date
 
+    @property
+    def id(self):
+        return self._id
+
+    @property
+    def version(self):
+        return self._version
+
+    @property
+    def updated_at(self):
+        return self._updated_at
+
     @property
     def title(self):
         return self._title
 
     @title.setter
     def title(self, title):
+        self._title = self.validate_title(title)
+
+    @staticmethod
+    def validate_title(title):
         if not title:
             raise ValidationError('title cannot be empty.')
-        self._title = title
+        return title
 
     @property
     def release_date(self):
@@ -32,43 +70,41 @@ class Movie(db.Model):
 
     @release_date.setter
     def release_date(self, release_date):
+        self._release_date = self.validate_release_date(release_date)
+
+    @staticmethod
+    def validate_release_date(release_date):
         if not release_date:
             raise ValidationError("release date cannot be empty")
         try:
-            datetime.strptime(release_date, '%Y-%m-%d')
-        except ValueError:
+            return datetime.strptime(release_date, '%Y-%m-%d')
+        except (TypeError, ValueError):
             raise ValidationError('release_date format should be YYYY-MM-DD')
 
-        self._release_date = release_date
-
+    # the statements are flushed in the request's unit of work, which
+    # commits once the response is ready
     def insert(self):
         try:
             db.session.add(self)
-            db.session.commit()
+            db.session.flush()
         except SQLAlchemyError:
             db.session.rollback()
             raise
-        finally:
-            db.session.close()
 
     def update(self):
         try:
-            db.session.commit()
+            db.session.flush()
         except SQLAlchemyError:
             db.session.rollback()
             raise
-        finally:
-            db.session.close()
 
     def delete(self):
         try:
             db.session.delete(self)
-            db.session.commit()
+            db.session.flush()
         except SQLAlchemyError:
             db.session.rollback()
             raise
-        finally:
-            db.session.close()
 
     def format(self):
         return {
@@ -76,3 +112,8 @@ class Movie(db.Model):
           'title': self._title,
           'release_date': self._release_date
         }
+
+
+for statement in SEARCH_INDEXES:
+    event.listen(Movie.__table__, 'after_create',
+                 DDL(statement).execute_if(dialect='postgresql'))
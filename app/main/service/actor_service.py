@@ -1,16 +1,183 @@
 import datetime
+from collections import namedtuple
+
+from sqlalchemy import func, literal_column
 
 from app.main import db
-from app.main.model.actor import Actor
+from app.main.exceptions import ValidationError
+from app.main.model.actor import Actor, Gender
+from app.main.util.batch import id_in
+from app.main.util.bulk import bulk_insert
+from app.main.util.cache import cache
+from app.main.util.export import EXPORT_BATCH_SIZE
+from app.main.util.pagination import (paginate_keyset, paginate_offset,
+                                      count_rows, count_matches)
+from app.main.util.unit_of_work import unit_of_work
+
+# columns read by the list endpoints, loaded as plain rows instead of
+# Actor instances
+ACTOR_COLUMNS = (
+    Actor._id.label('id'),
+    Actor._name.label('name'),
+    Actor._age.label('age'),
+    Actor._gender.label('gender'),
+    Actor._version.label('version'),
+    Actor._updated_at.label('updated_at')
+)
+
+# query parameters filtering the actor list and stats: a gender and an
+# inclusive age range. A gender's list pages are read in order from the
+# (gender, name, id) index, age ranges and stats from the (gender, age)
+# and age indexes
+ActorFilters = namedtuple('ActorFilters', ['gender', 'min_age', 'max_age'],
+                          defaults=(None,) * 3)
+
+
+def actor_filters(args):
+    """
+    actor_filters: reads the actor filters from query parameters
+    Args:
+        args (data type: dict)
+    Returns:
+        returns ActorFilters, or None when no filter is given
+    """
+    filters = ActorFilters(**{name: args.get(name) or None
+                              for name in ActorFilters._fields})
+    return filters if any(filters) else None
+
+
+def _age_filter(name, value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValidationError(name + ' should be an integer')
+
+
+def _filter(query, filters):
+    if filters is None:
+        return query
+    if filters.gender:
+        query = query.filter(
+            Actor._gender == Gender[Actor.validate_gender(filters.gender)])
+    if filters.min_age:
+        query = query.filter(
+            Actor._age >= _age_filter('min_age', filters.min_age))
+    if filters.max_age:
+        query = query.filter(
+            Actor._age <= _age_filter('max_age', filters.max_age))
+    return query
+
+
+def _total(query, filters):
+    if filters is None:
+        return count_rows(Actor.__table__)
+    return count_matches(query)
+
+
+@cache.listing('actors')
+def get_actors(page, per_page, include_total=False, filters=None):
+    query = _filter(Actor.query.with_entities(*ACTOR_COLUMNS), filters)
+    result = paginate_offset(
+        query.order_by(Actor._name.desc(), Actor._id.desc()),
+        page, per_page)
+    if include_total:
+        result = result._replace(total=_total(query, filters))
+    return result
+
+
+@cache.listing('actors')
+def get_actors_after(cursor, limit, include_total=False, filters=None):
+    query = _filter(Actor.query.with_entities(*ACTOR_COLUMNS), filters)
+    result = paginate_keyset(query, [Actor._name, Actor._id], cursor,
+                             limit, keys=['name', 'id'])
+    if include_total:
+        result = result._replace(total=_total(query, filters))
+    return result
+
+
+@cache.listing('actors')
+def get_actor_stats(bucket_size, filters=None):
+    """
+    get_actor_stats: counts actors and their ages by gender in a single
+    grouped query over the (gender, age) index
+    Args:
+        bucket_size (data type: int) years per age histogram bucket
+        filters (data type: ActorFilters) optional
+    Returns:
+        returns the total and, for every gender, the count, age range,
+        average age and age histogram
+    """
+    # a literal, so the grouped and selected expressions are the same SQL
+    size = literal_column(str(int(bucket_size)))
+    bucket = (Actor._age / size) * size
+    rows = _filter(Actor.query.with_entities(
+        Actor._gender.label('gender'),
+        bucket.label('bucket'),
+        func.count().label('count'),
+        func.min(Actor._age).label('min_age'),
+        func.max(Actor._age).label('max_age'),
+        func.sum(Actor._age).label('age_sum')
+    ), filters).group_by(Actor._gender, bucket).order_by(bucket).all()
+
+    genders = {gender.name: {
+        'count': 0, 'min_age': None, 'max_age': None, 'average_age': None,
+        'ages': []
+    } for gender in Gender}
+    age_sums = dict.fromkeys(genders, 0)
+    for row in rows:
+        stats = genders[row.gender.name]
+        stats['count'] += row.count
+        # buckets come in age order
+        if stats['min_age'] is None:
+            stats['min_age'] = row.min_age
+        stats['max_age'] = row.max_age
+        stats['ages'].append({
+            'from': row.bucket,
+            'to': row.bucket + bucket_size - 1,
+            'count': row.count
+        })
+        age_sums[row.gender.name] += row.age_sum
+    for name, stats in genders.items():
+        if stats['count']:
+            stats['average_age'] = round(age_sums[name] / stats['count'], 1)
 
+    return {
+        'total': sum(stats['count'] for stats in genders.values()),
+        'bucket_size': bucket_size,
+        'genders': genders
+    }
 
-def get_actors(page, per_page):
-    return (Actor.query.order_by(Actor._name.desc()).
-            paginate(page, per_page, error_out=False))
 
+def export_actors():
+    # yield_per streams the rows from a server-side cursor, so memory
+    # stays flat however many actors there are
+    return (Actor.query.with_entities(*ACTOR_COLUMNS).
+            order_by(Actor._id).
+            execution_options(stream_results=True).
+            yield_per(EXPORT_BATCH_SIZE))
 
+
+@cache.item('actors')
 def get_actor(actor_id):
-    return Actor.query.get(actor_id)
+    return (Actor.query.with_entities(*ACTOR_COLUMNS).
+            filter(Actor._id == actor_id).first())
+
+
+@cache.items('actors', get_actor)
+def get_actors_by_ids(actor_ids):
+    # one query for every id not found in the cache
+    rows = (Actor.query.with_entities(*ACTOR_COLUMNS).
+            filter(id_in(Actor._id, actor_ids)))
+    return {row.id: row for row in rows}
+
+
+@cache.item('actors')
+def get_actor_version(actor_id):
+    return (Actor.query.
+            with_entities(Actor._id.label('id'),
+                          Actor._version.label('version'),
+                          Actor._updated_at.label('updated_at')).
+            filter(Actor._id == actor_id).first())
 
 
 def post_actor(name, age, gender):
@@ -20,22 +187,81 @@ def post_actor(name, age, gender):
         gender=gender,
     )
     actor.insert()
+    unit_of_work.on_commit(cache.invalidate, 'actors', actor.id)
     return actor
 
 
+def _actor_row(item):
+    actor = Actor(
+        name=item.get('name'),
+        age=item.get('age'),
+        gender=item.get('gender')
+    )
+    return {
+        'name': actor.name,
+        'age': actor.age,
+        'gender': actor.gender
+    }
+
+
+def post_actors(items, validate_item=None):
+    results = bulk_insert(items, _actor_row, Actor.__table__,
+                          validate_item)
+    cache.invalidate('actors', *[result['id'] for result in results
+                                 if 'id' in result])
+    return results
+
+
 def delete_actor(actor_id):
-    actor = Actor.query.get(actor_id)
+    if db.engine.dialect.name == 'postgresql':
+        table = Actor.__table__
+        actor = unit_of_work.execute(
+            table.delete().
+            where(table.c.id == actor_id).
+            returning(table.c.id)).first()
+    else:
+        actor = Actor.query.get(actor_id)
+        if actor:
+            actor.delete()
     if actor:
-        actor.delete()
+        unit_of_work.on_commit(cache.invalidate, 'actors', actor_id)
     return actor
 
 
 def update_actor(actor_id, name, age, gender):
+    if db.engine.dialect.name == 'postgresql':
+        return _update_actor_returning(actor_id, name, age, gender)
+
     actor = Actor.query.get(actor_id)
     if actor:
         actor.name = name or actor.name
         actor.age = age or actor.age
         actor.gender = gender or actor.gender.name
         actor.update()
+        unit_of_work.on_commit(cache.invalidate, 'actors', actor_id)
 
     return actor
+
+
+def _update_actor_returning(actor_id, name, age, gender):
+    # one UPDATE ... RETURNING instead of loading the actor first; the
+    # version is bumped here as the ORM would for version_id_col
+    values = {}
+    if name:
+        values['name'] = Actor.validate_name(name)
+    if age:
+        values['age'] = Actor.validate_age(age)
+    if gender:
+        values['gender'] = Actor.validate_gender(gender)
+    if not values:
+        return get_actor(actor_id)
+
+    table = Actor.__table__
+    actor = unit_of_work.execute(
+        table.update().
+        where(table.c.id == actor_id).
+        values(version=table.c.version + 1, **values).
+        returning(*table.c)).first()
+    if actor:
+        unit_of_work.on_commit(cache.invalidate, 'actors', actor_id)
+    return actor
@@ -0,0 +1,114 @@
+from collections import defaultdict
+
+from app.main import db
+from app.main.model.actor import Actor
+from app.main.model.cast import Cast
+from app.main.model.movie import Movie
+from app.main.service.actor_service import ACTOR_COLUMNS
+from app.main.service.movie_service import MOVIE_COLUMNS
+from app.main.util.cache import cache
+from app.main.util.unit_of_work import unit_of_work
+
+# the cast of a movie: its actors' list columns plus their role
+CAST_COLUMNS = ACTOR_COLUMNS + (Cast.movie_id, Cast.role)
+
+# the movies of an actor: their list columns plus the actor's role
+CASTING_COLUMNS = MOVIE_COLUMNS + (Cast.actor_id, Cast.role)
+
+
+def get_casts(movie_ids):
+    """
+    get_casts: loads the cast of several movies in one query, however
+    many movies and actors there are
+    Args:
+        movie_ids (data type: list)
+    Returns:
+        returns the cast rows of each movie id, ordered by actor name
+    """
+    casts = defaultdict(list)
+    if movie_ids:
+        rows = (db.session.query(*CAST_COLUMNS).
+                join(Actor, Actor._id == Cast.actor_id).
+                filter(Cast.movie_id.in_(movie_ids)).
+                order_by(Actor._name, Actor._id))
+        for row in rows:
+            casts[row.movie_id].append(row)
+    return casts
+
+
+def get_castings(actor_ids):
+    """
+    get_castings: loads the movies of several actors in one query
+    Args:
+        actor_ids (data type: list)
+    Returns:
+        returns the movie rows of each actor id, ordered by release date
+    """
+    castings = defaultdict(list)
+    if actor_ids:
+        rows = (db.session.query(*CASTING_COLUMNS).
+                join(Movie, Movie._id == Cast.movie_id).
+                filter(Cast.actor_id.in_(actor_ids)).
+                order_by(Movie._release_date, Movie._id))
+        for row in rows:
+            castings[row.actor_id].append(row)
+    return castings
+
+
+def _touch(model, item_id):
+    # a cast change is a change of both the movie and the actor, so
+    # their versions, ETags and cached copies move on with it
+    table = model.__table__
+    return unit_of_work.execute(
+        table.update().
+        where(table.c.id == item_id).
+        values(version=table.c.version + 1)).rowcount
+
+
+def _invalidate(movie_id, actor_id):
+    unit_of_work.on_commit(cache.invalidate, 'movies', movie_id)
+    unit_of_work.on_commit(cache.invalidate, 'actors', actor_id)
+
+
+def cast_actor(movie_id, actor_id, role):
+    """
+    cast_actor: casts an actor in a movie, or changes their role
+    Returns:
+        returns the cast, or None if the movie or actor does not exist
+    """
+    role = Cast.validate_role(role)
+    if not _touch(Movie, movie_id) or not _touch(Actor, actor_id):
+        return None
+
+    table = Cast.__table__
+    match = (table.c.movie_id == movie_id) & (table.c.actor_id == actor_id)
+    if not unit_of_work.execute(
+            table.update().where(match).values(role=role)).rowcount:
+        unit_of_work.execute(table.insert().values(
+            movie_id=movie_id, actor_id=actor_id, role=role))
+    _invalidate(movie_id, actor_id)
+    return Cast(movie_id=movie_id, actor_id=actor_id, role=role)
+
+
+def uncast_actor(movie_id, actor_id):
+    """
+    uncast_actor: removes an actor from the cast of a movie
+    Returns:
+        returns True if the actor was cast in the movie
+    """
+    # rows are locked movie, actor, then cast, in the order cast_actor
+    # locks them, so concurrent cast changes cannot deadlock; when
+    # nothing is deleted the request answers 404 and the touches are
+    # rolled back
+    if not _touch(Movie, movie_id) or not _touch(Actor, actor_id):
+        return False
+
+    table = Cast.__table__
+    if not unit_of_work.execute(
+            table.delete().
+            where(table.c.movie_id == movie_id).
+            where(table.c.actor_id == actor_id)).rowcount:
+        return False
+
+    _invalidate(movie_id, actor_id)
+    return True
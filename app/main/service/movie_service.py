@@ -1,16 +1,130 @@
 import datetime
+from collections import namedtuple
 
 from app.main import db
+from app.main.exceptions import ValidationError
 from app.main.model.movie import Movie
+from app.main.util.batch import id_in
+from app.main.util.bulk import bulk_insert
+from app.main.util.cache import cache
+from app.main.util.export import EXPORT_BATCH_SIZE
+from app.main.util.pagination import (paginate_keyset, paginate_offset,
+                                      count_rows, count_matches)
+from app.main.util.search import starts_with, contains, matches
+from app.main.util.unit_of_work import unit_of_work
 
+# columns read by the list endpoints, loaded as plain rows instead of
+# Movie instances
+MOVIE_COLUMNS = (
+    Movie._id.label('id'),
+    Movie._title.label('title'),
+    Movie._release_date.label('release_date'),
+    Movie._version.label('version'),
+    Movie._updated_at.label('updated_at')
+)
 
-def get_movies(page, per_page):
-    return (Movie.query.order_by(Movie._title.desc()).
-            paginate(page, per_page, error_out=False))
+# query parameters filtering the movie list: a title prefix, a title
+# substring, full-text search words and an inclusive release date range
+MovieFilters = namedtuple('MovieFilters', [
+    'title', 'title_contains', 'q', 'release_date_from', 'release_date_to'
+], defaults=(None,) * 5)
 
 
+def movie_filters(args):
+    """
+    movie_filters: reads the movie list filters from query parameters
+    Args:
+        args (data type: dict)
+    Returns:
+        returns MovieFilters, or None when no filter is given
+    """
+    filters = MovieFilters(**{name: args.get(name) or None
+                              for name in MovieFilters._fields})
+    return filters if any(filters) else None
+
+
+def _date_filter(name, value):
+    try:
+        return Movie.validate_release_date(value)
+    except ValidationError:
+        raise ValidationError(name + ' format should be YYYY-MM-DD')
+
+
+def _filter(query, filters):
+    if filters is None:
+        return query
+    if filters.title:
+        query = query.filter(starts_with(Movie._title, filters.title))
+    if filters.title_contains:
+        query = query.filter(contains(Movie._title, filters.title_contains))
+    if filters.q and filters.q.split():
+        query = query.filter(matches(Movie._title, filters.q))
+    if filters.release_date_from:
+        query = query.filter(Movie._release_date >= _date_filter(
+            'release_date_from', filters.release_date_from))
+    if filters.release_date_to:
+        query = query.filter(Movie._release_date <= _date_filter(
+            'release_date_to', filters.release_date_to))
+    return query
+
+
+def _total(query, filters):
+    if filters is None:
+        return count_rows(Movie.__table__)
+    return count_matches(query)
+
+
+@cache.listing('movies')
+def get_movies(page, per_page, include_total=False, filters=None):
+    query = _filter(Movie.query.with_entities(*MOVIE_COLUMNS), filters)
+    result = paginate_offset(
+        query.order_by(Movie._title.desc(), Movie._id.desc()),
+        page, per_page)
+    if include_total:
+        result = result._replace(total=_total(query, filters))
+    return result
+
+
+@cache.listing('movies')
+def get_movies_after(cursor, limit, include_total=False, filters=None):
+    query = _filter(Movie.query.with_entities(*MOVIE_COLUMNS), filters)
+    result = paginate_keyset(query, [Movie._title, Movie._id], cursor,
+                             limit, keys=['title', 'id'])
+    if include_total:
+        result = result._replace(total=_total(query, filters))
+    return result
+
+
+def export_movies():
+    # yield_per streams the rows from a server-side cursor, so memory
+    # stays flat however many movies there are
+    return (Movie.query.with_entities(*MOVIE_COLUMNS).
+            order_by(Movie._id).
+            execution_options(stream_results=True).
+            yield_per(EXPORT_BATCH_SIZE))
+
+
+@cache.item('movies')
 def get_movie(movie_id):
-    return Movie.query.get(movie_id)
+    return (Movie.query.with_entities(*MOVIE_COLUMNS).
+            filter(Movie._id == movie_id).first())
+
+
+@cache.items('movies', get_movie)
+def get_movies_by_ids(movie_ids):
+    # one query for every id not found in the cache
+    rows = (Movie.query.with_entities(*MOVIE_COLUMNS).
+            filter(id_in(Movie._id, movie_ids)))
+    return {row.id: row for row in rows}
+
+
+@cache.item('movies')
+def get_movie_version(movie_id):
+    return (Movie.query.
+            with_entities(Movie._id.label('id'),
+                          Movie._version.label('version'),
+                          Movie._updated_at.label('updated_at')).
+            filter(Movie._id == movie_id).first())
 
 
 def post_movie(title, release_date):
@@ -19,22 +133,77 @@ def post_movie(title, release_date):
         release_date=release_date,
     )
     movie.insert()
+    unit_of_work.on_commit(cache.invalidate, 'movies', movie.id)
     return movie
 
 
+def _movie_row(item):
+    movie = Movie(
+        title=item.get('title'),
+        release_date=item.get('release_date')
+    )
+    return {
+        'title': movie.title,
+        'release_date': movie.release_date
+    }
+
+
+def post_movies(items, validate_item=None):
+    results = bulk_insert(items, _movie_row, Movie.__table__,
+                          validate_item)
+    cache.invalidate('movies', *[result['id'] for result in results
+                                 if 'id' in result])
+    return results
+
+
 def delete_movie(movie_id):
-    movie = Movie.query.get(movie_id)
+    if db.engine.dialect.name == 'postgresql':
+        table = Movie.__table__
+        movie = unit_of_work.execute(
+            table.delete().
+            where(table.c.id == movie_id).
+            returning(table.c.id)).first()
+    else:
+        movie = Movie.query.get(movie_id)
+        if movie:
+            movie.delete()
     if movie:
-        movie.delete()
+        unit_of_work.on_commit(cache.invalidate, 'movies', movie_id)
     return movie
 
 
 def update_movie(movie_id, title, release_date):
+    if db.engine.dialect.name == 'postgresql':
+        return _update_movie_returning(movie_id, title, release_date)
+
     movie = Movie.query.get(movie_id)
     if movie:
         movie.title = title or movie.title
         movie.release_date = (release_date or
                               movie.release_date.strftime('%Y-%m-%d'))
         movie.update()
+        unit_of_work.on_commit(cache.invalidate, 'movies', movie_id)
+
+    return movie
 
+
+def _update_movie_returning(movie_id, title, release_date):
+    # one UPDATE ... RETURNING instead of loading the movie first; the
+    # version is bumped here as the ORM would for version_id_col
+    values = {}
+    if title:
+        values['title'] = Movie.validate_title(title)
+    if release_date:
+        values['release_date'] = Movie.validate_release_date(release_date)
+    if not values:
+        return get_movie(movie_id)
+
+    table = Movie.__table__
+    movie = unit_of_work.execute(
+        table.update().
+        where(table.c.id == movie_id).
+        values(version=table.c.version + 1, **values).
+        returning(*table.c)).first()
+    if movie:
+        unit_of_work.on_commit(cache.invalidate, 'movies', movie_id)
     return movie
@@ -0,0 +1,25 @@
+from flask_restplus import Api as BaseApi
+from jsonschema import RefResolver
+
+
+class Api(BaseApi):
+    """
+     flask-restplus Api that validates payloads without generating the
+     Swagger specification
+
+     flask-restplus resolves the $refs of nested models against the whole
+     specification, so the first validated request used to build it. Only
+     the model definitions are needed, and the specification is now built
+     by the first /swagger.json request.
+    """
+
+    @property
+    def refresolver(self):
+        if not self._refresolver:
+            self._refresolver = RefResolver.from_schema({
+                'definitions': {
+                    name: model.__schema__
+                    for name, model in self.models.items()
+                }
+            })
+        return self._refresolver
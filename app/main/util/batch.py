@@ -0,0 +1,80 @@
+from sqlalchemy import Integer, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from app.main import db
+from app.main.exceptions import ValidationError
+
+# largest value of the INTEGER id columns
+MAX_ID = 2 ** 31 - 1
+
+
+def parse_ids(value, max_ids):
+    """
+    parse_ids: reads a list of ids, from a comma separated string or a
+    JSON array
+    Args:
+        value (data type: str or list)
+        max_ids (data type: int) most ids accepted
+    Returns:
+        returns the ids as integers, in request order
+    """
+    if isinstance(value, str):
+        parts = [part.strip() for part in value.split(',') if part.strip()]
+        # digits only, so '+1', '1_000' and '1.5' are refused
+        valid = all(part.isascii() and part.isdigit() for part in parts)
+        ids = [int(part) for part in parts] if valid else None
+    elif isinstance(value, list):
+        # JSON integers only: floats would be truncated and booleans
+        # are ints to Python
+        valid = all(type(item) is int for item in value)
+        ids = value if valid else None
+    else:
+        ids = None
+    if ids is None:
+        raise ValidationError('ids should be a list of integers')
+    if not 0 < len(ids) <= max_ids:
+        raise ValidationError('between 1 and ' + str(max_ids) +
+                              ' ids should be given')
+    if not all(0 < item_id <= MAX_ID for item_id in ids):
+        raise ValidationError('ids should be between 1 and ' + str(MAX_ID))
+    return ids
+
+
+def id_in(column, ids):
+    """
+     Matches `column` against a list of ids. On PostgreSQL the list is
+     bound as a single array, `column = ANY(:ids)`, so the statement is
+     the same however many ids there are.
+    """
+    if db.engine.dialect.name == 'postgresql':
+        return column == any_(bindparam('ids', list(ids),
+                                        type_=ARRAY(Integer)))
+    return column.in_(list(ids))
+
+
+def batch_results(ids, rows, serialize, name):
+    """
+    batch_results: lays out the rows of a batch read in request order
+    Args:
+        ids (data type: list) requested ids, duplicates allowed
+        rows (data type: dict) row of each found id
+        serialize (data type: function) formats a row
+        name (data type: str) item name used in not found descriptions
+    Returns:
+        returns one result per requested id with its status and either
+        the item or an error description
+    """
+    results = []
+    for item_id in ids:
+        row = rows.get(item_id)
+        if row is None:
+            results.append({
+                'id': item_id,
+                'status': 404,
+                'description': name + ' with id ' + str(item_id) +
+                ' was not found'
+            })
+        else:
+            results.append({'id': item_id, 'status': 200,
+                            name.lower(): serialize(row)})
+    return results
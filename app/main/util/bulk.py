@@ -0,0 +1,88 @@
+from itertools import islice
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.main import db
+from app.main.exceptions import ValidationError
+
+BULK_CHUNK_SIZE = 1000
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def insert_rows(table, rows):
+    """
+    insert_rows: inserts rows with a single multi-row INSERT on PostgreSQL,
+    or one INSERT per row on other backends. PostgreSQL does not promise
+    RETURNING rows in VALUES order, so the ids are drawn from the id
+    sequence first and written with the rows.
+    Returns:
+        returns the new primary keys, in the order of rows
+    """
+    if db.engine.dialect.name == 'postgresql':
+        ids = [row[0] for row in db.session.execute(
+            text('SELECT nextval(pg_get_serial_sequence(:table, :column)) '
+                 'FROM generate_series(1, :count)'),
+            {'table': table.name, 'column': table.c.id.name,
+             'count': len(rows)})]
+        db.session.execute(table.insert().values(
+            [dict(row, **{table.c.id.name: new_id})
+             for row, new_id in zip(rows, ids)]))
+        return ids
+    return [db.session.execute(table.insert(), row).inserted_primary_key[0]
+            for row in rows]
+
+
+def bulk_insert(items, build_row, table, validate_item=None,
+                chunk_size=BULK_CHUNK_SIZE):
+    """
+    bulk_insert: validates and inserts items, committing once per chunk
+    Args:
+        items (data type: iterable) decoded request items
+        build_row (data type: function) returns the column values of a
+            valid item, raises ValidationError otherwise
+        table (data type: sqlalchemy.Table)
+        validate_item (data type: function) optional schema check run
+            before build_row
+    Returns:
+        returns one result per item, in order, with its index, status and
+        either the new id or an error description
+    """
+    results = []
+    for chunk in chunked(items, chunk_size):
+        rows, pending = [], []
+        for item in chunk:
+            result = {'index': len(results)}
+            results.append(result)
+            try:
+                if not isinstance(item, dict):
+                    raise ValidationError('item should be a JSON object')
+                if validate_item is not None:
+                    validate_item(item)
+                rows.append(build_row(item))
+            except ValidationError as exc:
+                result.update(status=400, description=exc.error)
+                continue
+            pending.append(result)
+        if not rows:
+            continue
+
+        try:
+            ids = insert_rows(table, rows)
+            db.session.commit()
+        except SQLAlchemyError:
+            db.session.rollback()
+            for result in pending:
+                result.update(status=500, description='Internal Server Error')
+            continue
+        for result, new_id in zip(pending, ids):
+            result.update(status=201, id=new_id)
+    return results
@@ -0,0 +1,235 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from functools import wraps
+
+MISSING = object()
+
+
+class LRUCache():
+    """
+     In-process LRU backend; every entry expires `ttl` seconds after it
+     is set. Generation counters are kept apart so they are never evicted.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+
+        self._entries = OrderedDict()
+        self._generations = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            value, expires_at = entry
+            if expires_at <= self.clock():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, self.clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def generation(self, key):
+        return self._generations[key]
+
+    def incr(self, key):
+        with self._lock:
+            self._generations[key] += 1
+            return self._generations[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+
+class RedisCache():
+    """
+     Backend for any client exposing the redis-py get/set/delete/incr
+     calls; values are pickled and expire `ttl` seconds after being set
+    """
+
+    def __init__(self, client, ttl=60, prefix='casting-agency:'):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        data = self.client.get(self.prefix + key)
+        if data is None:
+            return MISSING
+        return pickle.loads(data)
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key,
+                        pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+                        ex=self.ttl)
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*[self.prefix + key for key in keys])
+
+    def generation(self, key):
+        return int(self.client.get(self.prefix + key) or 0)
+
+    def incr(self, key):
+        return self.client.incr(self.prefix + key)
+
+
+class ServiceCache():
+    """
+     Read-through cache for service functions.
+
+     `item` caches functions of a single id under that id, `listing`
+     caches functions of their arguments under the namespace's current
+     generation. `invalidate` drops the ids' items and bumps the generation,
+     which orphans every cached list page of the namespace at once.
+     Nothing is cached until a backend is configured.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._item_functions = defaultdict(list)
+
+    def init_app(self, app):
+        cache_type = app.config.get('CACHE_TYPE', 'null')
+        ttl = app.config.get('CACHE_TTL', 60)
+        if cache_type == 'lru':
+            self.backend = LRUCache(app.config.get('CACHE_MAXSIZE', 1024),
+                                    ttl)
+        elif cache_type == 'redis':
+            import redis
+
+            client = redis.Redis.from_url(app.config['CACHE_REDIS_URL'])
+            self.backend = RedisCache(client, ttl)
+        else:
+            self.backend = None
+        self.reset_stats()
+
+    def item(self, namespace):
+        def decorator(f):
+            self._item_functions[namespace].append(f.__name__)
+
+            @wraps(f)
+            def wrapper(item_id):
+                if self.backend is None:
+                    return f(item_id)
+                key = self._item_key(namespace, f.__name__, item_id)
+                return self._read_through(key, f, item_id)
+
+            return wrapper
+        return decorator
+
+    def items(self, namespace, item_function):
+        """
+         Caches a function of a list of ids returning a dict of id to
+         item, sharing the entries of the `item_function` of the same
+         namespace: cached ids are served from there, and only the
+         others are passed on to the function
+        """
+        name = item_function.__name__
+
+        def decorator(f):
+            @wraps(f)
+            def wrapper(item_ids):
+                if self.backend is None:
+                    return f(item_ids)
+                found, missing = {}, []
+                for item_id in dict.fromkeys(item_ids):
+                    value = self.backend.get(
+                        self._item_key(namespace, name, item_id))
+                    if value is MISSING:
+                        missing.append(item_id)
+                    else:
+                        found[item_id] = value
+                self.hits += len(found)
+                self.misses += len(missing)
+                if missing:
+                    loaded = f(missing)
+                    for item_id in missing:
+                        # missing ids are cached as None, as item does
+                        found[item_id] = loaded.get(item_id)
+                        self.backend.set(
+                            self._item_key(namespace, name, item_id),
+                            found[item_id])
+                return found
+
+            return wrapper
+        return decorator
+
+    def listing(self, namespace):
+        def decorator(f):
+            @wraps(f)
+            def wrapper(*args, **kwargs):
+                if self.backend is None:
+                    return f(*args, **kwargs)
+                key = '%s:list:%d:%s:%r' % (
+                    namespace, self.backend.generation(namespace + ':gen'),
+                    f.__name__, (args, sorted(kwargs.items())))
+                return self._read_through(key, f, *args, **kwargs)
+
+            return wrapper
+        return decorator
+
+    def invalidate(self, namespace, *item_ids):
+        if self.backend is None:
+            return
+        self.backend.delete(*[
+            self._item_key(namespace, name, item_id)
+            for item_id in item_ids
+            for name in self._item_functions[namespace]
+        ])
+        self.backend.incr(namespace + ':gen')
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__ if self.backend else None,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else 0.0
+        }
+
+    @staticmethod
+    def _item_key(namespace, name, item_id):
+        try:
+            item_id = int(item_id)
+        except (TypeError, ValueError):
+            pass
+        return '%s:item:%s:%r' % (namespace, name, item_id)
+
+    def _read_through(self, key, f, *args, **kwargs):
+        value = self.backend.get(key)
+        if value is not MISSING:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = f(*args, **kwargs)
+        self.backend.set(key, value)
+        return value
+
+
+cache = ServiceCache()
@@ -0,0 +1,45 @@
+import hashlib
+
+from flask import request
+from werkzeug.http import http_date, quote_etag
+
+
+def make_etag(*parts):
+    """
+    make_etag: builds a strong entity tag from the versions a
+    representation is derived from
+    Returns:
+        returns the unquoted tag
+    """
+    data = ':'.join(str(part) for part in parts).encode('utf-8')
+    return hashlib.sha1(data).hexdigest()
+
+
+def validators(etag, last_modified=None):
+    """
+    Returns:
+        returns the ETag and Last-Modified response headers
+    """
+    headers = {'ETag': quote_etag(etag)}
+    if last_modified is not None:
+        headers['Last-Modified'] = http_date(last_modified)
+    return headers
+
+
+def is_conditional():
+    return bool(request.if_none_match or request.if_modified_since)
+
+
+def not_modified(etag, last_modified=None):
+    """
+    not_modified: evaluates If-None-Match, or If-Modified-Since when no
+    entity tag was sent, against the current representation
+    Returns:
+        returns True if the client copy is still current
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified is not None:
+        return (last_modified.replace(microsecond=0) <=
+                request.if_modified_since)
+    return False
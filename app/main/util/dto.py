@@ -1,4 +1,73 @@
+from datetime import date, datetime
+from enum import Enum
+
 from flask_restplus import Namespace, fields
+from jsonschema import Draft4Validator
+from jsonschema.exceptions import best_match
+from sqlalchemy import Enum as EnumType
+
+from app.main.exceptions import ValidationError
+from app.main.model.movie import Movie
+from app.main.model.actor import Actor, Gender
+
+
+def _format_date(value):
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def _format_enum(value):
+    if isinstance(value, Enum):
+        return value.name
+    return value
+
+
+def compile_serializer(model, db_model):
+    """
+    compile_serializer: generates the serializer of a flat DTO model
+    Args:
+        model (data type: flask_restplus.Model) DTO to serialize to
+        db_model (data type: db.Model) model whose columns back the DTO
+    Returns:
+        returns a function turning any object exposing the DTO keys as
+        attributes (model instance or query row) into a dict, formatted
+        like marshal() would but without per-field dispatch
+    """
+    columns = db_model.__table__.c
+    items = []
+    for key, field in model.items():
+        value = 'row.' + key
+        if isinstance(field, fields.Date):
+            value = '_format_date(%s)' % value
+        elif (key in columns and
+              isinstance(columns[key].type, EnumType)):
+            value = '_format_enum(%s)' % value
+        items.append('%r: %s' % (key, value))
+
+    source = 'def serialize(row):\n    return {%s}\n' % ', '.join(items)
+    namespace = {'_format_date': _format_date, '_format_enum': _format_enum}
+    exec(compile(source, '<serializer %s>' % model.name, 'exec'), namespace)
+    return namespace['serialize']
+
+
+def compile_validator(model):
+    """
+    compile_validator: builds the JSON schema validator of a DTO model once
+    Returns:
+        returns a function raising ValidationError with the most relevant
+        schema error of an item, as @api.expect(validate=True) would
+    """
+    validator = Draft4Validator(model.__schema__)
+
+    def validate(item):
+        error = best_match(validator.iter_errors(item))
+        if error is not None:
+            raise ValidationError(error.message)
+
+    return validate
 
 
 class MovieDto:
@@ -9,10 +78,59 @@ class MovieDto:
         'release_date': (fields.Date(required=True,
                          description='movie release date'))
     })
+    movie_list = api.model('movie_list', {
+        'movies': fields.List(fields.Nested(movie)),
+        'has_next': fields.Boolean(description='whether a next page exists'),
+        'next_cursor': fields.String(description='cursor of the next page'),
+        'total': fields.Integer(description='movie count, if requested')
+    })
     error = api.model('error', {
         'status': fields.Integer(required=True, description='status code'),
         'description': fields.String(required=True, description='error'),
     })
+    bulk_result = api.model('movie_bulk_result', {
+        'created': fields.Integer(description='movies created'),
+        'failed': fields.Integer(description='items rejected'),
+        'results': fields.List(fields.Nested(api.model('movie_bulk_item', {
+            'index': fields.Integer(description='position in the request'),
+            'status': fields.Integer(description='status code of the item'),
+            'id': fields.Integer(description='id of the created movie'),
+            'description': fields.String(description='error'),
+        })))
+    })
+    cast_member = api.model('cast_member', {
+        'id': fields.Integer(description='actor id'),
+        'name': fields.String(description='actor name'),
+        'age': fields.Integer(description='actor age'),
+        'gender': fields.String(description='actor gender'),
+        'role': fields.String(description='role of the actor in the movie')
+    })
+    cast_list = api.model('movie_cast', {
+        'actors': fields.List(fields.Nested(cast_member))
+    })
+    cast = api.model('cast', {
+        'movie_id': fields.Integer(description='movie id'),
+        'actor_id': fields.Integer(description='actor id'),
+        'role': fields.String(required=True, description='role of the actor')
+    })
+    batch_request = api.model('movie_batch_request', {
+        'ids': fields.List(fields.Integer, required=True,
+                           description='movie ids')
+    })
+    batch_result = api.model('movie_batch_result', {
+        'found': fields.Integer(description='movies found'),
+        'not_found': fields.Integer(description='ids not found'),
+        'results': fields.List(fields.Nested(api.model('movie_batch_item', {
+            'id': fields.Integer(description='requested id'),
+            'status': fields.Integer(description='status code of the id'),
+            'movie': fields.Nested(movie, allow_null=True),
+            'description': fields.String(description='error'),
+        })))
+    })
+    serialize_movie = staticmethod(compile_serializer(movie, Movie))
+    serialize_cast_member = staticmethod(
+        compile_serializer(cast_member, Actor))
+    validate_movie = staticmethod(compile_validator(movie))
 
 
 class ActorDto:
@@ -23,7 +141,81 @@ class ActorDto:
         'age': fields.Integer(required=True, description="actor age"),
         'gender': fields.String(required=True, description='actor gender'),
     })
+    actor_list = api.model('actor_list', {
+        'actors': fields.List(fields.Nested(actor)),
+        'has_next': fields.Boolean(description='whether a next page exists'),
+        'next_cursor': fields.String(description='cursor of the next page'),
+        'total': fields.Integer(description='actor count, if requested')
+    })
     error = api.model('error', {
         'status': fields.Integer(required=True, description='status code'),
         'description': fields.String(required=True, description='error'),
     })
+    bulk_result = api.model('actor_bulk_result', {
+        'created': fields.Integer(description='actors created'),
+        'failed': fields.Integer(description='items rejected'),
+        'results': fields.List(fields.Nested(api.model('actor_bulk_item', {
+            'index': fields.Integer(description='position in the request'),
+            'status': fields.Integer(description='status code of the item'),
+            'id': fields.Integer(description='id of the created actor'),
+            'description': fields.String(description='error'),
+        })))
+    })
+    gender_stats = api.model('actor_gender_stats', {
+        'count': fields.Integer(description='actors of the gender'),
+        'min_age': fields.Integer(description='youngest age'),
+        'max_age': fields.Integer(description='oldest age'),
+        'average_age': fields.Float(description='average age'),
+        'ages': fields.List(fields.Nested(api.model('actor_age_bucket', {
+            'from': fields.Integer(description='first age of the bucket'),
+            'to': fields.Integer(description='last age of the bucket'),
+            'count': fields.Integer(description='actors in the bucket'),
+        })))
+    })
+    stats_by_gender = api.model('actor_stats_by_gender', dict.fromkeys(
+        Gender.__members__, fields.Nested(gender_stats)))
+    stats = api.model('actor_stats', {
+        'total': fields.Integer(description='actors counted'),
+        'bucket_size': fields.Integer(description='years per age bucket'),
+        'genders': fields.Nested(stats_by_gender)
+    })
+    casting = api.model('casting', {
+        'id': fields.Integer(description='movie id'),
+        'title': fields.String(description='movie title'),
+        'release_date': fields.Date(description='movie release date'),
+        'role': fields.String(description='role of the actor in the movie')
+    })
+    casting_list = api.model('actor_movies', {
+        'movies': fields.List(fields.Nested(casting))
+    })
+    batch_request = api.model('actor_batch_request', {
+        'ids': fields.List(fields.Integer, required=True,
+                           description='actor ids')
+    })
+    batch_result = api.model('actor_batch_result', {
+        'found': fields.Integer(description='actors found'),
+        'not_found': fields.Integer(description='ids not found'),
+        'results': fields.List(fields.Nested(api.model('actor_batch_item', {
+            'id': fields.Integer(description='requested id'),
+            'status': fields.Integer(description='status code of the id'),
+            'actor': fields.Nested(actor, allow_null=True),
+            'description': fields.String(description='error'),
+        })))
+    })
+    serialize_actor = staticmethod(compile_serializer(actor, Actor))
+    serialize_casting = staticmethod(compile_serializer(casting, Movie))
+    validate_actor = staticmethod(compile_validator(actor))
+
+
+class StatusDto:
+    api = Namespace('Status', description='process health and metrics')
+    pool = api.model('pool_status', {
+        'size': fields.Integer(description='connections kept open'),
+        'in_use': fields.Integer(description='connections checked out'),
+        'idle': fields.Integer(description='connections in the pool'),
+        'overflow': fields.Integer(description='connections over size'),
+        'overflows': fields.Integer(description='checkouts that overflowed'),
+        'timeouts': fields.Integer(description='checkouts that timed out'),
+        'checkout_seconds': fields.Raw(description='checkout wait '
+                                       'histogram, cumulative buckets')
+    })
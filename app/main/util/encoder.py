@@ -0,0 +1,44 @@
+import json
+
+from flask import current_app, make_response
+from flask_restplus.representations import output_json as restplus_json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+def _stdlib_dumps(data):
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def _ujson_dumps(data):
+    return ujson.dumps(data, ensure_ascii=False).encode('utf-8')
+
+
+if orjson is not None:
+    BACKEND, dumps = 'orjson', orjson.dumps
+elif ujson is not None:
+    BACKEND, dumps = 'ujson', _ujson_dumps
+else:
+    BACKEND, dumps = 'json', _stdlib_dumps
+
+
+def output_json(data, code, headers=None):
+    """
+     JSON representation for the api: compact output from the fastest
+     installed encoder (orjson, ujson, then the standard library), or the
+     restplus indented output when the app runs in debug mode
+    """
+    if current_app.debug:
+        return restplus_json(data, code, headers)
+
+    resp = make_response(dumps(data) + b'\n', code)
+    resp.headers.extend(headers or {})
+    return resp
@@ -0,0 +1,82 @@
+import csv
+import io
+import zlib
+
+from .encoder import dumps
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+# rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = 1000
+# bytes gathered before a chunk is handed to the server
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+
+def ndjson_chunks(rows, serialize):
+    for row in rows:
+        yield dumps(serialize(row)) + b'\n'
+
+
+def csv_chunks(rows, serialize, fieldnames):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames, lineterminator='\n')
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(serialize(row))
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def buffered(chunks, size=EXPORT_CHUNK_SIZE):
+    """
+    buffered: joins small chunks so each write carries about `size` bytes
+    """
+    pending, length = [], 0
+    for chunk in chunks:
+        pending.append(chunk)
+        length += len(chunk)
+        if length >= size:
+            yield b''.join(pending)
+            pending, length = [], 0
+    if pending:
+        yield b''.join(pending)
+
+
+def gzip_chunks(chunks, level=6):
+    """
+    gzip_chunks: compresses a byte stream on the fly into a single gzip
+    member, without holding more than one chunk in memory
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(rows, serialize, fieldnames, export_format, compress):
+    """
+    export_stream: encodes rows as NDJSON or CSV
+    Args:
+        rows (data type: iterable) rows read from a server-side cursor
+        serialize (data type: function) DTO serializer of a row
+        fieldnames (data type: list) CSV header
+        export_format (data type: str) key of EXPORT_FORMATS
+        compress (data type: bool) whether to gzip the output
+    Returns:
+        returns a generator of byte chunks
+    """
+    if export_format == 'csv':
+        chunks = csv_chunks(rows, serialize, fieldnames)
+    else:
+        chunks = ndjson_chunks(rows, serialize)
+    chunks = buffered(chunks)
+    if compress:
+        chunks = gzip_chunks(chunks)
+    return chunks
@@ -0,0 +1,192 @@
+import os
+import threading
+import time
+
+from flask import Response, _request_ctx_stack
+
+from .pool_metrics import pool_metrics
+
+# upper bounds, in seconds, of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+                   5.0, 10.0)
+
+# upper bounds, in seconds, of the auth timing histogram buckets
+AUTH_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+STARTED = 'metrics.started'
+
+# gunicorn.conf.py sets it before the app is loaded, so every worker
+# writes its samples to files that /metrics then merges
+MULTIPROCESS_DIR = 'prometheus_multiproc_dir'
+
+
+def route_labels(endpoint):
+    """
+    route_labels: splits a restplus endpoint such as api.Movie_movie_list
+    into its namespace and resource
+    Returns:
+        returns the (namespace, route) labels of a request
+    """
+    if endpoint is None:
+        return 'none', 'unmatched'
+    name = endpoint.rsplit('.', 1)[-1]
+    namespace, _, resource = name.partition('_')
+    return (namespace, resource) if resource else ('none', name)
+
+
+class Metrics():
+    """
+     Prometheus metrics of the web app: request counts, latencies and
+     errors by namespace, route and method, auth timings and the
+     connection pool gauges, served at /metrics to tokens with the
+     get:status permission.
+
+     prometheus_client is only imported when METRICS_ENABLED is set.
+     Under gunicorn the samples of every worker are merged through the
+     shared prometheus_multiproc_dir. Label children are looked up once
+     per route and cached, so recording a request costs a few dict
+     lookups and counter increments.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.registry = None
+        self._children = {}
+        self._synced = (0, 0)
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        if not app.config.get('METRICS_ENABLED', False):
+            return
+        if not self.enabled:
+            self._create_metrics()
+        app.before_request(self._start)
+        app.after_request(self._observe_response)
+        app.teardown_request(self._observe_pool)
+        # imported here, as the auth module records its timings here
+        from app.main.auth.auth import requires_auth
+
+        # the same operational data as /status/pool, under its permission
+        app.add_url_rule('/metrics', 'metrics',
+                         requires_auth('get:status')(self._serve))
+
+    def _create_metrics(self):
+        from prometheus_client import (CollectorRegistry, Counter, Gauge,
+                                       Histogram)
+
+        self.multiprocess = MULTIPROCESS_DIR in os.environ
+        # with several processes samples go to files, not a registry
+        self.registry = None if self.multiprocess else CollectorRegistry()
+        registry = {'registry': self.registry}
+        route = ['namespace', 'route', 'method']
+
+        self.requests = Counter(
+            'http_requests_total', 'Requests served',
+            route + ['status'], **registry)
+        self.errors = Counter(
+            'http_request_errors_total', 'Requests answered with a 5xx',
+            route, **registry)
+        self.latency = Histogram(
+            'http_request_duration_seconds', 'Time to build a response',
+            route, buckets=LATENCY_BUCKETS, **registry)
+        self.jwks_fetch = Histogram(
+            'auth_jwks_fetch_seconds', 'Time to fetch the signing keys',
+            ['outcome'], buckets=AUTH_BUCKETS, **registry)
+        self.token_decode = Histogram(
+            'auth_token_decode_seconds', 'Time to verify an uncached token',
+            buckets=AUTH_BUCKETS, **registry)
+        self.pool_connections = Gauge(
+            'db_pool_connections', 'Database connections of the pools',
+            ['state'], multiprocess_mode='livesum', **registry)
+        self.pool_overflows = Counter(
+            'db_pool_overflows_total', 'Checkouts past the pool size',
+            **registry)
+        self.pool_timeouts = Counter(
+            'db_pool_timeouts_total', 'Checkouts that timed out',
+            **registry)
+        self._pool_states = {
+            state: self.pool_connections.labels(state)
+            for state in ('in_use', 'idle', 'overflow')
+        }
+        self.enabled = True
+
+    def _route_children(self, endpoint, method, status):
+        key = (endpoint, method, status)
+        children = self._children.get(key)
+        if children is None:
+            labels = route_labels(endpoint) + (method,)
+            children = (self.requests.labels(*labels, str(status)),
+                        self.errors.labels(*labels) if status >= 500
+                        else None,
+                        self.latency.labels(*labels))
+            self._children[key] = children
+        return children
+
+    # the request is read from the context stack once rather than
+    # through the flask.request proxy, which is most of the cost here
+    def _start(self):
+        _request_ctx_stack.top.request.environ[STARTED] = time.perf_counter()
+
+    def _observe_response(self, response):
+        current_request = _request_ctx_stack.top.request
+        started = current_request.environ.get(STARTED)
+        if started is None:
+            return response
+        requests, errors, latency = self._route_children(
+            current_request.endpoint, current_request.method,
+            response.status_code)
+        requests.inc()
+        if errors is not None:
+            errors.inc()
+        latency.observe(time.perf_counter() - started)
+        return response
+
+    def _observe_pool(self, exc):
+        pool = pool_metrics.pool
+        if pool is None:
+            return
+        self._pool_states['in_use'].set(pool.checkedout())
+        self._pool_states['idle'].set(pool.checkedin())
+        self._pool_states['overflow'].set(max(pool.overflow(), 0))
+        # pool_metrics counts per process; publish what is new since
+        # the last request
+        with self._lock:
+            overflows, timeouts = self._synced
+            self._synced = (pool_metrics.overflows, pool_metrics.timeouts)
+            new_overflows = self._synced[0] - overflows
+            new_timeouts = self._synced[1] - timeouts
+        if new_overflows:
+            self.pool_overflows.inc(new_overflows)
+        if new_timeouts:
+            self.pool_timeouts.inc(new_timeouts)
+
+    def observe_jwks_fetch(self, seconds, ok):
+        if self.enabled:
+            self.jwks_fetch.labels('ok' if ok else 'error').observe(seconds)
+
+    def observe_token_decode(self, seconds):
+        if self.enabled:
+            self.token_decode.observe(seconds)
+
+    def after_fork(self):
+        # a forked worker starts its own pool counts from zero
+        self._synced = (0, 0)
+
+    def _serve(self, payload):
+        return self.render()
+
+    def render(self):
+        from prometheus_client import (CONTENT_TYPE_LATEST,
+                                       CollectorRegistry, generate_latest)
+
+        registry = self.registry
+        if self.multiprocess:
+            from prometheus_client import multiprocess
+
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry),
+                        content_type=CONTENT_TYPE_LATEST)
+
+
+metrics = Metrics()
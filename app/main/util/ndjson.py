@@ -0,0 +1,21 @@
+import json
+
+NDJSON_MIMETYPES = ('application/x-ndjson', 'application/ndjson')
+
+
+def iter_ndjson(stream):
+    """
+    iter_ndjson: decodes newline-delimited JSON one line at a time
+    Args:
+        stream (data type: file-like) binary request stream
+    Returns:
+        yields each decoded value, or None for a line that is not JSON
+    """
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line.decode('utf-8'))
+        except ValueError:
+            yield None
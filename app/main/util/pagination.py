@@ -0,0 +1,130 @@
+import base64
+import binascii
+import json
+import time
+from collections import namedtuple
+
+from sqlalchemy import func, text, tuple_
+
+from app.main import db
+from app.main.exceptions import ValidationError
+
+Page = namedtuple('Page', ['items', 'has_next', 'next_cursor', 'total'],
+                  defaults=(None, None))
+
+COUNT_CACHE_TTL = 30
+ESTIMATE_THRESHOLD = 100000
+
+_counts = {}
+
+
+def encode_cursor(values):
+    data = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(cursor, columns):
+    """
+    decode_cursor: reads the sort key values of a cursor
+    Args:
+        cursor (data type: str) opaque cursor from encode_cursor
+        columns (data type: list) sort key columns the values are
+            compared with
+    Returns:
+        returns one value per column, each of the column's Python type
+    """
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (ValueError, binascii.Error):
+        raise ValidationError('cursor is invalid.')
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValidationError('cursor is invalid.')
+    # a crafted cursor must not reach the database as a mistyped value;
+    # booleans are ints to Python, hence the exact type check
+    if any(type(value) is not column.type.python_type
+           for value, column in zip(values, columns)):
+        raise ValidationError('cursor is invalid.')
+    return values
+
+
+def paginate_keyset(query, columns, cursor, limit, keys=None):
+    """
+     Seeks past `cursor` in descending `columns` order instead of using
+     OFFSET, and fetches one extra row to know whether a next page exists
+    Args:
+        columns (data type: list) sort key, ending in a unique column
+        cursor (data type: str) opaque cursor, empty for the first page
+        limit (data type: int)
+        keys (data type: list) row attributes holding the sort key,
+            defaults to the columns' keys
+    Returns:
+        returns a Page of items and the cursor of the following page
+    """
+    query = query.order_by(*[column.desc() for column in columns])
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        query = query.filter(tuple_(*columns) < tuple_(*values))
+
+    items = query.limit(limit + 1).all()
+    has_next = len(items) > limit
+    next_cursor = None
+    if has_next:
+        items = items[:limit]
+        last = items[-1]
+        keys = keys or [column.key for column in columns]
+        next_cursor = encode_cursor([getattr(last, key) for key in keys])
+    return Page(items, has_next, next_cursor)
+
+
+def paginate_offset(query, page, per_page):
+    """
+     Fetches one extra row to know whether a next page exists instead of
+     issuing the COUNT query Flask-SQLAlchemy's paginate() runs
+    Args:
+        page (data type: int) 1-based page number
+        per_page (data type: int)
+    Returns:
+        returns a Page of items
+    """
+    page = max(page, 1)
+    items = query.limit(per_page + 1).offset((page - 1) * per_page).all()
+    return Page(items[:per_page], len(items) > per_page)
+
+
+def count_rows(table):
+    """
+     Counts the rows of `table`, caching the result for COUNT_CACHE_TTL
+     seconds. On PostgreSQL, tables with more than ESTIMATE_THRESHOLD rows
+     are counted from the planner's reltuples estimate instead of a scan.
+    Returns:
+        returns the (possibly approximate) number of rows
+    """
+    now = time.monotonic()
+    cached = _counts.get(table.name)
+    if cached is not None and cached[1] > now:
+        return cached[0]
+
+    total = None
+    if db.engine.dialect.name == 'postgresql':
+        estimate = db.session.execute(
+            text('SELECT reltuples::bigint FROM pg_class '
+                 'WHERE oid = to_regclass(:table)'),
+            {'table': table.name}).scalar()
+        if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+            total = estimate
+    if total is None:
+        total = db.session.query(func.count()).select_from(table).scalar()
+
+    _counts[table.name] = (total, now + COUNT_CACHE_TTL)
+    return total
+
+
+def count_matches(query):
+    """
+     Counts the rows a filtered list query matches. Unlike count_rows the
+     count is exact and not cached, as every filter counts other rows.
+    Returns:
+        returns the number of rows
+    """
+    return query.order_by(None).with_entities(func.count()).scalar()
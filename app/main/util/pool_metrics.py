@@ -0,0 +1,117 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import QueuePool
+
+# upper bounds, in seconds, of the checkout wait histogram buckets
+CHECKOUT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                    2.5, 5.0, 10.0)
+
+logger = logging.getLogger(__name__)
+
+
+class Histogram():
+    """
+     Fixed-bucket histogram, reported with cumulative counts like a
+     Prometheus histogram
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self._counts[bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+
+    def snapshot(self):
+        with self._lock:
+            counts = list(self._counts)
+            total, value_sum = self.count, self.sum
+        cumulative, buckets = 0, []
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += count
+            buckets.append(('+Inf' if bound == float('inf') else bound,
+                            cumulative))
+        return {'buckets': buckets, 'count': total, 'sum': value_sum}
+
+
+class PoolMetrics():
+    """
+     Checkout metrics of the connection pool of this process: how long
+     checkouts waited, how often the pool overflowed or timed out, and
+     the connections in use or idle. Checkouts slower than
+     `slow_checkout` seconds and timeouts are also logged.
+    """
+
+    def __init__(self, slow_checkout=0.1):
+        self.slow_checkout = slow_checkout
+        self.pool = None
+        self.reset()
+
+    def init_app(self, app):
+        self.slow_checkout = app.config.get('DB_POOL_SLOW_CHECKOUT',
+                                            self.slow_checkout)
+
+    def reset(self):
+        self.checkout_seconds = Histogram(CHECKOUT_BUCKETS)
+        self.overflows = 0
+        self.timeouts = 0
+
+    def observe_checkout(self, pool, seconds, overflowed):
+        self.pool = pool
+        self.checkout_seconds.observe(seconds)
+        if overflowed:
+            self.overflows += 1
+        if seconds >= self.slow_checkout:
+            logger.warning('waited %.3fs for a database connection '
+                           '(%d in use, overflow %d)', seconds,
+                           pool.checkedout(), pool.overflow())
+
+    def observe_timeout(self, pool, seconds):
+        self.pool = pool
+        self.timeouts += 1
+        self.checkout_seconds.observe(seconds)
+        logger.error('no database connection available after %.3fs '
+                     '(%d in use, pool size %d)', seconds,
+                     pool.checkedout(), pool.size())
+
+    def stats(self):
+        pool = self.pool
+        return {
+            'size': pool.size() if pool else None,
+            'in_use': pool.checkedout() if pool else 0,
+            'idle': pool.checkedin() if pool else 0,
+            'overflow': max(pool.overflow(), 0) if pool else 0,
+            'overflows': self.overflows,
+            'timeouts': self.timeouts,
+            'checkout_seconds': self.checkout_seconds.snapshot()
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool timing every checkout into pool_metrics"""
+
+    def _do_get(self):
+        overflow = self.overflow()
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except TimeoutError:
+            pool_metrics.observe_timeout(self, time.perf_counter() - started)
+            raise
+        pool_metrics.observe_checkout(
+            self, time.perf_counter() - started,
+            self.overflow() > max(overflow, 0))
+        return connection
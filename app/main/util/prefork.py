@@ -0,0 +1,41 @@
+from .. import db
+from ..auth.auth import jwks_store
+from .metrics import metrics
+from .pool_metrics import pool_metrics
+
+
+def warm_up(app):
+    """
+    warm_up: loads what every worker needs once, in the master process,
+    so forked workers start with it
+    Args:
+        app (data type: Flask)
+    """
+    jwks_store.refresh()
+
+
+def before_fork(app):
+    """
+    before_fork: closes the database connections the master may have
+    opened while loading, so no worker inherits a socket of another
+    Args:
+        app (data type: Flask)
+    """
+    with app.app_context():
+        db.engine.dispose()
+
+
+def after_fork(app):
+    """
+    after_fork: gives a new worker its own, empty connection pool and
+    pool metrics. Inherited connections are dropped without closing
+    them, as closing would also end them for the master.
+    Args:
+        app (data type: Flask)
+    """
+    with app.app_context():
+        engine = db.engine
+        engine.pool = engine.pool.recreate()
+    pool_metrics.pool = None
+    pool_metrics.reset()
+    metrics.after_fork()
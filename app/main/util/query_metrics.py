@@ -0,0 +1,125 @@
+import logging
+import time
+
+from flask import g, has_app_context
+from sqlalchemy import event
+
+STARTED = 'query_metrics.started'
+
+logger = logging.getLogger(__name__)
+
+
+class RequestQueries():
+    """Statements run while handling one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.slowest = None
+        self.slowest_seconds = 0.0
+
+    def observe(self, statement, seconds):
+        self.count += 1
+        self.seconds += seconds
+        if seconds >= self.slowest_seconds:
+            self.slowest, self.slowest_seconds = statement, seconds
+
+
+def redact(parameters):
+    """
+    redact: hides the values bound to a statement, keeping their shape
+    Returns:
+        returns the parameters with every value replaced by '?'
+    """
+    if isinstance(parameters, dict):
+        return {key: '?' for key in parameters}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            # executemany: one set of parameters per row
+            return '%d rows of %r' % (len(parameters),
+                                      redact(parameters[0]))
+        return tuple('?' for _ in parameters)
+    return parameters
+
+
+class QueryMetrics():
+    """
+     Per-request SQL metrics: the statement count, the time spent in the
+     database and the slowest statement of the current request. Statements
+     slower than `slow_query` seconds are logged with their parameters
+     redacted. With `server_timing` on, responses carry them in a
+     Server-Timing header, which browser dev tools display.
+    """
+
+    def __init__(self, slow_query=0.5, server_timing=False):
+        self.slow_query = slow_query
+        self.server_timing = server_timing
+
+    def init_app(self, app, db):
+        self.slow_query = app.config.get('DB_SLOW_QUERY', self.slow_query)
+        self.server_timing = app.config.get('DB_SERVER_TIMING', app.debug)
+        app.before_request(self._start)
+        app.after_request(self._add_server_timing)
+
+        # statements are timed on this app's engine only
+        engine = db.get_engine(app)
+        event.listen(engine, 'before_cursor_execute', _statement_started)
+        event.listen(engine, 'after_cursor_execute', _statement_ended)
+        event.listen(engine, 'handle_error', _statement_failed)
+
+    def current(self):
+        """
+        current: statements of the request being handled
+        Returns:
+            returns RequestQueries, or None outside a request
+        """
+        if not has_app_context():
+            return None
+        return g.get('queries')
+
+    def observe(self, statement, parameters, seconds):
+        queries = self.current()
+        if queries is not None:
+            queries.observe(statement, seconds)
+        if seconds >= self.slow_query:
+            logger.warning('slow query took %.3fs: %s; parameters: %s',
+                           seconds, ' '.join(statement.split()),
+                           redact(parameters))
+
+    def _start(self):
+        g.queries = RequestQueries()
+        g.request_started = time.perf_counter()
+
+    def _add_server_timing(self, response):
+        queries = self.current()
+        if not self.server_timing or queries is None:
+            return response
+        metrics = [
+            'db;dur=%.2f;desc="%d queries"' % (queries.seconds * 1000,
+                                               queries.count),
+            'db-slowest;dur=%.2f' % (queries.slowest_seconds * 1000),
+            'app;dur=%.2f' % ((time.perf_counter() - g.request_started) *
+                              1000)
+        ]
+        response.headers.add('Server-Timing', ', '.join(metrics))
+        return response
+
+
+query_metrics = QueryMetrics()
+
+
+def _statement_started(conn, cursor, statement, parameters, context,
+                       executemany):
+    conn.info.setdefault(STARTED, []).append(time.perf_counter())
+
+
+def _statement_ended(conn, cursor, statement, parameters, context,
+                     executemany):
+    seconds = time.perf_counter() - conn.info[STARTED].pop()
+    query_metrics.observe(statement, parameters, seconds)
+
+
+def _statement_failed(context):
+    connection = context.connection
+    if connection is not None and connection.info.get(STARTED):
+        connection.info[STARTED].pop()
@@ -0,0 +1,39 @@
+from sqlalchemy import and_, func, literal_column
+
+from app.main import db
+
+# text search configuration of the full-text indexes
+SEARCH_CONFIG = literal_column("'english'")
+
+
+def escape_like(value):
+    return (value.replace('\\', '\\\\').replace('%', '\\%').
+            replace('_', '\\_'))
+
+
+def starts_with(column, value):
+    """
+     Case-insensitive prefix match, served by a trigram index on
+     PostgreSQL
+    """
+    return column.ilike(escape_like(value) + '%', escape='\\')
+
+
+def contains(column, value):
+    """
+     Case-insensitive substring match, served by a trigram index on
+     PostgreSQL
+    """
+    return column.ilike('%' + escape_like(value) + '%', escape='\\')
+
+
+def matches(column, query):
+    """
+     Full-text match of every word of `query`. PostgreSQL stems the words
+     and uses a to_tsvector index on `column`; other databases fall back
+     to a substring match of each word.
+    """
+    if db.engine.dialect.name == 'postgresql':
+        return func.to_tsvector(SEARCH_CONFIG, column).op('@@')(
+            func.plainto_tsquery(SEARCH_CONFIG, query))
+    return and_(*[contains(column, word) for word in query.split()])
@@ -0,0 +1,103 @@
+from sqlalchemy import event
+
+ON_COMMIT = 'unit_of_work.on_commit'
+WRITES = 'unit_of_work.writes'
+CLEAN = 'unit_of_work.clean'
+
+
+class UnitOfWork():
+    """
+     Request-scoped transaction: services only flush, and the request
+     commits once after a successful (< 400) response. Anything else,
+     including an exception, rolls back. The session is removed at the
+     end of every request, also when an application context was pushed
+     globally (see manage.py) and Flask-SQLAlchemy's own teardown does
+     not run.
+
+     Outside a request, whoever calls the services commits the session.
+    """
+
+    def __init__(self):
+        self.session = None
+
+    def init_app(self, app, db):
+        self.session = db.session
+        event.listen(db.session, 'after_flush', self._flushed)
+        event.listen(db.session, 'after_commit', self._committed)
+        event.listen(db.session, 'after_soft_rollback', self._rolled_back)
+        app.after_request(self._commit)
+        app.teardown_request(self._remove)
+
+        # only this app's engine skips the pool's reset rollback, so the
+        # reset is taken over on its engine and pool alone
+        engine = db.get_engine(app)
+        event.listen(engine, 'before_cursor_execute', _transaction_used)
+        event.listen(engine, 'commit', _transaction_ended)
+        event.listen(engine, 'rollback', _transaction_ended)
+        event.listen(engine.pool, 'reset', _reset_connection)
+
+    def on_commit(self, callback, *args):
+        """
+        on_commit: defers callback(*args) until the session commits, so
+        caches are never invalidated before the write is visible
+        """
+        info = self.session().info
+        info.setdefault(ON_COMMIT, []).append((callback, args))
+
+    def execute(self, statement):
+        """
+        execute: runs a Core INSERT/UPDATE/DELETE in the session, which
+        the unit of work then commits like a flush
+        """
+        session = self.session()
+        session.info[WRITES] = True
+        return session.execute(statement)
+
+    def _commit(self, response):
+        session = self.session()
+        if response.status_code >= 400:
+            session.rollback()
+        elif (session.info.get(WRITES) or session.new or session.dirty or
+              session.deleted):
+            session.commit()
+        return response
+
+    def _remove(self, exc):
+        self.session.remove()
+
+    @staticmethod
+    def _flushed(session, flush_context):
+        session.info[WRITES] = True
+
+    @staticmethod
+    def _committed(session):
+        session.info.pop(WRITES, None)
+        for callback, args in session.info.pop(ON_COMMIT, []):
+            callback(*args)
+
+    @staticmethod
+    def _rolled_back(session, previous_transaction):
+        if previous_transaction.parent is None:
+            session.info.pop(WRITES, None)
+            session.info.pop(ON_COMMIT, None)
+
+
+# The engine is created with pool_reset_on_return=None and connections
+# are reset here instead: one whose transaction already ended with a
+# commit or rollback goes back to the pool without the extra rollback()
+# the pool would send, which saves a round trip on every write request.
+def _transaction_used(conn, cursor, statement, parameters, context,
+                      executemany):
+    conn.connection.info.pop(CLEAN, None)
+
+
+def _transaction_ended(conn):
+    conn.connection.info[CLEAN] = True
+
+
+def _reset_connection(dbapi_connection, connection_record):
+    if not connection_record.info.pop(CLEAN, False):
+        dbapi_connection.rollback()
+
+
+unit_of_work = UnitOfWork()
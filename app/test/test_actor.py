@@ -49,6 +49,7 @@ class ActorTestCase(unittest.TestCase):
             gender="MALE"
         )
         actor.insert()
+        db.session.commit()
 
     def test_create_actor(self):
         new_actor = {
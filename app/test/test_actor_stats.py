@@ -0,0 +1,119 @@
+import time
+import unittest
+
+from sqlalchemy import event
+
+from app import blueprint
+from app.main import create_app, db
+from app.main.auth.auth import token_cache
+from app.main.model.actor import Actor
+
+TOKEN = 'actor-stats-test-token'
+
+ACTORS = [
+    ('Joaquin', 45, 'MALE'),
+    ('Adam', 36, 'MALE'),
+    ('Timothee', 23, 'MALE'),
+    ('Scarlett', 34, 'FEMALE'),
+    ('Florence', 23, 'FEMALE'),
+    ('Saoirse', 25, 'FEMALE'),
+    ('Laura', 52, 'FEMALE'),
+]
+
+
+class ActorStatsTestCase(unittest.TestCase):
+    """This class tests the actor filters and statistics"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app.register_blueprint(blueprint)
+        self.client = self.app.test_client
+        self.auth_header = {'Authorization': 'Bearer ' + TOKEN}
+        token_cache.set(TOKEN, {
+            'exp': time.time() + 3600,
+            'permissions': ['get:actors']
+        })
+
+        with self.app.app_context():
+            # totals count every row, so start from empty tables even if
+            # an earlier test failed before its tearDown
+            db.drop_all()
+            db.create_all()
+            for name, age, gender in ACTORS:
+                db.session.add(Actor(name=name, age=age, gender=gender))
+            db.session.commit()
+            db.session.remove()
+            self.engine = db.engine
+
+    def tearDown(self):
+        token_cache.clear()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def get(self, url, status=200, **params):
+        res = self.client().get(url, query_string=params,
+                                headers=self.auth_header)
+        self.assertEqual(res.status_code, status)
+        return res.get_json()
+
+    def names(self, **params):
+        return [actor['name'] for actor in
+                self.get('/actors/', **params)['actors']]
+
+    def test_filters(self):
+        self.assertEqual(self.names(gender='FEMALE', min_age=20, max_age=35),
+                         ['Scarlett', 'Saoirse', 'Florence'])
+        self.assertEqual(self.names(min_age=40), ['Laura', 'Joaquin'])
+
+    def test_filtered_total(self):
+        page = self.get('/actors/', gender='MALE', include_total='true')
+        self.assertEqual(page['total'], 3)
+
+    def test_invalid_filters(self):
+        data = self.get('/actors/', 400, gender='OTHER')
+        self.assertEqual(data['error']['description'],
+                         'gender is either MALE or FEMALE')
+        data = self.get('/actors/stats', 400, max_age='old')
+        self.assertEqual(data['error']['description'],
+                         'max_age should be an integer')
+        self.get('/actors/stats', 400, bucket_size=0)
+
+    def test_stats_in_one_query(self):
+        statements = []
+
+        def capture(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(self.engine, 'before_cursor_execute', capture)
+        try:
+            stats = self.get('/actors/stats')
+        finally:
+            event.remove(self.engine, 'before_cursor_execute', capture)
+
+        self.assertEqual(len(statements), 1)
+        self.assertEqual(stats['total'], 7)
+        self.assertEqual(stats['bucket_size'], 10)
+        self.assertEqual(stats['genders']['FEMALE'], {
+            'count': 4, 'min_age': 23, 'max_age': 52, 'average_age': 33.5,
+            'ages': [
+                {'from': 20, 'to': 29, 'count': 2},
+                {'from': 30, 'to': 39, 'count': 1},
+                {'from': 50, 'to': 59, 'count': 1},
+            ]
+        })
+        self.assertEqual(stats['genders']['MALE']['count'], 3)
+
+    def test_filtered_stats(self):
+        stats = self.get('/actors/stats', gender='MALE', bucket_size=50)
+        self.assertEqual(stats['total'], 3)
+        self.assertEqual(stats['genders']['MALE']['ages'],
+                         [{'from': 0, 'to': 49, 'count': 3}])
+        self.assertEqual(stats['genders']['FEMALE'], {
+            'count': 0, 'min_age': None, 'max_age': None,
+            'average_age': None, 'ages': []
+        })
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import time
+import unittest
+
+from sqlalchemy.engine.url import make_url
+
+from app import blueprint
+from app.main import create_app, db
+from app.main.auth.auth import token_cache
+from app.main.model.movie import Movie
+from app.main.model.actor import Actor
+from app.main.util.pagination import encode_cursor
+
+try:
+    from starlette.testclient import TestClient
+    from app.asgi import create_asgi_app
+except ImportError:
+    create_asgi_app = None
+
+TOKEN = 'asgi-test-token'
+
+
+@unittest.skipIf(create_asgi_app is None,
+                 'starlette and databases are not installed')
+class AsgiTestCase(unittest.TestCase):
+    """This class checks the async app against the Flask app"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        url = make_url(self.app.config['SQLALCHEMY_DATABASE_URI'])
+        if url.drivername.startswith('sqlite') and \
+                url.database in (None, '', ':memory:'):
+            # the async driver opens a database of its own, which would
+            # not see the rows seeded here
+            self.skipTest('needs a database both apps can connect to')
+        self.app.register_blueprint(blueprint)
+        self.auth_header = {'Authorization': 'Bearer ' + TOKEN}
+        token_cache.set(TOKEN, {
+            'exp': time.time() + 3600,
+            'permissions': ['get:movies', 'create:movie', 'update:movie',
+                            'delete:movie', 'get:actors', 'create:actor']
+        })
+        with self.app.app_context():
+            db.create_all()
+            for i in range(12):
+                db.session.add(Movie(title='Movie %d' % i,
+                                     release_date='2019-10-04'))
+            db.session.add(Actor(name='Joaquin', age=45, gender='MALE'))
+            db.session.commit()
+            db.session.remove()
+
+        self.client = TestClient(create_asgi_app('testing'))
+        self.client.__enter__()
+
+    def tearDown(self):
+        self.client.__exit__(None, None, None)
+        token_cache.clear()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def get_both(self, url):
+        flask_res = self.app.test_client().get(url, headers=self.auth_header)
+        asgi_res = self.client.get(url, headers=self.auth_header)
+        self.assertEqual(asgi_res.status_code, flask_res.status_code)
+        return flask_res, asgi_res
+
+    def test_reads_match_flask(self):
+        for url in ('/movies/', '/movies/?page=2', '/actors/1',
+                    '/movies/?cursor=&limit=5&include_total=true'):
+            flask_res, asgi_res = self.get_both(url)
+            self.assertEqual(asgi_res.json(), flask_res.get_json())
+            self.assertEqual(asgi_res.headers['ETag'],
+                             flask_res.headers['ETag'])
+
+    def test_flask_only_parameters_are_refused(self):
+        for url, name in (('/movies/?title=Movie 1', 'title'),
+                          ('/movies/?q=movie', 'q'),
+                          ('/movies/?ids=1,2', 'ids'),
+                          ('/movies/?embed=cast', 'embed'),
+                          ('/actors/?gender=MALE', 'gender'),
+                          ('/actors/?min_age=30', 'min_age')):
+            flask_res = self.app.test_client().get(
+                url, headers=self.auth_header)
+            self.assertNotEqual(flask_res.status_code, 400)
+            asgi_res = self.client.get(url, headers=self.auth_header)
+            self.assertEqual(asgi_res.status_code, 400)
+            self.assertEqual(asgi_res.json()['error']['description'],
+                             name + ' is not supported in async mode')
+
+    def test_invalid_cursor(self):
+        cursor = encode_cursor([{'a': 1}, 3])
+        flask_res, asgi_res = self.get_both('/movies/?cursor=' + cursor)
+        self.assertEqual(asgi_res.status_code, 400)
+        self.assertEqual(asgi_res.json()['error'],
+                         flask_res.get_json()['error'])
+
+    def test_writes(self):
+        res = self.client.post('/movies/', headers=self.auth_header, json={
+            'title': 'Parasite', 'release_date': '2019-05-30'
+        })
+        self.assertEqual(res.status_code, 201)
+        movie_id = res.json()['id']
+
+        res = self.client.patch('/movies/%d' % movie_id,
+                                headers=self.auth_header,
+                                json={'release_date': 'May 30'})
+        self.assertEqual(res.status_code, 400)
+        res = self.client.patch('/movies/%d' % movie_id,
+                                headers=self.auth_header,
+                                json={'title': 'Gisaengchung'})
+        self.assertEqual(res.json()['title'], 'Gisaengchung')
+
+        res = self.client.delete('/movies/%d' % movie_id,
+                                 headers=self.auth_header)
+        self.assertEqual(res.status_code, 204)
+        flask_res, asgi_res = self.get_both('/movies/%d' % movie_id)
+        self.assertEqual(asgi_res.status_code, 404)
+
+    def test_permissions(self):
+        self.assertEqual(self.client.get('/movies/').status_code, 401)
+        res = self.client.delete('/actors/1', headers=self.auth_header)
+        self.assertEqual(res.status_code, 403)
+
+
+if __name__ == "__main__":
+    unittest.main()
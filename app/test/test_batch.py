@@ -0,0 +1,124 @@
+import time
+import unittest
+
+from sqlalchemy import event
+
+from app import blueprint
+from app.main import create_app, db
+from app.main.auth.auth import token_cache
+from app.main.model.actor import Actor
+from app.main.model.movie import Movie
+from app.main.util.batch import parse_ids
+from app.main.exceptions import ValidationError
+
+TOKEN = 'batch-test-token'
+
+
+class BatchTestCase(unittest.TestCase):
+    """This class tests reading movies and actors by ids"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app.register_blueprint(blueprint)
+        self.client = self.app.test_client
+        self.auth_header = {'Authorization': 'Bearer ' + TOKEN}
+        token_cache.set(TOKEN, {
+            'exp': time.time() + 3600,
+            'permissions': ['get:movies', 'get:actors']
+        })
+
+        with self.app.app_context():
+            db.drop_all()
+            db.create_all()
+            for i in range(5):
+                db.session.add(Movie(title='Movie %d' % i,
+                                     release_date='2019-10-04'))
+                db.session.add(Actor(name='Actor %d' % i, age=30,
+                                     gender='MALE'))
+            db.session.commit()
+            db.session.remove()
+            self.engine = db.engine
+
+    def tearDown(self):
+        token_cache.clear()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def get(self, url, status=200, headers=None, **params):
+        res = self.client().get(url, query_string=params,
+                                headers=dict(self.auth_header,
+                                             **(headers or {})))
+        self.assertEqual(res.status_code, status)
+        return res
+
+    def test_results_in_request_order(self):
+        data = self.get('/movies/', ids='3,99,1').get_json()
+        self.assertEqual(data['found'], 2)
+        self.assertEqual(data['not_found'], 1)
+        self.assertEqual(data['results'], [
+            {'id': 3, 'status': 200, 'movie': {
+                'id': 3, 'title': 'Movie 2', 'release_date': '2019-10-04'}},
+            {'id': 99, 'status': 404,
+             'description': 'Movie with id 99 was not found'},
+            {'id': 1, 'status': 200, 'movie': {
+                'id': 1, 'title': 'Movie 0', 'release_date': '2019-10-04'}},
+        ])
+
+        data = self.get('/actors/', ids='5,5').get_json()
+        self.assertEqual([result['actor']['name']
+                          for result in data['results']],
+                         ['Actor 4', 'Actor 4'])
+
+    def test_one_query_per_batch(self):
+        statements = []
+
+        def capture(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(self.engine, 'before_cursor_execute', capture)
+        try:
+            self.get('/movies/', ids='1,2,3,4,5')
+        finally:
+            event.remove(self.engine, 'before_cursor_execute', capture)
+        self.assertEqual(len(statements), 1)
+
+    def test_post_variant(self):
+        res = self.client().post('/actors/batch', json={'ids': [2, 7]},
+                                 headers=self.auth_header)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([result['status']
+                          for result in res.get_json()['results']],
+                         [200, 404])
+
+        for ids in ('all', [1.7, 2], [2 ** 70]):
+            res = self.client().post('/movies/batch', json={'ids': ids},
+                                     headers=self.auth_header)
+            self.assertEqual(res.status_code, 400)
+
+    def test_not_modified(self):
+        etag = self.get('/movies/', ids='1,2').headers['ETag']
+        self.get('/movies/', 304, headers={'If-None-Match': etag},
+                 ids='1,2')
+        self.get('/movies/', 200, headers={'If-None-Match': etag},
+                 ids='2,1')
+
+    def test_invalid_ids(self):
+        data = self.get('/movies/', 400, ids='1,two').get_json()
+        self.assertEqual(data['error']['description'],
+                         'ids should be a list of integers')
+        self.assertEqual(parse_ids(' 1, 2,', 10), [1, 2])
+        for ids in ([True], [1.7, 2], ['1'], '1.5,2', '+1', None, [0],
+                    [2 ** 31], '99999999999999999999999'):
+            with self.assertRaises(ValidationError):
+                parse_ids(ids, 10)
+        data = self.get('/movies/', 400,
+                        ids='99999999999999999999999').get_json()
+        self.assertEqual(data['error']['description'],
+                         'ids should be between 1 and 2147483647')
+        with self.assertRaises(ValidationError):
+            parse_ids(list(range(11)), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+from datetime import date
+import unittest
+
+from app.main import create_app, db
+from app.main.model.movie import Movie
+from app.main.service import movie_service
+from app.main.util.bulk import insert_rows
+from app.main.util.dto import MovieDto
+from app.main.util.ndjson import iter_ndjson
+
+
+class BulkInsertTestCase(unittest.TestCase):
+    """This class represents the bulk create test case"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_results_follow_request_order(self):
+        items = [
+            {'title': 'Movie 1', 'release_date': '2019-01-01'},
+            {'title': '', 'release_date': '2019-01-01'},
+            'not an object',
+            {'title': 'Movie 2', 'release_date': '2019-13-01'},
+            {'title': 'Movie 3', 'release_date': '2019-01-03'},
+        ]
+        results = movie_service.post_movies(items, MovieDto.validate_movie)
+
+        self.assertEqual([result['index'] for result in results],
+                         list(range(len(items))))
+        self.assertEqual([result['status'] for result in results],
+                         [201, 400, 400, 400, 201])
+        self.assertEqual(Movie.query.count(), 2)
+        # every new id belongs to the item at its index
+        for result in results:
+            if result['status'] == 201:
+                self.assertEqual(
+                    movie_service.get_movie(result['id']).title,
+                    items[result['index']]['title'])
+
+    def test_ids_follow_row_order(self):
+        rows = [{'title': 'Movie %d' % i, 'release_date': date(2019, 1, 1)}
+                for i in range(50)]
+        ids = insert_rows(Movie.__table__, rows)
+        db.session.commit()
+        self.assertEqual(len(set(ids)), len(rows))
+        for row, new_id in zip(rows, ids):
+            self.assertEqual(movie_service.get_movie(new_id).title,
+                             row['title'])
+
+    def test_ndjson_lines(self):
+        lines = [b'{"title": "Movie 1"}\n', b'\n', b'{broken\n', b'[]']
+        self.assertEqual(list(iter_ndjson(lines)),
+                         [{'title': 'Movie 1'}, None, []])
+
+
+if __name__ == "__main__":
+    unittest.main()
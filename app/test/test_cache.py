@@ -0,0 +1,111 @@
+import unittest
+
+from app.main.util.cache import ServiceCache, LRUCache, RedisCache
+
+
+class FakeRedis():
+    """In-memory stand-in for the redis-py calls RedisCache makes"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1).encode()
+        return int(self.data[key])
+
+
+class ServiceCacheTestCase(unittest.TestCase):
+    """This class represents the service cache test case"""
+
+    backends = [
+        lambda: LRUCache(maxsize=16, ttl=60),
+        lambda: RedisCache(FakeRedis(), ttl=60),
+    ]
+
+    def make_service(self, backend):
+        cache = ServiceCache(backend)
+        calls = []
+
+        @cache.item('movies')
+        def get_movie(movie_id):
+            calls.append(('get_movie', movie_id))
+            return {'id': int(movie_id)}
+
+        @cache.listing('movies')
+        def get_movies(page, per_page):
+            calls.append(('get_movies', page))
+            return [page, per_page]
+
+        return cache, get_movie, get_movies, calls
+
+    def test_reads_are_served_from_cache(self):
+        for backend in self.backends:
+            cache, get_movie, get_movies, calls = self.make_service(backend())
+
+            self.assertEqual(get_movie('1'), {'id': 1})
+            self.assertEqual(get_movie(1), {'id': 1})
+            self.assertEqual(get_movies(1, 10), [1, 10])
+            self.assertEqual(get_movies(1, 10), [1, 10])
+            self.assertEqual(len(calls), 2)
+            self.assertEqual(cache.stats()['hit_ratio'], 0.5)
+
+    def test_invalidate_drops_item_and_list_pages(self):
+        for backend in self.backends:
+            cache, get_movie, get_movies, calls = self.make_service(backend())
+            get_movie(1)
+            get_movie(2)
+            get_movies(1, 10)
+
+            cache.invalidate('movies', 1)
+            get_movie(1)
+            get_movie(2)
+            get_movies(1, 10)
+
+            self.assertEqual(calls.count(('get_movie', 1)), 2)
+            self.assertEqual(calls.count(('get_movie', 2)), 1)
+            self.assertEqual(calls.count(('get_movies', 1)), 2)
+
+    def test_batch_reads_share_item_entries(self):
+        for backend in self.backends:
+            cache, get_movie, get_movies, calls = self.make_service(backend())
+
+            @cache.items('movies', get_movie)
+            def get_movies_by_ids(movie_ids):
+                calls.append(('get_movies_by_ids', movie_ids))
+                return {movie_id: {'id': movie_id}
+                        for movie_id in movie_ids if movie_id < 10}
+
+            get_movie(1)
+            self.assertEqual(get_movies_by_ids([1, 2, 99, 2]), {
+                1: {'id': 1}, 2: {'id': 2}, 99: None
+            })
+            self.assertEqual(get_movies_by_ids([2, 99]),
+                             {2: {'id': 2}, 99: None})
+            self.assertEqual(get_movie(2), {'id': 2})
+            self.assertEqual(calls, [('get_movie', 1),
+                                     ('get_movies_by_ids', [2, 99])])
+
+            cache.invalidate('movies', 2)
+            get_movies_by_ids([1, 2])
+            self.assertEqual(calls[-1], ('get_movies_by_ids', [2]))
+
+    def test_nothing_is_cached_without_backend(self):
+        cache, get_movie, get_movies, calls = self.make_service(None)
+        get_movie(1)
+        get_movie(1)
+
+        self.assertEqual(len(calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
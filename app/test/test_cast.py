@@ -0,0 +1,180 @@
+import time
+import unittest
+
+from sqlalchemy import create_engine, event
+
+from app import blueprint
+from app.main import create_app, db
+from app.main.auth.auth import token_cache
+from app.main.model.actor import Actor
+from app.main.model.cast import Cast
+from app.main.model.movie import Movie
+
+TOKEN = 'cast-test-token'
+
+
+class CastTestCase(unittest.TestCase):
+    """This class tests the cast of movies"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app.register_blueprint(blueprint)
+        self.client = self.app.test_client
+        self.auth_header = {'Authorization': 'Bearer ' + TOKEN}
+        token_cache.set(TOKEN, {
+            'exp': time.time() + 3600,
+            'permissions': ['get:movies', 'get:actors', 'update:movie',
+                            'delete:movie']
+        })
+
+        with self.app.app_context():
+            db.drop_all()
+            db.create_all()
+            self.engine = db.engine
+
+    def tearDown(self):
+        token_cache.clear()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def seed(self, movies, actors_per_movie):
+        with self.app.app_context():
+            for i in range(movies):
+                movie = Movie(title='Movie %d' % i,
+                              release_date='2019-10-%02d' % (i + 1))
+                db.session.add(movie)
+                db.session.flush()
+                for j in range(actors_per_movie):
+                    actor = Actor(name='Actor %d-%d' % (i, j), age=30,
+                                  gender='FEMALE')
+                    db.session.add(actor)
+                    db.session.flush()
+                    db.session.add(Cast(movie_id=movie.id,
+                                        actor_id=actor.id,
+                                        role='Role %d' % j))
+            db.session.commit()
+            db.session.remove()
+
+    def cast(self, movie_id, actor_id, role, status=200):
+        res = self.client().put(
+            '/movies/%s/actors/%s' % (movie_id, actor_id),
+            json={'role': role}, headers=self.auth_header)
+        self.assertEqual(res.status_code, status)
+        return res
+
+    def get(self, url, status=200, **params):
+        res = self.client().get(url, query_string=params,
+                                headers=self.auth_header)
+        self.assertEqual(res.status_code, status)
+        return res
+
+    def count_selects(self, url, **params):
+        statements = []
+
+        def capture(conn, cursor, statement, *args):
+            if statement.lstrip().upper().startswith('SELECT'):
+                statements.append(statement)
+
+        event.listen(self.engine, 'before_cursor_execute', capture)
+        try:
+            self.get(url, **params)
+        finally:
+            event.remove(self.engine, 'before_cursor_execute', capture)
+        return len(statements)
+
+    def test_cast_and_list(self):
+        self.seed(1, 2)
+        data = self.get('/movies/1/actors').get_json()
+        self.assertEqual([(actor['name'], actor['role'])
+                          for actor in data['actors']],
+                         [('Actor 0-0', 'Role 0'), ('Actor 0-1', 'Role 1')])
+
+        self.cast(1, 2, 'Lead')
+        data = self.get('/actors/2/movies').get_json()
+        self.assertEqual(data['movies'], [{
+            'id': 1, 'title': 'Movie 0', 'release_date': '2019-10-01',
+            'role': 'Lead'
+        }])
+
+    def test_uncast(self):
+        self.seed(1, 1)
+        res = self.client().delete('/movies/1/actors/1',
+                                   headers=self.auth_header)
+        self.assertEqual(res.status_code, 204)
+        self.assertEqual(self.get('/movies/1/actors').get_json(),
+                         {'actors': []})
+        etag = self.get('/movies/1').headers['ETag']
+        res = self.client().delete('/movies/1/actors/1',
+                                   headers=self.auth_header)
+        self.assertEqual(res.status_code, 404)
+        # the movie and actor touched before the delete are rolled back
+        self.assertEqual(self.get('/movies/1').headers['ETag'], etag)
+
+    def test_invalid_cast(self):
+        self.seed(1, 1)
+        data = self.cast(1, 1, '', status=400).get_json()
+        self.assertEqual(data['error']['description'],
+                         'role cannot be empty.')
+        self.cast(1, 99, 'Extra', status=404)
+        self.cast(99, 1, 'Extra', status=404)
+        self.get('/movies/99/actors', 404)
+
+    def test_cast_change_changes_etag(self):
+        self.seed(1, 1)
+        etag = self.get('/movies/', embed='cast').headers['ETag']
+        self.cast(1, 1, 'Villain')
+        res = self.client().get('/movies/', query_string={'embed': 'cast'},
+                                headers=dict(self.auth_header,
+                                             **{'If-None-Match': etag}))
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.get_json()['movies'][0]['cast'][0]['role'],
+                         'Villain')
+
+    def test_embed_changes_list_etag(self):
+        # nothing left to embed, so both lists have the same rows
+        self.seed(1, 1)
+        self.client().delete('/movies/1/actors/1', headers=self.auth_header)
+        for url in ('/movies/', '/actors/'):
+            self.assertNotEqual(self.get(url).headers['ETag'],
+                                self.get(url, embed='cast').headers['ETag'])
+
+    def test_movie_delete_cascades(self):
+        self.seed(1, 1)
+        res = self.client().delete('/movies/1', headers=self.auth_header)
+        self.assertEqual(res.status_code, 204)
+        self.assertEqual(self.get('/actors/1/movies').get_json(),
+                         {'movies': []})
+
+    def test_other_engines_keep_their_pragmas(self):
+        other = create_engine('sqlite://')
+        self.assertEqual(other.execute('PRAGMA foreign_keys').scalar(), 0)
+
+    def test_embed_needs_both_permissions(self):
+        self.seed(1, 1)
+        token_cache.set(TOKEN, {
+            'exp': time.time() + 3600,
+            'permissions': ['get:movies']
+        })
+        self.get('/movies/', 403, embed='cast')
+        self.get('/movies/', 400, embed='crew')
+
+    def test_embedded_cast_is_batched(self):
+        self.seed(1, 1)
+        few = self.count_selects('/movies/', embed='cast')
+        self.seed(9, 5)
+        many = self.count_selects('/movies/', embed='cast')
+        self.assertEqual(few, many)
+
+        data = self.get('/movies/', embed='cast').get_json()
+        self.assertEqual(len(data['movies']), 10)
+        self.assertEqual(sum(len(movie['cast'])
+                             for movie in data['movies']), 46)
+
+        # one more query for the movies of the whole page
+        self.assertEqual(self.count_selects('/actors/', embed='cast'),
+                         self.count_selects('/actors/') + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
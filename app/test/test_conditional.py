@@ -0,0 +1,81 @@
+import time
+import unittest
+
+from app import blueprint
+from app.main import create_app, db
+from app.main.auth.auth import token_cache
+from app.main.model.movie import Movie
+from app.main.model.actor import Actor
+
+TOKEN = 'conditional-test-token'
+
+
+class ConditionalGetTestCase(unittest.TestCase):
+    """This class tests the conditional GETs of single movies and actors"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app.register_blueprint(blueprint)
+        self.client = self.app.test_client
+        self.auth_header = {'Authorization': 'Bearer ' + TOKEN}
+        token_cache.set(TOKEN, {
+            'exp': time.time() + 3600,
+            'permissions': ['get:movies', 'update:movie', 'get:actors',
+                            'update:actor']
+        })
+
+        with self.app.app_context():
+            db.drop_all()
+            db.create_all()
+            db.session.add(Movie(title='Joker', release_date='2019-10-04'))
+            db.session.add(Actor(name='Joaquin', age=45, gender='MALE'))
+            db.session.commit()
+            db.session.remove()
+
+    def tearDown(self):
+        token_cache.clear()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def get(self, url, status=200, **headers):
+        res = self.client().get(url, headers=dict(self.auth_header,
+                                                  **headers))
+        self.assertEqual(res.status_code, status)
+        return res
+
+    def test_if_none_match(self):
+        for url in ('/movies/1', '/actors/1'):
+            etag = self.get(url).headers['ETag']
+            res = self.get(url, 304, **{'If-None-Match': etag})
+            self.assertEqual(res.headers['ETag'], etag)
+            self.assertEqual(res.data, b'')
+            self.get(url, 200, **{'If-None-Match': '"other"'})
+
+    def test_if_modified_since(self):
+        for url in ('/movies/1', '/actors/1'):
+            last_modified = self.get(url).headers['Last-Modified']
+            self.get(url, 304, **{'If-Modified-Since': last_modified})
+            self.get(url, 200, **{
+                'If-Modified-Since': 'Sat, 01 Jan 2000 00:00:00 GMT'})
+            # an entity tag that does not match wins over the date
+            self.get(url, 200, **{'If-None-Match': '"other"',
+                                  'If-Modified-Since': last_modified})
+
+    def test_validators_change_after_patch(self):
+        for url, body in (('/movies/1', {'title': 'Joker: Folie a Deux'}),
+                          ('/actors/1', {'age': 46})):
+            etag = self.get(url).headers['ETag']
+            res = self.client().patch(url, json=body,
+                                      headers=self.auth_header)
+            self.assertEqual(res.status_code, 200)
+            res = self.get(url, 200, **{'If-None-Match': etag})
+            self.assertNotEqual(res.headers['ETag'], etag)
+            self.get(url, 304, **{'If-None-Match': res.headers['ETag']})
+
+    def test_missing_item(self):
+        self.get('/movies/99', 404, **{'If-None-Match': '"any"'})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import time
+import unittest
+from datetime import date, datetime
+from types import SimpleNamespace
+from unittest import mock
+
+from flask_restplus import Model, fields, marshal
+
+from app import blueprint
+from app.main import create_app, db
+from app.main.auth.auth import token_cache
+from app.main.model.actor import Actor, Gender
+from app.main.model.cast import Cast
+from app.main.model.movie import Movie
+from app.main.util import encoder
+from app.main.util.dto import MovieDto, ActorDto
+
+TOKEN = 'encoder-test-token'
+
+# the restplus model the embedded movie list would be marshalled with
+MOVIE_WITH_CAST = Model('movie_with_cast', dict(
+    MovieDto.movie, cast=fields.List(fields.Nested(MovieDto.cast_member))))
+MOVIE_LIST = Model('movie_list_with_cast', dict(
+    MovieDto.movie_list, movies=fields.List(fields.Nested(MOVIE_WITH_CAST))))
+
+# every installed encoder, the standard library one always
+BACKENDS = [('json', encoder._stdlib_dumps)]
+if encoder.orjson is not None:
+    BACKENDS.append(('orjson', encoder.orjson.dumps))
+if encoder.ujson is not None:
+    BACKENDS.append(('ujson', encoder._ujson_dumps))
+
+
+class SerializerTestCase(unittest.TestCase):
+    """This class checks the compiled serializers against marshal()"""
+
+    def assert_marshalled_alike(self, serialize, model, row):
+        self.assertEqual(serialize(row), dict(marshal(row, model)))
+
+    def test_dates_and_none(self):
+        for release_date in (date(2019, 10, 4), datetime(2019, 10, 4, 12),
+                             None):
+            row = SimpleNamespace(id=1, title='Joker',
+                                  release_date=release_date, role=None)
+            self.assert_marshalled_alike(MovieDto.serialize_movie,
+                                         MovieDto.movie, row)
+            self.assert_marshalled_alike(ActorDto.serialize_casting,
+                                         ActorDto.casting, row)
+        self.assertEqual(MovieDto.serialize_movie(SimpleNamespace(
+            id=None, title=None, release_date=None)),
+            {'id': None, 'title': None, 'release_date': None})
+
+    def test_genders(self):
+        row = SimpleNamespace(id=1, name='Joaquin', age=45, gender='MALE',
+                              role='Arthur')
+        self.assert_marshalled_alike(ActorDto.serialize_actor,
+                                     ActorDto.actor, row)
+        self.assert_marshalled_alike(MovieDto.serialize_cast_member,
+                                     MovieDto.cast_member, row)
+        # rows read back from the database hold the enum, which is
+        # written as its name
+        row.gender = Gender.MALE
+        self.assertEqual(ActorDto.serialize_actor(row)['gender'], 'MALE')
+
+
+class FastEncoderTestCase(unittest.TestCase):
+    """This class checks the responses written outside debug mode"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app.config['DEBUG'] = False
+        self.app.register_blueprint(blueprint)
+        self.client = self.app.test_client
+        self.auth_header = {'Authorization': 'Bearer ' + TOKEN}
+        token_cache.set(TOKEN, {
+            'exp': time.time() + 3600,
+            'permissions': ['get:movies', 'get:actors']
+        })
+
+        with self.app.app_context():
+            db.drop_all()
+            db.create_all()
+            db.session.add(Movie(title='Joker', release_date='2019-10-04'))
+            db.session.add(Movie(title='Parasite',
+                                 release_date='2019-05-30'))
+            db.session.add(Actor(name='Joaquin', age=45, gender='MALE'))
+            db.session.flush()
+            db.session.add(Cast(movie_id=1, actor_id=1, role='Arthur'))
+            db.session.commit()
+            db.session.remove()
+
+    def tearDown(self):
+        token_cache.clear()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def get(self, url, **params):
+        res = self.client().get(url, query_string=params,
+                                headers=self.auth_header)
+        self.assertEqual(res.status_code, 200)
+        return res
+
+    def test_embedded_list_matches_marshal(self):
+        expected = marshal({
+            'movies': [
+                {'id': 2, 'title': 'Parasite',
+                 'release_date': date(2019, 5, 30), 'cast': []},
+                {'id': 1, 'title': 'Joker',
+                 'release_date': date(2019, 10, 4),
+                 'cast': [{'id': 1, 'name': 'Joaquin', 'age': 45,
+                           'gender': 'MALE', 'role': 'Arthur'}]},
+            ],
+            'has_next': False, 'next_cursor': None, 'total': None
+        }, MOVIE_LIST)
+        for name, dumps in BACKENDS:
+            with self.subTest(encoder=name), \
+                    mock.patch.object(encoder, 'dumps', dumps):
+                res = self.get('/movies/', embed='cast')
+                self.assertEqual(res.get_json(), expected)
+                # compact, unlike the indented debug output
+                self.assertNotIn(b'\n ', res.data)
+                self.assertTrue(res.data.endswith(b'}\n'))
+
+    def test_item_matches_marshal(self):
+        expected = marshal({'id': 1, 'name': 'Joaquin', 'age': 45,
+                            'gender': 'MALE'}, ActorDto.actor)
+        for name, dumps in BACKENDS:
+            with self.subTest(encoder=name), \
+                    mock.patch.object(encoder, 'dumps', dumps):
+                self.assertEqual(self.get('/actors/1').get_json(), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
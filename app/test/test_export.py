@@ -0,0 +1,43 @@
+import csv
+import gzip
+import io
+import json
+import unittest
+from collections import namedtuple
+
+from app.main.util.export import export_stream
+
+Row = namedtuple('Row', ['id', 'title'])
+
+
+def serialize(row):
+    return {'id': row.id, 'title': row.title}
+
+
+class ExportTestCase(unittest.TestCase):
+    """This class represents the export stream test case"""
+
+    rows = [Row(i, 'Movie, "%d"' % i) for i in range(5000)]
+
+    def test_ndjson(self):
+        data = b''.join(export_stream(iter(self.rows), serialize,
+                                      ['id', 'title'], 'ndjson', False))
+        lines = data.decode('utf-8').splitlines()
+
+        self.assertEqual(len(lines), len(self.rows))
+        self.assertEqual(json.loads(lines[-1]),
+                         {'id': 4999, 'title': 'Movie, "4999"'})
+
+    def test_gzipped_csv(self):
+        chunks = list(export_stream(iter(self.rows), serialize,
+                                    ['id', 'title'], 'csv', True))
+        data = gzip.decompress(b''.join(chunks)).decode('utf-8')
+        records = list(csv.DictReader(io.StringIO(data)))
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(len(records), len(self.rows))
+        self.assertEqual(records[7], {'id': '7', 'title': 'Movie, "7"'})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import json
+import os
+import tempfile
+import unittest
+
+from app.main.auth.jwks import JWKSKeyStore, FileJWKSSource
+
+
+def make_key(kid):
+    return {'kty': 'RSA', 'kid': kid, 'use': 'sig', 'n': 'abc', 'e': 'AQAB'}
+
+
+class FakeClock():
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingSource(FileJWKSSource):
+    def __init__(self, path):
+        super().__init__(path)
+        self.calls = 0
+
+    def fetch(self):
+        self.calls += 1
+        return super().fetch()
+
+
+class JWKSKeyStoreTestCase(unittest.TestCase):
+    """This class represents the JWKS key store test case"""
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        self.write_keys('key-1')
+        self.clock = FakeClock()
+        self.source = CountingSource(self.path)
+        self.store = JWKSKeyStore(self.source, ttl=600, refresh_ahead=0,
+                                  min_refetch_interval=30, clock=self.clock)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def write_keys(self, *kids):
+        with open(self.path, 'w') as jwks_file:
+            json.dump({'keys': [make_key(kid) for kid in kids]}, jwks_file)
+
+    def test_keys_are_fetched_once_within_ttl(self):
+        for _ in range(5):
+            self.assertEqual(self.store.get_key('key-1')['kid'], 'key-1')
+
+        self.assertEqual(self.source.calls, 1)
+
+    def test_keys_are_refetched_after_ttl(self):
+        self.store.get_key('key-1')
+        self.clock.now = 601
+        self.store.get_key('key-1')
+
+        self.assertEqual(self.source.calls, 2)
+
+    def test_unknown_kid_refetch_is_rate_limited(self):
+        self.store.get_key('key-1')
+        self.clock.now = 31
+        self.write_keys('key-1', 'key-2')
+
+        self.assertEqual(self.store.get_key('key-2')['kid'], 'key-2')
+        self.assertIsNone(self.store.get_key('key-3'))
+        self.assertIsNone(self.store.get_key('key-3'))
+        self.assertEqual(self.source.calls, 2)
+
+    def test_stale_keys_are_served_when_source_fails(self):
+        self.store.get_key('key-1')
+        os.remove(self.path)
+        self.clock.now = 601
+
+        self.assertEqual(self.store.get_key('key-1')['kid'], 'key-1')
+        self.write_keys('key-1')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from flask import Response
+
+try:
+    from prometheus_client import CollectorRegistry, generate_latest
+    from prometheus_client.multiprocess import MultiProcessCollector
+except ImportError:
+    CollectorRegistry = None
+
+from app import blueprint
+from app.main import create_app, db
+from app.main.auth.auth import token_cache
+from app.main.auth.jwks import JWKSKeyStore
+from app.main.util.metrics import Metrics, route_labels
+
+TOKEN = 'metrics-test-token'
+STATUS_TOKEN = 'metrics-test-status-token'
+
+# records one request in a process of its own, like a gunicorn worker
+WORKER = '''
+import time
+from app import blueprint
+from app.main import create_app
+from app.main.auth.auth import token_cache
+token_cache.set('worker', {'exp': time.time() + 3600,
+                           'permissions': ['get:status']})
+app = create_app('testing')
+app.config['METRICS_ENABLED'] = True
+from app.main.util.metrics import Metrics
+Metrics().init_app(app)
+app.register_blueprint(blueprint)
+assert app.test_client().get(
+    '/status/pool',
+    headers={'Authorization': 'Bearer worker'}).status_code == 200
+'''
+
+
+class FailingSource():
+    def fetch(self):
+        raise OSError('unreachable')
+
+
+@unittest.skipIf(CollectorRegistry is None,
+                 'prometheus_client is not installed')
+class MetricsTestCase(unittest.TestCase):
+    """This class tests the Prometheus metrics"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app.config['METRICS_ENABLED'] = True
+        self.metrics = Metrics()
+        self.metrics.init_app(self.app)
+        self.app.register_blueprint(blueprint)
+        self.client = self.app.test_client
+        token_cache.set(TOKEN, {
+            'exp': time.time() + 3600,
+            'permissions': ['get:movies']
+        })
+        token_cache.set(STATUS_TOKEN, {
+            'exp': time.time() + 3600,
+            'permissions': ['get:status']
+        })
+        self.status_header = {'Authorization': 'Bearer ' + STATUS_TOKEN}
+        with self.app.app_context():
+            db.create_all()
+
+    def tearDown(self):
+        token_cache.clear()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def test_requests_by_route(self):
+        headers = {'Authorization': 'Bearer ' + TOKEN}
+        self.client().get('/movies/', headers=headers)
+        self.client().get('/movies/1', headers=headers)
+        self.client().get('/movies/2', headers=headers)
+
+        res = self.client().get('/metrics', headers=self.status_header)
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.content_type.startswith('text/plain'))
+        text = res.get_data(as_text=True)
+        self.assertIn('http_requests_total{method="GET",namespace="Movie",'
+                      'route="movie",status="404"} 2.0', text)
+        self.assertIn('http_request_duration_seconds_count{method="GET",'
+                      'namespace="Movie",route="movie_list"} 1.0', text)
+
+    def test_route_labels(self):
+        self.assertEqual(route_labels('api.Movie_movie_cast_member'),
+                         ('Movie', 'movie_cast_member'))
+        self.assertEqual(route_labels('api.specs'), ('none', 'specs'))
+        self.assertEqual(route_labels(None), ('none', 'unmatched'))
+
+    def test_jwks_fetch_timing(self):
+        store = JWKSKeyStore(FailingSource())
+        with mock.patch('app.main.auth.jwks.metrics', self.metrics):
+            with self.assertLogs('app.main.auth.jwks', 'WARNING'):
+                store.refresh()
+        text = generate_latest(self.metrics.registry).decode()
+        self.assertIn('auth_jwks_fetch_seconds_count{outcome="error"} 1.0',
+                      text)
+
+    def test_recording_overhead(self):
+        response = Response(status=200)
+        with self.app.test_request_context('/movies/'):
+            started = time.perf_counter()
+            for _ in range(10000):
+                self.metrics._start()
+                self.metrics._observe_response(response)
+            seconds = (time.perf_counter() - started) / 10000
+        # a few microseconds, with room for slow machines
+        self.assertLess(seconds, 50e-6)
+
+    def test_status_routes_need_permission(self):
+        for url in ('/status/pool', '/metrics'):
+            res = self.client().get(url)
+            self.assertEqual(res.status_code, 401)
+            res = self.client().get(url, headers={
+                'Authorization': 'Bearer ' + TOKEN})
+            self.assertEqual(res.status_code, 403)
+
+    def test_workers_are_merged(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        env = dict(os.environ, prometheus_multiproc_dir=directory)
+        for _ in range(2):
+            subprocess.run([sys.executable, '-c', WORKER], env=env,
+                           check=True)
+
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry, path=directory)
+        text = generate_latest(registry).decode()
+        self.assertIn('http_requests_total{method="GET",namespace="Status",'
+                      'route="pool_status",status="200"} 2.0', text)
+
+
+if __name__ == "__main__":
+    unittest.main()
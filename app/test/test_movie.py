@@ -47,6 +47,7 @@ class MovieTestCase(unittest.TestCase):
             release_date="2019-10-04"
         )
         movie.insert()
+        db.session.commit()
 
     def test_get_movies(self):
         res = self.client().get('/movies/', headers=self.auth_header)
@@ -0,0 +1,142 @@
+import time
+import unittest
+
+from sqlalchemy import event
+
+from app import blueprint
+from app.main import create_app, db
+from app.main.auth.auth import token_cache
+from app.main.model.movie import Movie
+from app.main.model.actor import Actor
+from app.main.controller.movie_controller import MOVIES_PER_PAGE
+from app.main.util import pagination
+from app.main.util.pagination import encode_cursor
+
+TOKEN = 'pagination-test-token'
+
+
+class PaginationTestCase(unittest.TestCase):
+    """This class tests the pages of the movie and actor lists"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app.register_blueprint(blueprint)
+        self.client = self.app.test_client
+        self.auth_header = {'Authorization': 'Bearer ' + TOKEN}
+        token_cache.set(TOKEN, {
+            'exp': time.time() + 3600,
+            'permissions': ['get:movies', 'get:actors']
+        })
+        # totals are cached per table, also across test cases
+        pagination._counts.clear()
+
+        with self.app.app_context():
+            db.drop_all()
+            db.create_all()
+            db.session.add(Movie(title='Joker', release_date='2019-10-04'))
+            db.session.add(Actor(name='Joaquin', age=45, gender='MALE'))
+            db.session.commit()
+            db.session.remove()
+
+    def tearDown(self):
+        token_cache.clear()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def get(self, url, status=200, **params):
+        res = self.client().get(url, query_string=params,
+                                headers=self.auth_header)
+        self.assertEqual(res.status_code, status)
+        return res.get_json()
+
+    def add_movies(self, titles):
+        with self.app.app_context():
+            for title in titles:
+                db.session.add(Movie(title=title, release_date='2019-10-04'))
+            db.session.commit()
+            db.session.remove()
+
+    def follow_cursors(self, url, key, limit):
+        pages, cursor = [], ''
+        while cursor is not None:
+            data = self.get(url, cursor=cursor, limit=limit)
+            pages.append([item['id'] for item in data[key]])
+            self.assertEqual(data['has_next'], data['next_cursor'] is not None)
+            cursor = data['next_cursor']
+        return pages
+
+    def test_cursor_pages_cover_every_row_once(self):
+        # ties on the title are ordered by id, also across pages
+        self.add_movies(['Parasite', 'Joker', 'Parasite', 'Joker', 'Us'])
+        self.assertEqual(self.follow_cursors('/movies/', 'movies', 2),
+                         [[6, 4], [2, 5], [3, 1]])
+
+        with self.app.app_context():
+            for i in range(4):
+                db.session.add(Actor(name='Joaquin', age=40 + i,
+                                     gender='MALE'))
+            db.session.commit()
+            db.session.remove()
+        self.assertEqual(self.follow_cursors('/actors/', 'actors', 3),
+                         [[5, 4, 3], [2, 1]])
+
+    def count_queries(self, url, **params):
+        statements = []
+
+        def capture(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        with self.app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', capture)
+        try:
+            data = self.get(url, **params)
+        finally:
+            event.remove(engine, 'before_cursor_execute', capture)
+        return data, sum('count(' in statement.lower()
+                         for statement in statements)
+
+    def test_has_next_without_count(self):
+        self.add_movies(['Movie %d' % i for i in range(MOVIES_PER_PAGE - 1)])
+        data, counts = self.count_queries('/movies/')
+        self.assertEqual(len(data['movies']), MOVIES_PER_PAGE)
+        self.assertFalse(data['has_next'])
+        self.assertIsNone(data['total'])
+        self.assertEqual(counts, 0)
+
+        # one row past the page is what tells a next page exists
+        self.add_movies(['Movie'])
+        data, counts = self.count_queries('/movies/')
+        self.assertTrue(data['has_next'])
+        self.assertEqual(counts, 0)
+        data = self.get('/movies/', page=2)
+        self.assertEqual(len(data['movies']), 1)
+        self.assertFalse(data['has_next'])
+
+    def test_include_total(self):
+        self.add_movies(['Parasite', 'Us'])
+        data, counts = self.count_queries('/movies/', include_total='true')
+        self.assertEqual(data['total'], 3)
+        self.assertEqual(counts, 1)
+        data = self.get('/movies/', cursor='', limit=1, include_total='true')
+        self.assertEqual((len(data['movies']), data['total']), (1, 3))
+        self.assertEqual(self.get('/actors/', include_total='TRUE')['total'],
+                         1)
+        self.assertIsNone(self.get('/actors/', include_total='yes')['total'])
+
+    def test_invalid_cursors(self):
+        cursors = ['not base64!', encode_cursor('Joker'),
+                   encode_cursor(['Joker']), encode_cursor([{'a': 1}, 3]),
+                   encode_cursor(['Joker', 'notint']),
+                   encode_cursor(['Joker', True]),
+                   encode_cursor([1, 2])]
+        for url in ('/movies/', '/actors/'):
+            for cursor in cursors:
+                data = self.get(url, 400, cursor=cursor)
+                self.assertEqual(data['error']['description'],
+                                 'cursor is invalid.')
+
+
+if __name__ == "__main__":
+    unittest.main()
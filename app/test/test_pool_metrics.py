@@ -0,0 +1,55 @@
+import unittest
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError
+
+from app.main.util.pool_metrics import (InstrumentedQueuePool, Histogram,
+                                        pool_metrics)
+
+
+class PoolMetricsTestCase(unittest.TestCase):
+    """This class represents the connection pool metrics test case"""
+
+    def setUp(self):
+        pool_metrics.reset()
+        self.engine = create_engine('sqlite://',
+                                    poolclass=InstrumentedQueuePool,
+                                    pool_size=1, max_overflow=1,
+                                    pool_timeout=0.05)
+
+    def tearDown(self):
+        self.engine.dispose()
+        pool_metrics.reset()
+        pool_metrics.pool = None
+
+    def test_checkouts_overflow_and_timeouts(self):
+        first = self.engine.connect()
+        second = self.engine.connect()
+        with self.assertLogs('app.main.util.pool_metrics', 'ERROR'):
+            with self.assertRaises(TimeoutError):
+                self.engine.connect()
+
+        stats = pool_metrics.stats()
+        self.assertEqual(stats['in_use'], 2)
+        self.assertEqual(stats['overflow'], 1)
+        self.assertEqual(stats['overflows'], 1)
+        self.assertEqual(stats['timeouts'], 1)
+        self.assertEqual(stats['checkout_seconds']['count'], 3)
+
+        first.close()
+        second.close()
+        stats = pool_metrics.stats()
+        self.assertEqual(stats['in_use'], 0)
+        self.assertEqual(stats['idle'], 1)
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram([0.1, 1])
+        for value in (0.05, 0.5, 0.7, 3):
+            histogram.observe(value)
+
+        self.assertEqual(histogram.snapshot()['buckets'],
+                         [(0.1, 1), (1, 3), ('+Inf', 4)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import os
+import runpy
+import unittest
+
+from app import blueprint
+from app.main import create_app, db
+from app.main.util import prefork
+from app.main.util.pool_metrics import pool_metrics
+
+GUNICORN_CONF = os.path.join(os.path.dirname(__file__), '..', '..',
+                             'gunicorn.conf.py')
+
+
+class PreforkTestCase(unittest.TestCase):
+    """This class tests the gunicorn settings and fork hooks"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app.register_blueprint(blueprint)
+        with self.app.app_context():
+            db.create_all()
+            db.session.remove()
+
+    def tearDown(self):
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def query(self):
+        with self.app.app_context():
+            value = db.session.execute('SELECT 1').scalar()
+            db.session.remove()
+        return value
+
+    def idle_connections(self):
+        # NullPool, used for SQLite files, keeps no connections
+        with self.app.app_context():
+            pool = db.engine.pool
+            return pool.checkedin() if hasattr(pool, 'checkedin') else 0
+
+    def test_worker_gets_its_own_pool(self):
+        self.query()
+        with self.app.app_context():
+            inherited = db.engine.pool
+
+        prefork.after_fork(self.app)
+
+        with self.app.app_context():
+            self.assertIsNot(db.engine.pool, inherited)
+        self.assertEqual(self.idle_connections(), 0)
+        self.assertIsNone(pool_metrics.pool)
+        self.assertEqual(pool_metrics.checkout_seconds.count, 0)
+        self.assertEqual(self.query(), 1)
+
+    def test_master_closes_its_connections(self):
+        self.query()
+
+        prefork.before_fork(self.app)
+
+        self.assertEqual(self.idle_connections(), 0)
+        self.assertEqual(self.query(), 1)
+
+    def test_workers_are_sized_by_worker_class(self):
+        settings = runpy.run_path(GUNICORN_CONF)
+        default_workers = settings['default_workers']
+
+        self.assertTrue(settings['preload_app'])
+        self.assertEqual(default_workers('sync', 4), 9)
+        self.assertEqual(default_workers('gthread', 4), 5)
+        self.assertEqual(default_workers('gevent', 4), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
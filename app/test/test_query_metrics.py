@@ -0,0 +1,94 @@
+import time
+import unittest
+
+from sqlalchemy import create_engine, event
+
+from app import blueprint
+from app.main import create_app, db
+from app.main.auth.auth import token_cache
+from app.main.model.movie import Movie
+from app.main.util.query_metrics import (query_metrics, redact,
+                                         _statement_started)
+
+TOKEN = 'query-metrics-test-token'
+
+
+class QueryMetricsTestCase(unittest.TestCase):
+    """This class tests the per-request query metrics"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app.register_blueprint(blueprint)
+        self.client = self.app.test_client
+        self.auth_header = {'Authorization': 'Bearer ' + TOKEN}
+        token_cache.set(TOKEN, {
+            'exp': time.time() + 3600,
+            'permissions': ['get:movies', 'create:movie']
+        })
+
+        with self.app.app_context():
+            db.drop_all()
+            db.create_all()
+            db.session.add(Movie(title='Joker', release_date='2019-10-04'))
+            db.session.commit()
+            db.session.remove()
+
+    def tearDown(self):
+        token_cache.clear()
+        query_metrics.slow_query = 0.5
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def server_timing(self, res):
+        return dict(metric.split(';', 1) for metric in
+                    res.headers['Server-Timing'].split(', '))
+
+    def test_server_timing_header(self):
+        res = self.client().get('/movies/', headers=self.auth_header)
+        self.assertEqual(res.status_code, 200)
+        timing = self.server_timing(res)
+        self.assertRegex(timing['db'], r'^dur=\d+\.\d\d;desc="1 queries"$')
+        self.assertIn('db-slowest', timing)
+        self.assertIn('app', timing)
+
+    def test_writes_are_counted_with_their_commit(self):
+        res = self.client().post('/movies/', headers=self.auth_header,
+                                 json={'title': 'Parasite',
+                                       'release_date': '2019-05-30'})
+        self.assertEqual(res.status_code, 201)
+        self.assertIn('desc="1 queries"', res.headers['Server-Timing'])
+
+    def test_header_is_opt_in(self):
+        query_metrics.server_timing = False
+        try:
+            res = self.client().get('/movies/', headers=self.auth_header)
+        finally:
+            query_metrics.server_timing = True
+        self.assertNotIn('Server-Timing', res.headers)
+
+    def test_slow_queries_are_logged_redacted(self):
+        query_metrics.slow_query = 0
+        with self.assertLogs('app.main.util.query_metrics', 'WARNING') as log:
+            self.client().get('/movies/', headers=self.auth_header,
+                              query_string={'title': 'Secret title'})
+        self.assertIn('slow query took', log.output[0])
+        self.assertNotIn('Secret', ' '.join(log.output))
+
+    def test_other_engines_are_not_timed(self):
+        with self.app.app_context():
+            self.assertTrue(event.contains(db.engine, 'before_cursor_execute',
+                                           _statement_started))
+        other = create_engine('sqlite://')
+        self.assertFalse(event.contains(other, 'before_cursor_execute',
+                                        _statement_started))
+
+    def test_redact(self):
+        self.assertEqual(redact({'title': 'Joker'}), {'title': '?'})
+        self.assertEqual(redact(('Joker', 1)), ('?', '?'))
+        self.assertEqual(redact([('Joker',), ('Parasite',)]),
+                         "2 rows of ('?',)")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+from datetime import datetime
+
+from sqlalchemy import event
+
+from app.main import create_app, db
+from app.main.model.movie import Movie
+from app.main.model.actor import Actor
+from app.main.model.cast import Cast
+from app.main.service import movie_service, actor_service, cast_service
+from app.main.util.pagination import encode_cursor
+
+
+class QueryPlanTestCase(unittest.TestCase):
+    """This class checks that list queries are served by indexes"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        if db.engine.dialect.name != 'postgresql':
+            self.app_context.pop()
+            self.skipTest('query plans are checked on PostgreSQL only')
+
+        db.create_all()
+        db.session.execute(Movie.__table__.insert(), [
+            {'title': 'Movie %d' % i, 'release_date': datetime(2019, 1, 1)}
+            for i in range(50)
+        ])
+        db.session.execute(Actor.__table__.insert(), [
+            {'name': 'Actor %d' % i, 'age': 20 + i, 'gender': 'MALE'}
+            for i in range(50)
+        ])
+        db.session.flush()
+        db.session.execute(Cast.__table__.insert(), [
+            {'movie_id': movie_id, 'actor_id': actor_id, 'role': 'Role'}
+            for movie_id, actor_id in db.session.query(Movie._id, Actor._id)
+        ])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def explain_first_select(self, call):
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, many):
+            statements.append((statement, parameters))
+
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        try:
+            call()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capture)
+
+        statement, parameters = statements[0]
+        connection = db.session.connection()
+        # tiny test tables would otherwise always be scanned sequentially
+        connection.execute('SET LOCAL enable_seqscan = off')
+        rows = connection.execute('EXPLAIN ' + statement, parameters)
+        return '\n'.join(row[0] for row in rows)
+
+    def assert_index_scan(self, plan):
+        self.assertIn('Index', plan)
+        self.assertNotIn('Seq Scan', plan)
+        self.assertNotIn('Sort', plan)
+
+    def test_movie_list_queries_use_index(self):
+        cursor = encode_cursor(['Movie 40', 40])
+        self.assert_index_scan(self.explain_first_select(
+            lambda: movie_service.get_movies(2, 10)))
+        self.assert_index_scan(self.explain_first_select(
+            lambda: movie_service.get_movies_after(cursor, 10)))
+
+    def test_movie_searches_use_search_indexes(self):
+        searches = [
+            (movie_service.MovieFilters(title='Movie 4'),
+             'ix_movies_title_trgm'),
+            (movie_service.MovieFilters(title_contains='ovie 4'),
+             'ix_movies_title_trgm'),
+            (movie_service.MovieFilters(q='movie'), 'ix_movies_title_tsv'),
+        ]
+        for filters, index in searches:
+            plan = self.explain_first_select(
+                lambda: movie_service.get_movies(1, 10, filters=filters))
+            self.assertIn(index, plan)
+
+    def test_actor_list_queries_use_index(self):
+        cursor = encode_cursor(['Actor 40', 40])
+        self.assert_index_scan(self.explain_first_select(
+            lambda: actor_service.get_actors(2, 10)))
+        self.assert_index_scan(self.explain_first_select(
+            lambda: actor_service.get_actors_after(cursor, 10)))
+
+    def test_actor_filters_use_index(self):
+        self.assert_index_scan(self.explain_first_select(
+            lambda: actor_service.get_actors_after(
+                '', 10, filters=actor_service.ActorFilters(gender='MALE'))))
+        filters = actor_service.ActorFilters(gender='MALE', min_age=30,
+                                             max_age=40)
+        # the planner may read the range from either gender index, and
+        # sort what it found when it picks (gender, age)
+        plan = self.explain_first_select(
+            lambda: actor_service.get_actors_after('', 10, filters=filters))
+        self.assertIn('ix_actors_gender_', plan)
+        self.assertNotIn('Seq Scan', plan)
+        plan = self.explain_first_select(
+            lambda: actor_service.get_actor_stats(10, filters=filters))
+        self.assertIn('ix_actors_gender_age', plan)
+
+    def test_cast_queries_use_index(self):
+        plan = self.explain_first_select(
+            lambda: cast_service.get_casts([1, 2, 3]))
+        self.assertIn('casts_pkey', plan)
+        plan = self.explain_first_select(
+            lambda: cast_service.get_castings([1, 2, 3]))
+        self.assertIn('ix_casts_actor_id', plan)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import time
+import unittest
+
+from app import blueprint
+from app.main import create_app, db
+from app.main.auth.auth import token_cache
+from app.main.model.movie import Movie
+
+TOKEN = 'search-test-token'
+
+MOVIES = [
+    ('Joker', '2019-10-04'),
+    ('Jojo Rabbit', '2019-10-18'),
+    ('The Irishman', '2019-11-01'),
+    ('Marriage Story', '2019-11-06'),
+    ('Little Women', '2019-12-25'),
+    ('100% Wolf', '2020-05-21'),
+    ('Women Talking', '2022-12-23'),
+]
+
+
+class MovieSearchTestCase(unittest.TestCase):
+    """This class tests the filters of the movie list"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app.register_blueprint(blueprint)
+        self.client = self.app.test_client
+        self.auth_header = {'Authorization': 'Bearer ' + TOKEN}
+        token_cache.set(TOKEN, {
+            'exp': time.time() + 3600,
+            'permissions': ['get:movies']
+        })
+
+        with self.app.app_context():
+            db.create_all()
+            for title, release_date in MOVIES:
+                db.session.add(Movie(title=title, release_date=release_date))
+            db.session.commit()
+            db.session.remove()
+
+    def tearDown(self):
+        token_cache.clear()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def search(self, status=200, **params):
+        res = self.client().get('/movies/', query_string=params,
+                                headers=self.auth_header)
+        self.assertEqual(res.status_code, status)
+        return res.get_json()
+
+    def titles(self, **params):
+        return [movie['title'] for movie in self.search(**params)['movies']]
+
+    def test_title_prefix(self):
+        self.assertEqual(self.titles(title='jo'), ['Joker', 'Jojo Rabbit'])
+
+    def test_title_substring(self):
+        self.assertEqual(self.titles(title_contains='WOMEN'),
+                         ['Women Talking', 'Little Women'])
+        # wildcards are matched literally
+        self.assertEqual(self.titles(title_contains='%'), ['100% Wolf'])
+
+    def test_full_text_search(self):
+        self.assertEqual(self.titles(q='women little'), ['Little Women'])
+
+    def test_release_date_range(self):
+        self.assertEqual(self.titles(release_date_from='2019-11-01',
+                                     release_date_to='2019-12-25'),
+                         ['The Irishman', 'Marriage Story', 'Little Women'])
+
+    def test_filters_apply_to_cursor_pages(self):
+        page = self.search(release_date_to='2019-12-31', cursor='', limit=2,
+                           include_total='true')
+        self.assertEqual(page['total'], 5)
+        self.assertEqual([movie['title'] for movie in page['movies']],
+                         ['The Irishman', 'Marriage Story'])
+
+        self.assertEqual(self.titles(release_date_to='2019-12-31',
+                                     cursor=page['next_cursor'], limit=2),
+                         ['Little Women', 'Joker'])
+
+    def test_invalid_date(self):
+        data = self.search(400, release_date_to='25/12/2019')
+        self.assertEqual(data['error'], {
+            'status': 400,
+            'description': 'release_date_to format should be YYYY-MM-DD'
+        })
+
+    def test_no_match(self):
+        self.search(404, title='Parasite')
+
+
+if __name__ == "__main__":
+    unittest.main()
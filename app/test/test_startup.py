@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.join(os.path.dirname(__file__), '..', '..')
+
+# seconds to import wsgi, which also builds the app; about 0.8s on a
+# laptop, so this only fails on a real regression
+STARTUP_BUDGET = float(os.getenv('STARTUP_BUDGET', 2.0))
+
+# only needed by manage.py or the tests
+LAZY_MODULES = ('alembic', 'flask_migrate', 'flask_script', 'requests')
+
+STARTUP = """
+import sys
+import wsgi
+from app import api
+print(api._schema is None)
+print(','.join(name for name in %r if name in sys.modules))
+""" % (LAZY_MODULES,)
+
+
+def import_times(stderr):
+    """
+    import_times: parses the output of python -X importtime
+    Returns:
+        returns the cumulative import time of each module, in seconds
+    """
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+class StartupTestCase(unittest.TestCase):
+    """This class tests what the web app loads when it starts"""
+
+    def start(self):
+        env = dict(os.environ, FLASK_ENV='testing')
+        # only the active config's database URL is read
+        env.pop('DATABASE_URL', None)
+        env.pop('DEV_DATABASE_URL', None)
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP],
+            cwd=ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            universal_newlines=True)
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+        return result.stdout.splitlines(), import_times(result.stderr)
+
+    def test_startup(self):
+        (schema_deferred, lazy_modules), times = self.start()
+
+        self.assertEqual(schema_deferred, 'True')
+        self.assertEqual(lazy_modules, '')
+        self.assertLess(times['wsgi'], STARTUP_BUDGET)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+
+from app.main.auth.token_cache import TokenCache
+
+
+class TokenCacheTestCase(unittest.TestCase):
+    """This class represents the verified token cache test case"""
+
+    def setUp(self):
+        self.now = 1000
+        self.cache = TokenCache(maxsize=2, clock=lambda: self.now)
+
+    def test_cached_payload_is_returned_until_exp(self):
+        payload = {'sub': 'user', 'exp': 1060}
+        self.cache.set('token', payload)
+
+        self.assertIs(self.cache.get('token'), payload)
+        self.now = 1060
+        self.assertIsNone(self.cache.get('token'))
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(self.cache.stats()['misses'], 1)
+
+    def test_least_recently_used_token_is_evicted(self):
+        for token in ('a', 'b'):
+            self.cache.set(token, {'exp': 2000})
+        self.cache.get('a')
+        self.cache.set('c', {'exp': 2000})
+
+        self.assertIsNotNone(self.cache.get('a'))
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(self.cache.stats()['size'], 2)
+
+    def test_token_without_exp_is_not_cached(self):
+        self.cache.set('token', {'sub': 'user'})
+
+        self.assertIsNone(self.cache.get('token'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import time
+import unittest
+
+from sqlalchemy import create_engine, event
+
+from app import blueprint
+from app.main import create_app, db
+from app.main.auth.auth import token_cache
+from app.main.model.movie import Movie
+from app.main.model.actor import Actor
+from app.main.util.unit_of_work import CLEAN, _reset_connection
+
+TOKEN = 'unit-of-work-test-token'
+
+
+class UnitOfWorkTestCase(unittest.TestCase):
+    """This class counts the database round trips of each endpoint"""
+
+    def setUp(self):
+        self.app = create_app('testing')
+        self.app.register_blueprint(blueprint)
+        self.client = self.app.test_client
+        self.auth_header = {'Authorization': 'Bearer ' + TOKEN}
+        token_cache.set(TOKEN, {
+            'exp': time.time() + 3600,
+            'permissions': ['get:movies', 'create:movie', 'update:movie',
+                            'delete:movie', 'get:actors', 'create:actor',
+                            'update:actor', 'delete:actor']
+        })
+
+        with self.app.app_context():
+            db.create_all()
+            db.session.add(Movie(title='Joker', release_date='2019-10-04'))
+            db.session.add(Actor(name='Joaquin', age=45, gender='MALE'))
+            db.session.commit()
+            db.session.remove()
+            self.engine = db.engine
+
+        self.trips = []
+        event.listen(self.engine, 'before_cursor_execute', self.statement)
+        event.listen(self.engine, 'commit', self.transaction_ended)
+        event.listen(self.engine, 'rollback', self.transaction_ended)
+        # runs before the reset listener of unit_of_work clears the flag
+        event.listen(self.engine.pool, 'reset', self.reset, insert=True)
+
+    def tearDown(self):
+        event.remove(self.engine.pool, 'reset', self.reset)
+        event.remove(self.engine, 'rollback', self.transaction_ended)
+        event.remove(self.engine, 'commit', self.transaction_ended)
+        event.remove(self.engine, 'before_cursor_execute', self.statement)
+        token_cache.clear()
+        with self.app.app_context():
+            db.session.remove()
+            db.drop_all()
+
+    def statement(self, conn, cursor, statement, parameters, context,
+                  executemany):
+        self.trips.append(statement.split()[0])
+
+    def transaction_ended(self, conn):
+        self.trips.append('END')
+
+    def reset(self, dbapi_connection, connection_record):
+        if not connection_record.info.get(CLEAN):
+            self.trips.append('RESET')
+
+    def round_trips(self, method, url, status, **kwargs):
+        del self.trips[:]
+        res = getattr(self.client(), method)(url, headers=self.auth_header,
+                                             **kwargs)
+        self.assertEqual(res.status_code, status)
+        return self.trips[:]
+
+    def test_writes_end_with_a_single_commit(self):
+        # before the unit of work every write also sent the pool's
+        # rollback-on-return after its commit: 3, 4 and 4 round trips
+        if self.engine.dialect.name == 'postgresql':
+            load = []
+        else:
+            load = ['SELECT']
+        self.assertEqual(self.round_trips('post', '/movies/', 201, json={
+            'title': 'Parasite', 'release_date': '2019-05-30'
+        }), ['INSERT', 'END'])
+        self.assertEqual(self.round_trips('patch', '/movies/1', 200, json={
+            'title': 'Joker 2'
+        }), load + ['UPDATE', 'END'])
+        self.assertEqual(self.round_trips('delete', '/actors/1', 204),
+                         load + ['DELETE', 'END'])
+
+    def test_missing_rows_are_not_found(self):
+        self.round_trips('patch', '/actors/99', 404, json={'age': 50})
+        self.round_trips('delete', '/movies/99', 404)
+
+    def test_patch_returns_updated_row(self):
+        self.round_trips('patch', '/actors/1', 200, json={
+            'age': 46, 'gender': 'FEMALE'
+        })
+        res = self.client().get('/actors/1', headers=self.auth_header)
+
+        self.assertEqual(res.get_json(), {
+            'id': 1, 'name': 'Joaquin', 'age': 46, 'gender': 'FEMALE'
+        })
+
+    def test_reads_do_not_commit(self):
+        self.assertEqual(self.round_trips('get', '/movies/1', 200),
+                         ['SELECT', 'RESET'])
+
+    def test_failed_request_rolls_back(self):
+        self.round_trips('patch', '/movies/1', 400, json={
+            'title': 'Joker 2', 'release_date': 'not a date'
+        })
+        res = self.client().get('/movies/1', headers=self.auth_header)
+
+        self.assertEqual(res.get_json()['title'], 'Joker')
+
+    def test_other_engines_keep_their_reset(self):
+        other = create_engine('sqlite://')
+        self.assertTrue(event.contains(self.engine.pool, 'reset',
+                                       _reset_connection))
+        self.assertFalse(event.contains(other.pool, 'reset',
+                                        _reset_connection))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,256 @@
+"""
+Offline load test of the API endpoints, for tracking regressions
+between commits.
+
+    python -m benchmarks.bench_api [--requests 1000] [--movies 10000]
+                                   [--actors 2000] [--database-url URL]
+                                   [--no-seed] [--reset]
+                                   [--scenario NAME ...]
+                                   [--json results.json]
+                                   [--compare baseline.json]
+                                   [--tolerance 0.1]
+
+Requests go through the Flask test client with tokens signed by a local
+RSA key (see support.LocalSigner), so nothing leaves the machine. Each
+scenario sends `requests` requests after a short warm-up and reports
+its throughput and p50/p95/p99 latency. Writes run last, in the order
+post, patch, delete, so the reads see the seeded dataset.
+
+By default a fresh in-memory SQLite database is seeded with the
+dataset generator. To benchmark a large dataset, seed a dedicated
+PostgreSQL database once with `python -m benchmarks.dataset` and pass
+it with --database-url and --no-seed. Seeding refuses tables that hold
+rows unless --reset is given, which drops and recreates them first.
+
+--json writes the results with the commit and environment they were
+measured on. --compare reads such a file and exits with status 1 if the
+p95 latency of any scenario grew by more than --tolerance.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+from benchmarks.support import configure_environment, patch_auth, percentile
+
+WARMUP_REQUESTS = 20
+
+
+class Scenario():
+    """
+     One endpoint under load: `request(client, headers, i)` sends the
+     i-th request and returns the response
+    """
+
+    def __init__(self, name, request, expected=(200,)):
+        self.name = name
+        self.request = request
+        self.expected = expected
+
+
+def scenarios(rng, movie_ids, actor_ids, female_actors):
+    """
+    scenarios: the benchmarked requests, reads first. The ids of each
+    scenario are drawn from the seeded rows with a fixed seed, so two
+    runs send the same requests.
+    """
+    read_ids = [rng.choice(movie_ids) for _ in range(1000)]
+    pages = max(len(movie_ids) // 10, 1)
+    female_pages = max(female_actors // 10, 1)
+    # every deleted movie is deleted once, from the end of the table
+    deleted_ids = list(reversed(movie_ids))
+
+    def get(path):
+        return lambda client, headers, i: client.get(
+            path(i), headers=headers)
+
+    return [
+        Scenario('list movies', get(
+            lambda i: '/movies/?page=%d' % (i % min(pages, 50) + 1))),
+        Scenario('list movies cursor', get(lambda i: '/movies/?cursor=')),
+        Scenario('list movies embed cast', get(
+            lambda i: '/movies/?embed=cast&page=%d' % (i % 10 + 1))),
+        Scenario('search movies', get(lambda i: '/movies/?q=garden')),
+        Scenario('list actors', get(
+            lambda i: '/actors/?gender=FEMALE&page=%d' % (
+                i % min(female_pages, 10) + 1))),
+        Scenario('get movie', get(
+            lambda i: '/movies/%d' % read_ids[i % len(read_ids)])),
+        Scenario('get actor', get(
+            lambda i: '/actors/%d' % actor_ids[i % len(actor_ids)])),
+        Scenario('batch get movies', get(
+            lambda i: '/movies/?ids=' + ','.join(
+                str(movie_id) for movie_id in read_ids[i % 100:][:50]))),
+        Scenario('post movie', lambda client, headers, i: client.post(
+            '/movies/', headers=headers,
+            json={'title': 'Benchmark %d' % i,
+                  'release_date': '2019-10-04'}), expected=(201,)),
+        Scenario('patch movie', lambda client, headers, i: client.patch(
+            '/movies/%d' % read_ids[i % len(read_ids)], headers=headers,
+            json={'title': 'Patched %d' % i})),
+        Scenario('delete movie', lambda client, headers, i: client.delete(
+            '/movies/%d' % deleted_ids[i], headers=headers),
+            expected=(204,)),
+    ]
+
+
+def run(scenario, client, headers, requests):
+    for i in range(WARMUP_REQUESTS):
+        scenario.request(client, headers, requests + i)
+
+    latencies, errors = [], 0
+    started = time.perf_counter()
+    for i in range(requests):
+        request_started = time.perf_counter()
+        response = scenario.request(client, headers, i)
+        latencies.append(time.perf_counter() - request_started)
+        if response.status_code not in scenario.expected:
+            errors += 1
+    seconds = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': requests,
+        'errors': errors,
+        'seconds': round(seconds, 4),
+        'throughput': round(requests / seconds, 1),
+        'mean_ms': round(sum(latencies) / requests * 1000, 3),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def environment(app, args):
+    from app.main import db
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL, check=True).stdout.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    with app.app_context():
+        dialect = db.engine.dialect.name
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'database': dialect,
+        'cache': app.config['CACHE_TYPE'],
+        'movies': args.movies,
+        'actors': args.actors,
+        'seed': args.seed,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    compare: prints the p95 and throughput changes against a baseline
+    Returns:
+        returns the names of the scenarios whose p95 regressed by more
+        than `tolerance`
+    """
+    regressions = []
+    print()
+    print('%-26s %12s %12s %9s' % ('scenario', 'base p95 ms', 'p95 ms',
+                                   'change'))
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        change = result['p95_ms'] / base['p95_ms'] - 1
+        flag = ''
+        if change > tolerance:
+            regressions.append(name)
+            flag = '  regression'
+        print('%-26s %12.2f %12.2f %+8.1f%%%s' % (
+            name, base['p95_ms'], result['p95_ms'], change * 100, flag))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--movies', type=int, default=10000)
+    parser.add_argument('--actors', type=int, default=2000)
+    parser.add_argument('--casts-per-movie', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database-url', default='sqlite://')
+    parser.add_argument('--no-seed', action='store_true',
+                        help='use the rows already in the database')
+    parser.add_argument('--reset', action='store_true',
+                        help='drop and recreate the tables before seeding')
+    parser.add_argument('--scenario', action='append',
+                        help='run only the scenarios of these names')
+    parser.add_argument('--json', help='write the results to this file')
+    parser.add_argument('--compare', help='results file to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.1)
+    args = parser.parse_args()
+
+    os.environ['BENCH_DATABASE_URL'] = args.database_url
+    signer = configure_environment(args.database_url)
+    patch_auth(signer)
+
+    from app import blueprint
+    from app.main import create_app, db
+    from app.main.model.actor import Actor, Gender
+    from app.main.model.movie import Movie
+    from benchmarks.dataset import generate
+
+    app = create_app('benchmark')
+    app.register_blueprint(blueprint)
+    if args.no_seed:
+        with app.app_context():
+            movie_ids = [row[0] for row in db.session.query(Movie._id)]
+            actor_ids = [row[0] for row in db.session.query(Actor._id)]
+            db.session.remove()
+        args.movies, args.actors = len(movie_ids), len(actor_ids)
+    else:
+        try:
+            movie_ids, actor_ids = generate(
+                app, args.movies, args.actors, args.casts_per_movie,
+                args.seed, reset=args.reset)
+        except RuntimeError as exc:
+            parser.error(str(exc))
+    if len(movie_ids) < args.requests + WARMUP_REQUESTS:
+        parser.error('the delete scenario needs at least %d movies' %
+                     (args.requests + WARMUP_REQUESTS))
+
+    client = app.test_client()
+    headers = {'Authorization': 'Bearer ' + signer.token()}
+    rng = random.Random(args.seed)
+    results = {}
+    print('%-26s %10s %9s %9s %9s %7s' % ('scenario', 'req/s', 'p50 ms',
+                                          'p95 ms', 'p99 ms', 'errors'))
+    with app.app_context():
+        female_actors = Actor.query.filter(
+            Actor._gender == Gender.FEMALE).count()
+        db.session.remove()
+    for scenario in scenarios(rng, movie_ids, actor_ids, female_actors):
+        if args.scenario and scenario.name not in args.scenario:
+            continue
+        result = run(scenario, client, headers, args.requests)
+        results[scenario.name] = result
+        print('%-26s %10.0f %9.2f %9.2f %9.2f %7d' % (
+            scenario.name, result['throughput'], result['p50_ms'],
+            result['p95_ms'], result['p99_ms'], result['errors']))
+
+    if args.json:
+        with open(args.json, 'w') as results_file:
+            json.dump({'environment': environment(app, args),
+                       'scenarios': results}, results_file, indent=2)
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)['scenarios']
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""
+Load test of the Flask app under gunicorn sync workers against the async
+app under uvicorn, with the same number of worker processes.
+
+    python -m benchmarks.bench_asgi [--workers 2] [--concurrency 64]
+                                    [--duration 10] [--database-url URL]
+
+Each server is started on a free local port and hit by `concurrency`
+concurrent clients reading movie lists and single movies for `duration`
+seconds. The default database is a temporary SQLite file; SQLite answers
+in microseconds, so point --database-url at a local PostgreSQL to see
+the effect of waiting on the database. Needs gunicorn, uvicorn, httpx
+and the async app's requirements (see README).
+"""
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.support import configure_environment
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def script(name):
+    # gunicorn 19 cannot run with -m; use the script next to python
+    return os.path.join(os.path.dirname(sys.executable), name)
+
+
+def wait_for_port(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('server exited with %d' % process.returncode)
+        with socket.socket() as sock:
+            if sock.connect_ex(('127.0.0.1', port)) == 0:
+                return
+        time.sleep(0.1)
+    raise RuntimeError('server did not start within %ds' % timeout)
+
+
+def seed(rows=1000):
+    from benchmarks.support import create_benchmark_app
+    from app.main import db
+    from app.main.model.movie import Movie
+
+    app = create_benchmark_app()
+    with app.app_context():
+        db.session.execute(Movie.__table__.insert(), [
+            {'title': 'Movie %06d' % i,
+             'release_date': Movie.validate_release_date('2019-01-01')}
+            for i in range(rows)
+        ])
+        db.session.commit()
+        db.session.remove()
+    return rows
+
+
+async def client(http, paths, deadline, latencies, errors):
+    i = 0
+    while time.monotonic() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            res = await http.get(path)
+            if res.status_code != 200:
+                errors.append(res.status_code)
+                continue
+        except Exception as exc:
+            errors.append(type(exc).__name__)
+            continue
+        latencies.append(time.perf_counter() - started)
+
+
+async def load(port, token, paths, concurrency, duration):
+    import httpx
+
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=concurrency,
+                          max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(
+            base_url='http://127.0.0.1:%d' % port, limits=limits,
+            headers={'Authorization': 'Bearer ' + token},
+            timeout=30) as http:
+        deadline = time.monotonic() + duration
+        await asyncio.gather(*[
+            client(http, paths, deadline, latencies, errors)
+            for _ in range(concurrency)
+        ])
+    return latencies, errors
+
+
+def run_server(name, command, port, token, paths, args):
+    env = dict(os.environ, FLASK_ENV='production')
+    # a session of its own, so stopping it also stops uvicorn's workers
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL,
+                               start_new_session=True)
+    try:
+        wait_for_port(port, process)
+        # one pass to warm the token cache and the connection pools
+        asyncio.get_event_loop().run_until_complete(
+            load(port, token, paths, args.workers * 2, 1))
+        latencies, errors = asyncio.get_event_loop().run_until_complete(
+            load(port, token, paths, args.concurrency, args.duration))
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait()
+
+    latencies.sort()
+    count = len(latencies)
+    print('%-22s %10.0f %9.1f %9.1f %7d' % (
+        name, count / args.duration,
+        latencies[count // 2] * 1000 if count else 0,
+        latencies[int(count * 0.99)] * 1000 if count else 0,
+        len(errors)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--database-url')
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if database_url is None:
+        fd, path = tempfile.mkstemp(prefix='bench-asgi-', suffix='.db')
+        os.close(fd)
+        database_url = 'sqlite:///' + path
+    signer = configure_environment(database_url)
+    rows = seed()
+    token = signer.token()
+    paths = ['/movies/', '/movies/?page=3'] + [
+        '/movies/%d' % movie_id for movie_id in range(1, rows, rows // 20)]
+
+    print('%-22s %10s %9s %9s %7s' % ('server', 'req/s', 'p50 ms',
+                                      'p99 ms', 'errors'))
+    port = free_port()
+    run_server('gunicorn sync x%d' % args.workers, [
+        script('gunicorn'), '--workers', str(args.workers),
+        '--bind', '127.0.0.1:%d' % port, 'wsgi:app'
+    ], port, token, paths, args)
+    port = free_port()
+    run_server('uvicorn asgi x%d' % args.workers, [
+        script('uvicorn'), '--workers', str(args.workers),
+        '--port', str(port), '--log-level', 'warning', 'asgi:app'
+    ], port, token, paths, args)
+
+
+if __name__ == '__main__':
+    main()
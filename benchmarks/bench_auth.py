@@ -0,0 +1,73 @@
+"""
+Per-request auth overhead for MovieList.get and ActorList.get.
+
+    python -m benchmarks.bench_auth
+
+Reports the cost of the requires_auth decorator with a cold token cache
+(full RS256 verification) and a warm one, next to the end-to-end latency
+of the endpoint it guards.
+"""
+from benchmarks.support import (configure_environment, create_benchmark_app,
+                                best_of)
+
+signer = configure_environment()
+
+from datetime import datetime  # noqa: E402
+
+from flask import g  # noqa: E402
+
+from app.main import db  # noqa: E402
+from app.main.auth import auth  # noqa: E402
+from app.main.model.actor import Actor  # noqa: E402
+from app.main.model.movie import Movie  # noqa: E402
+
+ENDPOINTS = [
+    ('MovieList.get', '/movies/', 'get:movies'),
+    ('ActorList.get', '/actors/', 'get:actors'),
+]
+
+
+def seed(app, rows=100):
+    with app.app_context():
+        db.session.execute(Movie.__table__.insert(), [
+            {'title': 'Movie %d' % i, 'release_date': datetime(2019, 1, 1)}
+            for i in range(rows)
+        ])
+        db.session.execute(Actor.__table__.insert(), [
+            {'name': 'Actor %d' % i, 'age': 20 + i % 40, 'gender': 'MALE'}
+            for i in range(rows)
+        ])
+        db.session.commit()
+
+
+def auth_overhead(app, headers, permission, cold, number):
+    guarded = auth.requires_auth(permission)(lambda payload: payload)
+
+    def call():
+        g.pop('auth_request', None)
+        if cold:
+            auth.token_cache.clear()
+        guarded()
+
+    with app.test_request_context(headers=headers):
+        return best_of(call, number)
+
+
+def main():
+    app = create_benchmark_app(cached=False)
+    seed(app)
+    headers = {'Authorization': 'Bearer ' + signer.token()}
+    client = app.test_client()
+
+    print('%-15s %14s %14s %14s' % ('endpoint', 'auth cold us',
+                                    'auth warm us', 'request us'))
+    for name, path, permission in ENDPOINTS:
+        cold = auth_overhead(app, headers, permission, True, 50)
+        warm = auth_overhead(app, headers, permission, False, 2000)
+        request = best_of(lambda: client.get(path, headers=headers), 200)
+        print('%-15s %14.1f %14.1f %14.1f' % (name, cold * 1e6, warm * 1e6,
+                                              request * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Rows/sec of creating movies one POST at a time (one INSERT and one
+commit per movie, each in its own unit of work) against the bulk path
+(chunked inserts, one commit per chunk).
+
+    python -m benchmarks.bench_bulk_insert
+"""
+from benchmarks.support import (configure_environment, create_benchmark_app,
+                                best_of)
+
+configure_environment()
+
+from app.main import db  # noqa: E402
+from app.main.model.movie import Movie  # noqa: E402
+from app.main.service import movie_service  # noqa: E402
+from app.main.util.dto import MovieDto  # noqa: E402
+
+ROWS = 10000
+
+
+def items(count):
+    return [{'title': 'Movie %06d' % i, 'release_date': '2019-01-01'}
+            for i in range(count)]
+
+
+def single_path(batch):
+    for item in batch:
+        movie_service.post_movie(item['title'], item['release_date'])
+        db.session.commit()
+        db.session.remove()
+
+
+def bulk_path(batch):
+    movie_service.post_movies(batch, MovieDto.validate_movie)
+
+
+def main():
+    app = create_benchmark_app(cached=False)
+    with app.app_context():
+        batch = items(ROWS)
+        single = best_of(lambda: single_path(batch), 1, repeat=3)
+        bulk = best_of(lambda: bulk_path(batch), 1, repeat=3)
+        print('%8s %14s %14s %8s' % ('rows', 'single rows/s', 'bulk rows/s',
+                                     'speedup'))
+        print('%8d %14.0f %14.0f %7.1fx' % (ROWS, ROWS / single,
+                                            ROWS / bulk, single / bulk))
+        print('movies inserted: %d' % Movie.query.count())
+        db.session.remove()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Rows/sec of the list read path: ORM instances + format() + restplus
+marshalling against the column-projected rows the services now return.
+
+    python -m benchmarks.bench_list_projection
+"""
+from benchmarks.support import (configure_environment, create_benchmark_app,
+                                best_of)
+
+configure_environment()
+
+from datetime import datetime  # noqa: E402
+
+from flask_restplus import marshal  # noqa: E402
+
+from app.main import db  # noqa: E402
+from app.main.model.movie import Movie  # noqa: E402
+from app.main.service import movie_service  # noqa: E402
+from app.main.util.dto import MovieDto  # noqa: E402
+
+PAGE_SIZES = [10, 100, 1000]
+
+
+def orm_path(per_page):
+    movies = (Movie.query.order_by(Movie._title.desc(), Movie._id.desc()).
+              limit(per_page).all())
+    return marshal([movie.format() for movie in movies], MovieDto.movie)
+
+
+def projected_path(per_page):
+    page = movie_service.get_movies(1, per_page)
+    return [MovieDto.serialize_movie(row) for row in page.items]
+
+
+def main():
+    app = create_benchmark_app(cached=False)
+    with app.app_context():
+        db.session.execute(Movie.__table__.insert(), [
+            {'title': 'Movie %06d' % i, 'release_date': datetime(2019, 1, 1)}
+            for i in range(max(PAGE_SIZES))
+        ])
+        db.session.commit()
+
+        print('%8s %14s %16s %8s' % ('per_page', 'orm rows/s',
+                                     'projected rows/s', 'speedup'))
+        for per_page in PAGE_SIZES:
+            number = max(10000 // per_page, 5)
+            orm = best_of(lambda: orm_path(per_page), number)
+            projected = best_of(lambda: projected_path(per_page), number)
+            print('%8d %14.0f %16.0f %7.1fx' % (per_page, per_page / orm,
+                                                per_page / projected,
+                                                orm / projected))
+
+
+if __name__ == '__main__':
+    main()
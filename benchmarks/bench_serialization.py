@@ -0,0 +1,71 @@
+"""
+Serialization throughput (response bytes/sec) for large list pages.
+
+    python -m benchmarks.bench_serialization
+
+Compares restplus marshal() + json.dumps, the compiled DTO serializer +
+json.dumps, and the compiled serializer + the encoder backend picked by
+app.main.util.encoder (orjson or ujson when installed).
+"""
+from benchmarks.support import configure_environment, best_of
+
+configure_environment()
+
+import json  # noqa: E402
+from collections import namedtuple  # noqa: E402
+from datetime import datetime  # noqa: E402
+
+from flask_restplus import marshal  # noqa: E402
+
+from app.main.model.actor import Gender  # noqa: E402
+from app.main.util import encoder  # noqa: E402
+from app.main.util.dto import MovieDto, ActorDto  # noqa: E402
+
+PAGE_SIZES = [100, 1000, 10000]
+
+MovieRow = namedtuple('MovieRow', ['id', 'title', 'release_date'])
+ActorRow = namedtuple('ActorRow', ['id', 'name', 'age', 'gender'])
+
+
+def make_rows(count):
+    movies = [MovieRow(i, 'Movie %d' % i, datetime(2019, 1, 1 + i % 28))
+              for i in range(count)]
+    actors = [ActorRow(i, 'Actor %d' % i, 20 + i % 50,
+                       Gender.MALE if i % 2 else Gender.FEMALE)
+              for i in range(count)]
+    return movies, actors
+
+
+def strategies(rows, dto_model, serialize, envelope):
+    return [
+        ('marshal+json', lambda: json.dumps(
+            {envelope: marshal([row._asdict() for row in rows], dto_model)}
+        ).encode('utf-8')),
+        ('compiled+json', lambda: json.dumps(
+            {envelope: [serialize(row) for row in rows]}).encode('utf-8')),
+        ('compiled+' + encoder.BACKEND, lambda: encoder.dumps(
+            {envelope: [serialize(row) for row in rows]})),
+    ]
+
+
+def main():
+    print('%-8s %8s %-18s %12s %10s' % ('dto', 'rows', 'strategy', 'MB/s',
+                                        'ms/page'))
+    for count in PAGE_SIZES:
+        movies, actors = make_rows(count)
+        for name, rows, dto_model, serialize, envelope in [
+                ('movie', movies, MovieDto.movie, MovieDto.serialize_movie,
+                 'movies'),
+                ('actor', actors, ActorDto.actor, ActorDto.serialize_actor,
+                 'actors')]:
+            for strategy, func in strategies(rows, dto_model, serialize,
+                                             envelope):
+                size = len(func())
+                seconds = best_of(func, max(20000 // count, 3))
+                print('%-8s %8d %-18s %12.1f %10.2f' % (
+                    name, count, strategy, size / seconds / 1e6,
+                    seconds * 1e3))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""
+Seeded dataset generator for the benchmarks.
+
+    python -m benchmarks.dataset --database-url URL [--movies 1000000]
+                                 [--actors 200000] [--casts-per-movie 3]
+                                 [--seed 42] [--reset]
+
+Fills empty movies, actors and casts tables with reproducible rows: the
+same seed always yields the same titles, names, ages, dates and casts.
+Rows are inserted in chunks, with one commit per chunk, so millions of
+rows fit in flat memory. --reset drops and recreates the tables first;
+never point it at a database whose data you want to keep.
+"""
+import argparse
+import os
+import random
+import time
+from datetime import date, timedelta
+
+CHUNK_SIZE = 10000
+
+WORDS = [
+    'Last', 'Silent', 'Red', 'Little', 'Lost', 'Dark', 'Golden', 'Broken',
+    'Wild', 'Secret', 'Long', 'Blue', 'Hidden', 'Endless', 'Quiet', 'Iron',
+    'Night', 'River', 'Women', 'City', 'Story', 'Road', 'Garden', 'Winter',
+    'Summer', 'House', 'King', 'Island', 'Storm', 'Letter', 'Dream', 'Fire',
+]
+FIRST_NAMES = [
+    'Ada', 'Ben', 'Chloe', 'Dev', 'Elena', 'Farid', 'Grace', 'Hiro',
+    'Ines', 'Jonah', 'Kemi', 'Luca', 'Maya', 'Nils', 'Olga', 'Pablo',
+    'Quinn', 'Rosa', 'Sami', 'Tara', 'Uma', 'Viktor', 'Wen', 'Yara',
+]
+LAST_NAMES = [
+    'Abe', 'Brooks', 'Costa', 'Dubois', 'Eze', 'Fischer', 'Garcia', 'Hale',
+    'Ivanova', 'Jensen', 'Kim', 'Larsen', 'Moreau', 'Novak', 'Okafor',
+    'Patel', 'Quist', 'Rossi', 'Silva', 'Tanaka', 'Urban', 'Varga', 'Wu',
+]
+FIRST_RELEASE = date(1950, 1, 1)
+RELEASE_DAYS = (date(2025, 12, 31) - FIRST_RELEASE).days
+
+
+def chunks(count, chunk_size):
+    for start in range(0, count, chunk_size):
+        yield start, min(chunk_size, count - start)
+
+
+def movie_rows(rng, start, count):
+    return [{
+        'title': '%s %s %d' % (rng.choice(WORDS), rng.choice(WORDS),
+                               start + i + 1),
+        'release_date': FIRST_RELEASE + timedelta(
+            days=rng.randrange(RELEASE_DAYS)),
+    } for i in range(count)]
+
+
+def actor_rows(rng, start, count):
+    return [{
+        'name': '%s %s' % (rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)),
+        'age': rng.randint(18, 90),
+        'gender': rng.choice(('MALE', 'FEMALE')),
+    } for _ in range(count)]
+
+
+def cast_rows(rng, movie_ids, actor_ids, casts_per_movie):
+    rows = []
+    for movie_id in movie_ids:
+        for actor_id in rng.sample(actor_ids, casts_per_movie):
+            rows.append({'movie_id': movie_id, 'actor_id': actor_id,
+                         'role': 'Role of %d' % actor_id})
+    return rows
+
+
+def insert_chunk(db, table, rows):
+    # one multi-row INSERT on PostgreSQL, where executemany would send
+    # a statement per row; SQLite is fastest with executemany
+    if db.engine.dialect.name == 'postgresql':
+        db.session.execute(table.insert().values(rows))
+    else:
+        db.session.execute(table.insert(), rows)
+    db.session.commit()
+
+
+def generate(app, movies, actors, casts_per_movie=3, seed=42,
+             chunk_size=CHUNK_SIZE, reset=False, progress=None):
+    """
+    generate: fills the tables of `app` with a reproducible dataset
+    Args:
+        movies, actors (data type: int) rows to create
+        casts_per_movie (data type: int) actors cast in each movie
+        seed (data type: int) seed of the random generator
+        reset (data type: bool) drop and recreate the tables first
+        progress (data type: function) optional, called with a message
+            after each chunk
+    Returns:
+        returns the ids of the created movies and actors
+    """
+    from app.main import db
+    from app.main.model.actor import Actor
+    from app.main.model.cast import Cast
+    from app.main.model.movie import Movie
+
+    rng = random.Random(seed)
+    casts_per_movie = min(casts_per_movie, actors)
+    with app.app_context():
+        if reset:
+            db.drop_all()
+        db.create_all()
+        if Movie.query.first() or Actor.query.first():
+            raise RuntimeError('the tables are not empty, use --reset')
+
+        for table, build, count in ((Movie.__table__, movie_rows, movies),
+                                    (Actor.__table__, actor_rows, actors)):
+            for start, size in chunks(count, chunk_size):
+                insert_chunk(db, table, build(rng, start, size))
+                if progress:
+                    progress('%s: %d/%d' % (table.name, start + size, count))
+
+        movie_ids = [row[0] for row in
+                     db.session.query(Movie._id).order_by(Movie._id)]
+        actor_ids = [row[0] for row in
+                     db.session.query(Actor._id).order_by(Actor._id)]
+        if casts_per_movie:
+            for start, size in chunks(len(movie_ids), chunk_size):
+                insert_chunk(db, Cast.__table__, cast_rows(
+                    rng, movie_ids[start:start + size], actor_ids,
+                    casts_per_movie))
+                if progress:
+                    progress('casts: %d/%d movies' % (start + size,
+                                                      len(movie_ids)))
+        db.session.remove()
+    return movie_ids, actor_ids
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--database-url', required=True)
+    parser.add_argument('--movies', type=int, default=100000)
+    parser.add_argument('--actors', type=int, default=20000)
+    parser.add_argument('--casts-per-movie', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--reset', action='store_true')
+    args = parser.parse_args()
+
+    from benchmarks.support import configure_environment
+
+    os.environ['BENCH_DATABASE_URL'] = args.database_url
+    configure_environment(args.database_url)
+    from app.main import create_app
+
+    started = time.perf_counter()
+    try:
+        generate(create_app('benchmark'), args.movies, args.actors,
+                 args.casts_per_movie, args.seed, reset=args.reset,
+                 progress=print)
+    except RuntimeError as exc:
+        parser.error(str(exc))
+    print('done in %.1fs' % (time.perf_counter() - started))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Shared helpers for the offline benchmarks.
+
+`configure_environment()` must run before anything under `app` is
+imported: it points the benchmark config at a local database and the
+auth module at a locally-signed JWKS file, so no benchmark touches
+Auth0. The benchmark config is the production one, so responses are
+compact JSON without Server-Timing headers, and reads are cached.
+"""
+import base64
+import json
+import os
+import tempfile
+import time
+import timeit
+
+import rsa
+
+ALL_PERMISSIONS = [
+    'get:movies', 'create:movie', 'update:movie', 'delete:movie',
+    'get:actors', 'create:actor', 'update:actor', 'delete:actor',
+]
+
+
+def _b64(number):
+    data = number.to_bytes((number.bit_length() + 7) // 8, 'big')
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+class LocalSigner():
+    """
+     RSA key pair standing in for the Auth0 tenant: publishes a JWKS
+     file and signs RS256 access tokens with matching claims
+    """
+
+    def __init__(self, kid='benchmark-key', bits=2048):
+        self.kid = kid
+        public_key, private_key = rsa.newkeys(bits)
+        self.private_pem = private_key.save_pkcs1().decode('ascii')
+        self.jwks = {'keys': [{
+            'kty': 'RSA',
+            'kid': kid,
+            'use': 'sig',
+            'alg': 'RS256',
+            'n': _b64(public_key.n),
+            'e': _b64(public_key.e),
+        }]}
+
+    def write_jwks(self, path=None):
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix='jwks-', suffix='.json')
+            os.close(fd)
+        with open(path, 'w') as jwks_file:
+            json.dump(self.jwks, jwks_file)
+        return path
+
+    def token(self, permissions=ALL_PERMISSIONS, lifetime=3600,
+              domain=None, audience=None):
+        from jose import jwt
+
+        domain = domain or os.environ['AUTH0_DOMAIN']
+        audience = audience or os.environ['API_AUDIENCE']
+        now = int(time.time())
+        claims = {
+            'iss': 'https://' + domain + '/',
+            'sub': 'benchmark|user',
+            'aud': audience,
+            'iat': now,
+            'exp': now + lifetime,
+            'permissions': list(permissions),
+        }
+        return jwt.encode(claims, self.private_pem, algorithm='RS256',
+                          headers={'kid': self.kid})
+
+
+def configure_environment(database_url='sqlite://', signer=None):
+    """
+     Sets the environment the app reads at import time
+    Returns:
+        returns the LocalSigner whose keys the auth module will trust
+    """
+    signer = signer or LocalSigner()
+    os.environ.setdefault('AUTH0_DOMAIN', 'benchmark.local')
+    os.environ.setdefault('API_AUDIENCE', 'castingagencyauth')
+    os.environ['ALGORITHMS'] = 'RS256'
+    os.environ['JWKS_FILE'] = signer.write_jwks()
+    for name in ('DATABASE_URL', 'DEV_DATABASE_URL', 'TEST_DATABASE_URL',
+                 'BENCH_DATABASE_URL'):
+        os.environ.setdefault(name, database_url)
+    return signer
+
+
+def patch_auth(signer):
+    """
+     Points an already imported auth module at the signer's keys, for
+     when app.main.auth.auth was loaded before configure_environment ran
+    """
+    from app.main.auth import auth
+    from app.main.auth.jwks import FileJWKSSource
+
+    auth.AUTH0_DOMAIN = os.environ['AUTH0_DOMAIN']
+    auth.API_AUDIENCE = os.environ['API_AUDIENCE']
+    auth.ALGORITHMS = os.environ['ALGORITHMS']
+    auth.jwks_store.source = FileJWKSSource(signer.write_jwks())
+    auth.jwks_store.clear()
+    auth.token_cache.clear()
+
+
+def create_benchmark_app(cached=True):
+    """
+     Builds the app with the benchmark config and creates its tables.
+     Benchmarks timing a code path pass cached=False, so repeated calls
+     are not answered from the cache.
+    """
+    from app import blueprint
+    from app.main import create_app, db
+    from app.main.util.cache import cache
+
+    app = create_app('benchmark')
+    if not cached:
+        app.config['CACHE_TYPE'] = 'null'
+        cache.init_app(app)
+    app.register_blueprint(blueprint)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def best_of(func, number, repeat=5):
+    """
+    Returns:
+        returns the best per-call time in seconds over `repeat` runs
+    """
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def percentile(ordered, percent):
+    """
+    percentile: nearest-rank percentile of sorted samples
+    Returns:
+        returns the sample below which `percent` of the samples fall
+    """
+    if not ordered:
+        return None
+    rank = max(int(round(percent / 100.0 * len(ordered))), 1)
+    return ordered[rank - 1]
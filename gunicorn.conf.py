@@ -0,0 +1,104 @@
+"""
+Gunicorn settings of the web process:
+
+    gunicorn --config gunicorn.conf.py wsgi:app
+
+The app is imported once by the master and forked into the workers,
+which each open their own database connections.
+
+    GUNICORN_WORKER_CLASS   sync, gthread (default) or gevent
+    WEB_CONCURRENCY         workers, sized from the CPU count by default
+    GUNICORN_THREADS        threads of a gthread worker (default 4)
+    GUNICORN_WORKER_CONNECTIONS
+                            concurrent requests of a gevent worker
+                            (default 100)
+    GUNICORN_TIMEOUT        seconds before a silent worker is restarted
+    GUNICORN_MAX_REQUESTS   requests before a worker is replaced (0: never)
+    METRICS_ENABLED         true to serve /metrics, merged across workers
+                            through prometheus_multiproc_dir
+"""
+import glob
+import multiprocessing
+import os
+import tempfile
+
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+
+if worker_class == 'gevent':
+    # before the app is preloaded, so every module it imports is patched
+    from gevent import monkey
+
+    monkey.patch_all()
+    try:
+        from psycogreen.gevent import patch_psycopg
+    except ImportError:
+        pass
+    else:
+        patch_psycopg()
+
+metrics_enabled = os.getenv('METRICS_ENABLED', 'false') == 'true'
+
+if metrics_enabled:
+    # before the app is preloaded: prometheus_client decides on import
+    # whether samples go to per-process files. Files of a previous run
+    # would be merged into this one's, so they are removed.
+    metrics_dir = os.environ.setdefault(
+        'prometheus_multiproc_dir',
+        os.path.join(tempfile.gettempdir(), 'casting-agency-metrics'))
+    os.makedirs(metrics_dir, exist_ok=True)
+    for path in glob.glob(os.path.join(metrics_dir, '*.db')):
+        os.remove(path)
+
+
+def default_workers(worker_class, cpus):
+    """
+    default_workers: the usual 2 x cores + 1 for sync workers, which
+    block on every request. Threaded and gevent workers already serve
+    requests concurrently, so fewer processes keep the total of database
+    connections down.
+    """
+    if worker_class == 'gevent':
+        return cpus
+    if worker_class == 'gthread':
+        return cpus + 1
+    return cpus * 2 + 1
+
+
+bind = '0.0.0.0:' + os.getenv('PORT', '8000')
+workers = int(os.getenv('WEB_CONCURRENCY') or
+              default_workers(worker_class, multiprocessing.cpu_count()))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 100))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+preload_app = True
+
+
+def when_ready(server):
+    from app.main.util import prefork
+    from wsgi import app
+
+    prefork.warm_up(app)
+
+
+def pre_fork(server, worker):
+    from app.main.util import prefork
+    from wsgi import app
+
+    prefork.before_fork(app)
+
+
+def post_fork(server, worker):
+    from app.main.util import prefork
+    from wsgi import app
+
+    prefork.after_fork(app)
+
+
+def child_exit(server, worker):
+    if metrics_enabled:
+        from prometheus_client import multiprocess
+
+        # drops the live gauges of the worker, keeps its counters
+        multiprocess.mark_process_dead(worker.pid)
@@ -1,25 +1,25 @@
-import os
+import sys
 import unittest
 
-from flask_migrate import Migrate, MigrateCommand
 from flask_script import Manager
 
-from app.main import create_app, db
+from app.main import db
 from app.main.model import movie
 from app.main.model import actor
-from app.main.controller import movie_controller
-from app.main.controller import actor_controller
-from app import blueprint
+from app.main.model import cast
+from wsgi import app
 
-app = create_app(os.getenv('FLASK_ENV') or 'development')
-app.register_blueprint(blueprint)
 app.app_context().push()
 
 manager = Manager(app)
 
-migrate = Migrate(app, db)
 
-manager.add_command('db', MigrateCommand)
+def add_migrate_command():
+    # alembic alone takes longer to import than the app
+    from flask_migrate import Migrate, MigrateCommand
+
+    Migrate(app, db)
+    manager.add_command('db', MigrateCommand)
 
 
 @manager.command
@@ -38,4 +38,6 @@ def test():
 
 
 if __name__ == '__main__':
+    if sys.argv[1:2] == ['db']:
+        add_migrate_command()
     manager.run()
@@ -0,0 +1,38 @@
+"""adding list indexes
+
+Revision ID: 32c4dbb03f09
+Revises: fecf3a7e1eae
+Create Date: 2026-10-18 13:30:12.418907
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '32c4dbb03f09'
+down_revision = 'fecf3a7e1eae'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_movies_title_id', 'movies', ['title', 'id']),
+    ('ix_movies_release_date', 'movies', ['release_date']),
+    ('ix_actors_name_id', 'actors', ['name', 'id']),
+    ('ix_actors_gender_age', 'actors', ['gender', 'age']),
+]
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns,
+                            postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table,
+                          postgresql_concurrently=True)
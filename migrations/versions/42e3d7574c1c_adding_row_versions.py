@@ -0,0 +1,32 @@
+"""adding row versions
+
+Revision ID: 42e3d7574c1c
+Revises: 32c4dbb03f09
+Create Date: 2026-10-18 14:02:41.207315
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '42e3d7574c1c'
+down_revision = '32c4dbb03f09'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('movies', 'actors'):
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(),
+                                       server_default=sa.func.now(),
+                                       nullable=False))
+        op.add_column(table, sa.Column('version', sa.Integer(),
+                                       server_default=sa.text('1'),
+                                       nullable=False))
+
+
+def downgrade():
+    for table in ('actors', 'movies'):
+        op.drop_column(table, 'version')
+        op.drop_column(table, 'updated_at')
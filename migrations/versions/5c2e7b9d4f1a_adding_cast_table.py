@@ -0,0 +1,36 @@
+"""adding cast table
+
+Revision ID: 5c2e7b9d4f1a
+Revises: d3f8a1c5b2e6
+Create Date: 2026-10-18 16:31:45.902117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c2e7b9d4f1a'
+down_revision = 'd3f8a1c5b2e6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'casts',
+        sa.Column('movie_id', sa.Integer(), nullable=False),
+        sa.Column('actor_id', sa.Integer(), nullable=False),
+        sa.Column('role', sa.String(length=120), nullable=False),
+        sa.ForeignKeyConstraint(['movie_id'], ['movies.id'],
+                                ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['actor_id'], ['actors.id'],
+                                ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('movie_id', 'actor_id')
+    )
+    op.create_index('ix_casts_actor_id', 'casts', ['actor_id'])
+
+
+def downgrade():
+    op.drop_index('ix_casts_actor_id', table_name='casts')
+    op.drop_table('casts')
@@ -0,0 +1,30 @@
+"""adding actor gender name index
+
+Revision ID: 7a4c9e2f1b3d
+Revises: 5c2e7b9d4f1a
+Create Date: 2026-10-18 18:04:27.518340
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a4c9e2f1b3d'
+down_revision = '5c2e7b9d4f1a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # list pages of one gender, in the (name, id) order of the list
+    with op.get_context().autocommit_block():
+        op.create_index('ix_actors_gender_name_id', 'actors',
+                        ['gender', 'name', 'id'],
+                        postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_actors_gender_name_id', table_name='actors',
+                      postgresql_concurrently=True)
@@ -0,0 +1,38 @@
+"""adding movie search indexes
+
+Revision ID: 9b1e4d6c2a7f
+Revises: 42e3d7574c1c
+Create Date: 2026-10-18 15:10:37.530214
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b1e4d6c2a7f'
+down_revision = '42e3d7574c1c'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    # prefix and substring searches of titles (ILIKE)
+    ('ix_movies_title_trgm', 'USING gin (title gin_trgm_ops)'),
+    # full-text searches of titles
+    ('ix_movies_title_tsv', "USING gin (to_tsvector('english', title))"),
+]
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES:
+            op.execute('CREATE INDEX CONCURRENTLY IF NOT EXISTS %s '
+                       'ON movies %s' % (name, definition))
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, definition in reversed(INDEXES):
+            op.execute('DROP INDEX CONCURRENTLY IF EXISTS %s' % name)
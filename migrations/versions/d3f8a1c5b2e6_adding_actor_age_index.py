@@ -0,0 +1,29 @@
+"""adding actor age index
+
+Revision ID: d3f8a1c5b2e6
+Revises: 9b1e4d6c2a7f
+Create Date: 2026-10-18 15:52:09.164382
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3f8a1c5b2e6'
+down_revision = '9b1e4d6c2a7f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # age ranges without a gender; ix_actors_gender_age serves the rest
+    with op.get_context().autocommit_block():
+        op.create_index('ix_actors_age', 'actors', ['age'],
+                        postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_actors_age', table_name='actors',
+                      postgresql_concurrently=True)
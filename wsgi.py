@@ -0,0 +1,8 @@
+import os
+
+from app import blueprint
+from app.main import create_app
+
+# gunicorn --config gunicorn.conf.py wsgi:app
+app = create_app(os.getenv('FLASK_ENV') or 'development')
+app.register_blueprint(blueprint)